@@ -0,0 +1,188 @@
+"""
+CineCritic — optional ASGI deployment: public reads on asyncpg.
+
+    uvicorn asgi:app --host 0.0.0.0 --port 5000 --workers 4
+
+GET/HEAD requests for READ_ENDPOINTS run on the worker's event loop. Each one
+calls the same Flask view gunicorn would, inside a greenlet (SQLAlchemy's
+greenlet_spawn), on a second app instance whose engine uses the asyncpg
+driver. Every query then awaits instead of blocking a thread, so a worker keeps
+many slow reads in flight on a small pool while the models, schemas, caches,
+budgets and headers stay the ones in controllers/. The bodies are the same
+bytes gunicorn sends.
+
+Everything else (writes, auth, password hashing, /metrics) goes to the regular
+psycopg2 app on a thread pool of ASGI_SYNC_THREADS, so blocking work never
+stalls the loop. Both apps share the module-level extensions, so a write's
+cache invalidation is seen by the reads.
+
+ASYNC_DATABASE_URL overrides the asyncpg URL derived from DATABASE_URL;
+ASGI_POOL_SIZE/ASGI_POOL_OVERFLOW size the asyncpg pool. `python -m bench.load`
+compares this against gunicorn.
+"""
+
+# Built-in imports
+import asyncio
+import io
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+# same default as gunicorn.conf.py (hash passwords off the request threads);
+# set before main is imported, since that builds the WSGI app
+os.environ.setdefault("PASSWORD_HASH_WORKERS", "2")
+
+# Installed imports
+from sqlalchemy.engine import make_url
+from sqlalchemy.util import greenlet_spawn
+from werkzeug.exceptions import HTTPException
+
+# Local imports
+from extensions import db
+from main import app as wsgi_app, create_app
+
+# routes served on the event loop; every other request takes the thread pool
+READ_ENDPOINTS = frozenset({
+    "films.list_films",
+    "films.get_film",
+    "genres.list_genres",
+    "reviews_feed.list_all_reviews",
+    "reviews.list_reviews",
+})
+
+
+def async_database_url(url: str) -> str:
+    """`url` with its driver switched to asyncpg."""
+    return make_url(url).set(drivername="postgresql+asyncpg").render_as_string(hide_password=False)
+
+
+class ReadSplitApp:
+    """ASGI app sending READ_ENDPOINTS to an asyncpg-backed Flask app and the rest to a WSGI one."""
+
+    def __init__(self, read_app, wsgi_app, threads: int = 8):
+        self.read_app = read_app
+        self.wsgi_app = wsgi_app
+        self._executor = ThreadPoolExecutor(threads, thread_name_prefix="wsgi")
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            return await self._lifespan(receive, send)
+        if scope["type"] != "http":
+            raise RuntimeError(f"unsupported ASGI scope type {scope['type']!r}")
+
+        environ = _environ(scope, await _read_body(receive))
+        if self._is_read(environ):
+            status, headers, body = await greenlet_spawn(_call_wsgi, self.read_app, environ)
+        else:
+            loop = asyncio.get_running_loop()
+            status, headers, body = await loop.run_in_executor(self._executor, _call_wsgi, self.wsgi_app, environ)
+
+        await send({
+            "type": "http.response.start",
+            "status": int(status.split(" ", 1)[0]),
+            "headers": [(name.lower().encode("latin-1"), value.encode("latin-1")) for name, value in headers],
+        })
+        await send({"type": "http.response.body", "body": body})
+
+    # ========== HELPERS ==========
+    def _is_read(self, environ) -> bool:
+        if environ["REQUEST_METHOD"] not in ("GET", "HEAD"):
+            return False
+        try:
+            endpoint, _ = self.read_app.url_map.bind_to_environ(environ).match()
+        except HTTPException:       # 404/405/redirects: let the WSGI app answer them
+            return False
+        return endpoint in READ_ENDPOINTS
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                # asyncpg connections belong to this loop; close them before it stops
+                await greenlet_spawn(self._dispose)
+                self._executor.shutdown(wait=False)
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    def _dispose(self):
+        with self.read_app.app_context():
+            db.engine.dispose()
+
+
+def create_asgi_app() -> ReadSplitApp:
+    read_app = create_app({
+        "SQLALCHEMY_DATABASE_URI": os.getenv("ASYNC_DATABASE_URL")
+        or async_database_url(wsgi_app.config["SQLALCHEMY_DATABASE_URI"]),
+        "DATABASE_REPLICA_URLS": [async_database_url(url) for url in wsgi_app.config["DATABASE_REPLICA_URLS"]],
+        "DB_POOL_SIZE": int(os.getenv("ASGI_POOL_SIZE", "10")),
+        "DB_MAX_OVERFLOW": int(os.getenv("ASGI_POOL_OVERFLOW", "10")),
+    })
+    return ReadSplitApp(read_app, wsgi_app, threads=int(os.getenv("ASGI_SYNC_THREADS", "8")))
+
+
+async def _read_body(receive) -> bytes:
+    chunks = []
+    while True:
+        message = await receive()
+        chunks.append(message.get("body", b""))
+        if not message.get("more_body"):
+            return b"".join(chunks)
+
+
+def _environ(scope, body: bytes) -> dict:
+    """PEP 3333 environ for an ASGI HTTP scope."""
+    server = scope.get("server") or ("localhost", 80)
+    client = scope.get("client") or ("", 0)
+    root_path = scope.get("root_path", "")
+    path = scope["path"]
+    if root_path and path.startswith(root_path):
+        path = path[len(root_path):]
+    environ = {
+        "REQUEST_METHOD": scope["method"],
+        "SCRIPT_NAME": root_path.encode().decode("latin-1"),
+        "PATH_INFO": path.encode().decode("latin-1"),
+        "QUERY_STRING": scope["query_string"].decode("latin-1"),
+        "SERVER_NAME": server[0],
+        "SERVER_PORT": str(server[1]),
+        "SERVER_PROTOCOL": f"HTTP/{scope['http_version']}",
+        "REMOTE_ADDR": client[0],
+        "REMOTE_PORT": str(client[1]),
+        "CONTENT_LENGTH": str(len(body)),
+        "wsgi.version": (1, 0),
+        "wsgi.url_scheme": scope.get("scheme", "http"),
+        "wsgi.input": io.BytesIO(body),
+        "wsgi.errors": sys.stderr,
+        "wsgi.multithread": True,
+        "wsgi.multiprocess": True,
+        "wsgi.run_once": False,
+    }
+    for name, value in scope["headers"]:
+        key = name.decode("latin-1").upper().replace("-", "_")
+        value = value.decode("latin-1")
+        if key == "CONTENT_LENGTH":
+            continue
+        if key != "CONTENT_TYPE":
+            key = "HTTP_" + key
+        environ[key] = f"{environ[key]},{value}" if key in environ else value
+    return environ
+
+
+def _call_wsgi(wsgi_app, environ):
+    """Run a WSGI app to completion; returns (status, headers, body)."""
+    started = {}
+
+    def start_response(status, headers, exc_info=None):
+        started["status"], started["headers"] = status, headers
+
+    chunks = wsgi_app(environ, start_response)
+    try:
+        body = b"".join(chunks)
+    finally:
+        if hasattr(chunks, "close"):
+            chunks.close()
+    return started["status"], started["headers"], body
+
+
+app = create_asgi_app()
@@ -0,0 +1,520 @@
+"""
+CineCritic — endpoint benchmark with recorded baselines.
+
+Boots create_app() against a local Postgres holding the fixed synthetic dataset
+below, then times every blueprint route through Flask's test client (no network,
+one request at a time) and reports p50/p95/p99 latency and throughput.
+Authenticated routes use JWTs minted in-process. Write routes run against
+fixture rows created for the run, with an unmeasured setup step before each
+request (e.g. re-creating the review that DELETE removes), and everything the
+run created is removed afterwards.
+
+    export DATABASE_URL=postgresql://localhost/cinecritic_bench
+    python -m bench.endpoints --prepare          # migrate + load the dataset (truncates!)
+    python -m bench.endpoints --save             # record bench/baselines/endpoints.json
+    python -m bench.endpoints                    # compare; exit 1 on regressions
+
+Baselines are machine-specific, so they are recorded locally (on the base
+branch, before comparing a change on the same machine) and not committed.
+
+A route regresses when its --metric (default p95) is more than --threshold
+(default 25%) and --min-delta-ms above the baseline. The response and profile
+caches are off unless --cache is passed, so the database path is what gets measured.
+
+    python -m bench.endpoints --check-budgets    # SQL statements per route vs @query_budget
+
+runs every scenario once instead and exits 1 if a route has no budget or
+goes over it; tests/test_query_budgets.py asserts the same under pytest.
+"""
+
+# Built-in imports
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable
+
+DEFAULT_BASELINE = Path(__file__).parent / "baselines" / "endpoints.json"
+METRICS = ("p50_ms", "p95_ms", "p99_ms")
+# the dataset baselines are recorded on; changing it invalidates stored baselines
+DATASET = dict(users=2_000, films=20_000, genres=20, reviews_per_film=10.0,
+               zipf_s=1.1, watchlist_mean=15.0, seed=1)
+
+
+@dataclass
+class Scenario:
+    name: str                           # e.g. "GET /films/<id>"
+    endpoint: str                       # Flask endpoint, used for the coverage check
+    request: Callable[[int], dict]      # iteration -> client.open() kwargs
+    setup: Callable[[int], None] | None = None     # unmeasured, before each request
+    status: int = 200
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark every API route against a fixed dataset.")
+    parser.add_argument("--database-url", default=os.getenv("DATABASE_URL"))
+    parser.add_argument("--prepare", action="store_true", help="migrate and (re)load the dataset first")
+    parser.add_argument("--requests", type=int, default=200, help="measured requests per route")
+    parser.add_argument("--warmup", type=int, default=20, help="unmeasured requests per route")
+    parser.add_argument("--only", help="only routes whose name contains this text")
+    parser.add_argument("--cache", action="store_true", help="leave the response and profile caches on")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument("--save", action="store_true", help="write results as the new baseline")
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed relative slowdown")
+    parser.add_argument("--min-delta-ms", type=float, default=0.5, help="ignore smaller slowdowns")
+    parser.add_argument("--metric", choices=METRICS, default="p95_ms")
+    parser.add_argument("--check-budgets", action="store_true",
+                        help="count SQL statements per route against its @query_budget instead")
+    args = parser.parse_args()
+
+    if not args.database_url:
+        parser.error("set DATABASE_URL or pass --database-url (a Postgres database you can truncate)")
+    # read by create_app(); must be set before main is imported
+    os.environ["DATABASE_URL"] = args.database_url
+    os.environ["RESPONSE_CACHE_ENABLED"] = "1" if args.cache else "0"
+    os.environ["PROFILE_CACHE_ENABLED"] = "1" if args.cache else "0"
+
+    from main import create_app
+    app = create_app()
+    with app.app_context():
+        if args.prepare:
+            prepare()
+        Fixtures.cleanup()
+        check_dataset()
+        fixtures = Fixtures.create()
+    try:
+        scenarios = build_scenarios(fixtures)
+        report_uncovered(app, scenarios)
+        if args.only:
+            scenarios = [s for s in scenarios if args.only in s.name]
+        # requests run outside any app context, like in production: an outer
+        # context would be reused by the test client and leak `g` between requests
+        if args.check_budgets:
+            problems = check_budgets(app, scenarios)
+        else:
+            results = run(app, scenarios, args.requests, args.warmup)
+    finally:
+        with app.app_context():
+            Fixtures.cleanup()
+
+    if args.check_budgets:
+        if problems:
+            raise SystemExit(f"{problems} route(s) over budget or without one.")
+        return
+
+    print_results(results)
+    meta = {
+        "dataset": DATASET,
+        "cache": args.cache,
+        "requests": args.requests,
+        "python": platform.python_version(),
+        "machine": platform.node(),
+        "recorded_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+    }
+    if args.save:
+        args.baseline.parent.mkdir(parents=True, exist_ok=True)
+        args.baseline.write_text(json.dumps({"meta": meta, "results": results}, indent=2) + "\n")
+        print(f"\nBaseline written to {args.baseline}")
+        return
+    if args.baseline.exists():
+        baseline = json.loads(args.baseline.read_text())
+        regressions = compare(baseline, results, meta, args)
+        if regressions:
+            raise SystemExit(f"{regressions} route(s) regressed beyond {args.threshold:.0%}.")
+    else:
+        print(f"\nNo baseline at {args.baseline}; run with --save to record one.")
+
+
+# ========== DATASET ==========
+def prepare():
+    from flask import current_app
+    from flask_migrate import upgrade
+    from extensions import db
+    from main import register_cli
+    from utils.synthetic import SyntheticConfig, generate
+
+    register_cli(current_app)   # Flask-Migrate is otherwise set up on first CLI use
+    upgrade()
+    db.session.execute(db.text("TRUNCATE users, films, genres RESTART IDENTITY CASCADE"))
+    print("Loading benchmark dataset ...")
+    generate(SyntheticConfig(**DATASET))
+    db.session.commit()
+    db.session.execute(db.text("ANALYZE"))
+    db.session.commit()
+
+
+def check_dataset():
+    from extensions import db
+    from models import Film, User
+
+    users = db.session.scalar(db.select(db.func.count()).select_from(User))
+    films = db.session.scalar(db.select(db.func.count()).select_from(Film))
+    if (users, films) != (DATASET["users"], DATASET["films"]):
+        raise SystemExit(
+            f"Database has {users} users / {films} films, expected the benchmark dataset "
+            f"({DATASET['users']} / {DATASET['films']}). Run with --prepare."
+        )
+
+
+class Fixtures:
+    """Rows the write routes work on, created for the run and removed after it."""
+
+    PREFIX = "bench-"
+
+    @classmethod
+    def create(cls):
+        from werkzeug.security import generate_password_hash
+        from extensions import db
+        from models import Film, Genre, User
+
+        self = cls()
+        self.password = "bench-password"
+        user = User(username=f"{cls.PREFIX}user", email="bench-user@example.test",
+                    password_hash=generate_password_hash(self.password))
+        film = Film(title=f"{cls.PREFIX}film", release_year=2000, director="Bench", description="Fixture")
+        genre = Genre(name=f"{cls.PREFIX}genre")
+        db.session.add_all([user, film, genre])
+        db.session.commit()
+        self.user_id, self.user_email = user.id, user.email
+        # an older format login upgrades to the configured method (cheap to make)
+        self.legacy_hash = generate_password_hash(self.password, "pbkdf2:sha256:1000")
+        self.film_id, self.genre_id = film.id, genre.id
+        self.admin_id = 1       # the synthetic dataset makes user 1 an admin
+        self.reader_id = 2
+        self.review_id = None
+        self.pending = {}       # ids made by one setup step for the request that follows
+
+        from flask_jwt_extended import create_access_token
+        self.admin_token = create_access_token(identity=str(self.admin_id), additional_claims={"role": "admin"})
+        self.reader_token = create_access_token(identity=str(self.reader_id), additional_claims={"role": "user"})
+        self.user_token = create_access_token(identity=str(self.user_id), additional_claims={"role": "user"})
+        return self
+
+    @classmethod
+    def cleanup(cls):
+        """Delete every row a run creates (also leftovers from an interrupted run)."""
+        from extensions import db
+        from models import Film, Genre, User
+
+        db.session.rollback()
+        like = f"{cls.PREFIX}%"
+        db.session.execute(db.delete(User).where(User.username.like(like)))
+        db.session.execute(db.delete(Film).where(Film.title.like(like)))
+        db.session.execute(db.delete(Genre).where(Genre.name.like(like)))
+        db.session.commit()
+
+    # ----- setup helpers (unmeasured) -----
+    def sql(self, statement, **params):
+        from extensions import db
+        result = db.session.execute(db.text(statement), params)
+        value = result.scalar() if result.returns_rows else None
+        db.session.commit()
+        return value
+
+    def reset_review(self, status="draft"):
+        """Make the fixture user's review of the fixture film exist with `status`."""
+        self.sql("DELETE FROM reviews WHERE user_id = :u AND film_id = :f", u=self.user_id, f=self.film_id)
+        self.review_id = self.sql(
+            "INSERT INTO reviews (film_id, user_id, rating, body, status, published_at) "
+            "VALUES (:f, :u, 3.5, 'Bench review.', :s, CASE WHEN :s = 'published' THEN now() END) "
+            "RETURNING id",
+            f=self.film_id, u=self.user_id, s=status,
+        )
+
+
+# ========== SCENARIOS ==========
+def build_scenarios(fx):
+    films, users = DATASET["films"], DATASET["users"]
+
+    def film(i):
+        return 1 + (i * 7919) % films      # walk the catalogue, hot and cold films alike
+
+    def auth(token):
+        return {"Authorization": f"Bearer {token}"}
+
+    def get(path, token=None):
+        return lambda i: {"method": "GET", "path": path(i), "headers": auth(token) if token else {}}
+
+    def send(method, path, token, body=None):
+        return lambda i: {"method": method, "path": path(i), "headers": auth(token),
+                          "json": body(i) if body else None}
+
+    def pending(key, statement, **params):
+        def setup(i):
+            fx.pending[key] = fx.sql(statement, i=i, **params)
+        return setup
+
+    def fresh_token(key, create):
+        # each refresh/logout revokes its token, so every request needs a new one
+        def setup(i):
+            fx.pending[key] = create(identity=str(fx.user_id), additional_claims={"role": "user"})
+        return setup
+
+    from flask_jwt_extended import create_access_token, create_refresh_token
+    fixed =lambda value: lambda i: value     # noqa: E731
+    review_path = lambda suffix="": lambda i: f"/films/{fx.film_id}/reviews/{fx.review_id}{suffix}"     # noqa: E731
+    link = dict(f=fx.film_id, g=fx.genre_id)
+    bulk = [film(k) for k in range(50)]     # a 50-film watchlist import
+    genre_sets = ([fx.genre_id, 1, 2], [fx.genre_id, 3])
+
+    return [
+        # ----- auth -----
+        Scenario("POST /auth/register", "auth.register", lambda i: {
+            "method": "POST", "path": "/auth/register",
+            "json": {"username": f"bench-reg-{i}", "email": f"bench-reg-{i}@example.test", "password": "secret123"},
+        }, setup=lambda i: fx.sql("DELETE FROM users WHERE username = :n", n=f"bench-reg-{i}"), status=201),
+        Scenario("POST /auth/login", "auth.login", lambda i: {
+            "method": "POST", "path": "/auth/login", "json": {"email": fx.user_email, "password": fx.password},
+        }),
+        Scenario("POST /auth/login (rehash)", "auth.login", lambda i: {
+            "method": "POST", "path": "/auth/login", "json": {"email": fx.user_email, "password": fx.password},
+        }, setup=lambda i: fx.sql("UPDATE users SET password_hash = :h WHERE id = :u",
+                                  h=fx.legacy_hash, u=fx.user_id)),
+        Scenario("POST /auth/refresh", "auth.refresh",
+                 lambda i: {"method": "POST", "path": "/auth/refresh", "headers": auth(fx.pending["refresh"])},
+                 setup=fresh_token("refresh", create_refresh_token)),
+        Scenario("POST /auth/logout", "auth.logout",
+                 lambda i: {"method": "POST", "path": "/auth/logout", "headers": auth(fx.pending["access"])},
+                 setup=fresh_token("access", create_access_token), status=204),
+        Scenario("GET /auth/me", "auth.me", get(fixed("/auth/me"), fx.reader_token)),
+        Scenario("GET /auth/users", "auth.list_users", get(fixed("/auth/users"), fx.admin_token)),
+        Scenario("DELETE /auth/users/<id>", "auth.delete_user",
+                 send("DELETE", lambda i: f"/auth/users/{fx.pending['user']}", fx.admin_token),
+                 setup=pending("user", "INSERT INTO users (username, email, password_hash, role) "
+                                       "VALUES ('bench-del-' || :i, 'bench-del-' || :i || '@example.test', 'x', 'user') "
+                                       "RETURNING id")),
+        # ----- films -----
+        Scenario("GET /films", "films.list_films", get(fixed("/films"))),
+        Scenario("GET /films?page=50", "films.list_films", get(fixed("/films?page=50"))),
+        Scenario("GET /films?title=", "films.list_films", get(fixed("/films?title=harbor"))),
+        Scenario("GET /films?genre_id=", "films.list_films", get(lambda i: f"/films?genre_id={1 + i % 5}")),
+        Scenario("GET /films?sort=relevance", "films.list_films", get(fixed("/films?title=silent&sort=relevance"))),
+        Scenario("GET /films/<id>", "films.get_film", get(lambda i: f"/films/{film(i)}")),
+        Scenario("POST /films/batch", "films.batch_films", lambda i: {
+            "method": "POST", "path": "/films/batch", "json": {"ids": [film(i * 50 + k) for k in range(50)]},
+        }),
+        Scenario("POST /films", "films.create_film", send(
+            "POST", fixed("/films"), fx.admin_token,
+            lambda i: {"title": f"bench-new-{i}", "release_year": 2001, "director": "Bench"},
+        ), setup=lambda i: fx.sql("DELETE FROM films WHERE title = :t", t=f"bench-new-{i}"), status=201),
+        Scenario("PATCH /films/<id>", "films.update_film", send(
+            "PATCH", lambda i: f"/films/{fx.film_id}", fx.admin_token, lambda i: {"description": f"Fixture {i}"},
+        )),
+        Scenario("DELETE /films/<id>", "films.delete_film",
+                 send("DELETE", lambda i: f"/films/{fx.pending['film']}", fx.admin_token),
+                 setup=pending("film", "INSERT INTO films (title, release_year) VALUES ('bench-del-' || :i, 2000) "
+                                       "RETURNING id"), status=204),
+        Scenario("GET /films/<id>/genres", "films.list_film_genres", get(lambda i: f"/films/{film(i)}/genres")),
+        Scenario("POST /films/<id>/genres/<id>", "films.attach_genre", send(
+            "POST", fixed(f"/films/{fx.film_id}/genres/{fx.genre_id}"), fx.admin_token,
+        ), setup=lambda i: fx.sql("DELETE FROM film_genres WHERE film_id = :f AND genre_id = :g", **link), status=204),
+        Scenario("DELETE /films/<id>/genres/<id>", "films.detach_genre", send(
+            "DELETE", fixed(f"/films/{fx.film_id}/genres/{fx.genre_id}"), fx.admin_token,
+        ), setup=lambda i: fx.sql("INSERT INTO film_genres VALUES (:f, :g) ON CONFLICT DO NOTHING", **link),
+           status=204),
+        # alternate between two genre sets so every request changes links
+        Scenario("PUT /films/<id>/genres", "films.replace_film_genres", send(
+            "PUT", fixed(f"/films/{fx.film_id}/genres"), fx.admin_token,
+            lambda i: {"genre_ids": genre_sets[i % 2]},
+        )),
+        Scenario("PUT /films/genres", "films.replace_genre_sets", send(
+            "PUT", fixed("/films/genres"), fx.admin_token,
+            lambda i: {"films": [{"film_id": fx.film_id, "genre_ids": genre_sets[i % 2]}]},
+        )),
+        # ----- genres -----
+        Scenario("GET /genres", "genres.list_genres", get(fixed("/genres"))),
+        Scenario("POST /genres", "genres.create_genre", send(
+            "POST", fixed("/genres"), fx.admin_token, lambda i: {"name": f"bench-new-{i}"},
+        ), setup=lambda i: fx.sql("DELETE FROM genres WHERE name = :n", n=f"bench-new-{i}"), status=201),
+        Scenario("DELETE /genres/<id>", "genres.delete_genre",
+                 send("DELETE", lambda i: f"/genres/{fx.pending['genre']}", fx.admin_token),
+                 setup=pending("genre", "INSERT INTO genres (name) VALUES ('bench-del-' || :i) RETURNING id"),
+                 status=204),
+        # ----- reviews -----
+        Scenario("GET /reviews", "reviews_feed.list_all_reviews", get(fixed("/reviews"))),
+        Scenario("GET /reviews?page=50", "reviews_feed.list_all_reviews", get(fixed("/reviews?page=50"))),
+        Scenario("GET /reviews?cursor=", "reviews_feed.list_all_reviews", get(fixed("/reviews?cursor="))),
+        Scenario("GET /reviews?user_id=", "reviews_feed.list_all_reviews",
+                 get(lambda i: f"/reviews?user_id={1 + i % users}")),
+        Scenario("POST /reviews/batch", "reviews_feed.batch_reviews", lambda i: {
+            "method": "POST", "path": "/reviews/batch", "headers": auth(fx.reader_token),
+            "json": {"ids": [1 + (i * 50 + k) * 7919 % (films * 5) for k in range(50)]},
+        }),
+        Scenario("GET /films/<id>/reviews", "reviews.list_reviews", get(lambda i: f"/films/{film(i)}/reviews")),
+        Scenario("POST /films/<id>/reviews", "reviews.create_review", send(
+            "POST", fixed(f"/films/{fx.film_id}/reviews"), fx.user_token,
+            fixed({"rating": 4.0, "body": "Bench review.", "status": "draft"}),
+        ), setup=lambda i: fx.sql("DELETE FROM reviews WHERE user_id = :u AND film_id = :f",
+                                  u=fx.user_id, f=fx.film_id), status=201),
+        Scenario("GET /films/<id>/reviews/<id>", "reviews.get_review", get(review_path(), fx.user_token),
+                 setup=lambda i: fx.reset_review("published") if i == 0 else None),
+        Scenario("PATCH /films/<id>/reviews/<id>", "reviews.update_review", send(
+            "PATCH", review_path(), fx.user_token, lambda i: {"body": f"Edited {i}."},
+        ), setup=lambda i: fx.reset_review() if i == 0 else None),
+        Scenario("DELETE /films/<id>/reviews/<id>", "reviews.delete_review",
+                 send("DELETE", review_path(), fx.user_token), setup=lambda i: fx.reset_review(), status=204),
+        Scenario("POST /films/<id>/reviews/<id>/publish", "reviews.publish_review",
+                 send("POST", review_path("/publish"), fx.user_token), setup=lambda i: fx.reset_review("draft")),
+        Scenario("POST /films/<id>/reviews/<id>/flag", "reviews.flag_review",
+                 send("POST", review_path("/flag"), fx.reader_token), setup=lambda i: fx.reset_review("published")),
+        # ----- watchlist -----
+        Scenario("GET /users/me/watchlist", "watchlist.list_watchlist", get(fixed("/users/me/watchlist"), fx.reader_token)),
+        Scenario("GET /users/me/watchlist?cursor=", "watchlist.list_watchlist",
+                 get(fixed("/users/me/watchlist?cursor="), fx.reader_token)),
+        Scenario("POST /users/me/watchlist", "watchlist.add_to_watchlist", send(
+            "POST", fixed("/users/me/watchlist"), fx.user_token, fixed({"film_id": fx.film_id}),
+        ), setup=lambda i: fx.sql("DELETE FROM watchlist WHERE user_id = :u AND film_id = :f",
+                                  u=fx.user_id, f=fx.film_id), status=201),
+        Scenario("DELETE /users/me/watchlist/<id>", "watchlist.remove_from_watchlist",
+                 send("DELETE", fixed(f"/users/me/watchlist/{fx.film_id}"), fx.user_token),
+                 setup=lambda i: fx.sql("INSERT INTO watchlist (user_id, film_id) VALUES (:u, :f) "
+                                        "ON CONFLICT DO NOTHING", u=fx.user_id, f=fx.film_id),
+                 status=204),
+        Scenario("POST /users/me/watchlist/bulk", "watchlist.bulk_add_to_watchlist", send(
+            "POST", fixed("/users/me/watchlist/bulk"), fx.user_token, fixed({"film_ids": bulk}),
+        ), setup=lambda i: fx.sql("DELETE FROM watchlist WHERE user_id = :u", u=fx.user_id)),
+        Scenario("DELETE /users/me/watchlist/bulk", "watchlist.bulk_remove_from_watchlist", send(
+            "DELETE", fixed("/users/me/watchlist/bulk"), fx.user_token, fixed({"film_ids": bulk}),
+        ), setup=lambda i: fx.sql("INSERT INTO watchlist (user_id, film_id) SELECT :u, unnest(:ids) "
+                                  "ON CONFLICT DO NOTHING", u=fx.user_id, ids=bulk)),
+    ]
+
+
+def uncovered_endpoints(app, scenarios) -> list:
+    """Blueprint endpoints no scenario exercises."""
+    covered = {s.endpoint for s in scenarios}
+    routes = {rule.endpoint for rule in app.url_map.iter_rules() if "." in rule.endpoint}
+    return sorted(routes - covered - {"static"})
+
+
+def report_uncovered(app, scenarios):
+    missing = uncovered_endpoints(app, scenarios)
+    if missing:
+        print(f"warning: no benchmark scenario for {', '.join(missing)}", file=sys.stderr)
+
+
+# ========== RUN & REPORT ==========
+def run(app, scenarios, requests, warmup) -> dict:
+    client = app.test_client()
+    results = {}
+    for scenario in scenarios:
+        timings = []
+        started = time.perf_counter()
+        for i in range(warmup + requests):
+            if scenario.setup is not None:
+                with app.app_context():
+                    scenario.setup(i)
+            kwargs = scenario.request(i)
+            t0 = time.perf_counter()
+            response = client.open(**kwargs)
+            elapsed = time.perf_counter() - t0
+            if response.status_code != scenario.status:
+                raise SystemExit(f"{scenario.name}: expected {scenario.status}, got "
+                                 f"{response.status_code} {response.get_data(as_text=True)[:200]}")
+            if i >= warmup:
+                timings.append(elapsed)
+        timings.sort()
+        results[scenario.name] = {
+            "p50_ms": round(_percentile(timings, 50) * 1e3, 3),
+            "p95_ms": round(_percentile(timings, 95) * 1e3, 3),
+            "p99_ms": round(_percentile(timings, 99) * 1e3, 3),
+            "rps": round(len(timings) / sum(timings), 1),
+            "requests": len(timings),
+        }
+        print(f"  {scenario.name} ({time.perf_counter() - started:.1f}s)", file=sys.stderr)
+    return results
+
+
+def count_statements(app, scenarios):
+    """Run each scenario once; yields (scenario, response, SQL statements it ran, its @query_budget or None)."""
+    from sqlalchemy import event
+    from sqlalchemy.engine import Engine
+
+    counting = [False, 0]
+
+    def count(*_):
+        if counting[0]:
+            counting[1] += 1
+
+    event.listen(Engine, "after_cursor_execute", count)
+    client = app.test_client()
+    # the revocation denylist syncs every few seconds, not per request; keep it out of the counts
+    app.extensions["token_denylist"]._next_sync = float("inf")
+    try:
+        for scenario in scenarios:
+            if scenario.setup is not None:
+                with app.app_context():
+                    scenario.setup(0)
+            counting[:] = [True, 0]
+            response = client.open(**scenario.request(0))
+            counting[0] = False
+            budget = getattr(app.view_functions[scenario.endpoint], "query_budget", None)
+            yield scenario, response, counting[1], budget
+    finally:
+        event.remove(Engine, "after_cursor_execute", count)
+
+
+def check_budgets(app, scenarios) -> int:
+    """Print each route's SQL statement count next to its budget; returns the number of problems."""
+    problems = 0
+    width = max((len(s.name) for s in scenarios), default=10)
+    print(f"{'route':<{width}} {'queries':>7} {'budget':>6}")
+    for scenario, response, used, budget in count_statements(app, scenarios):
+        if response.status_code != scenario.status:
+            raise SystemExit(f"{scenario.name}: expected {scenario.status}, got "
+                             f"{response.status_code} {response.get_data(as_text=True)[:200]}")
+        flag = ""
+        if budget is None:
+            flag = "  NO BUDGET"
+        elif used > budget:
+            flag = "  OVER"
+        problems += bool(flag)
+        print(f"{scenario.name:<{width}} {used:>7} {budget if budget is not None else '-':>6}{flag}")
+    return problems
+
+
+def print_results(results):
+    width = max(map(len, results), default=10)
+    print(f"{'route':<{width}} {'p50':>9} {'p95':>9} {'p99':>9} {'req/s':>9}")
+    for name, r in results.items():
+        print(f"{name:<{width}} {r['p50_ms']:>7.2f}ms {r['p95_ms']:>7.2f}ms {r['p99_ms']:>7.2f}ms {r['rps']:>9.1f}")
+
+
+def compare(baseline, results, meta, args) -> int:
+    """Print the comparison against `baseline`; returns the number of regressions."""
+    recorded = baseline.get("meta", {})
+    # timings only compare on the same machine (baselines are recorded locally)
+    for key in ("dataset", "cache", "machine", "python"):
+        if recorded.get(key) != meta[key]:
+            print(f"\nwarning: baseline was recorded with a different {key}: {recorded.get(key)}")
+
+    regressions = 0
+    print(f"\nvs baseline ({recorded.get('recorded_at', '?')}, {args.metric}):")
+    for name, r in results.items():
+        old = baseline.get("results", {}).get(name)
+        if old is None:
+            print(f"  NEW   {name}")
+            continue
+        before, after = old[args.metric], r[args.metric]
+        change = (after - before) / before if before else 0.0
+        if change > args.threshold and after - before > args.min_delta_ms:
+            regressions += 1
+            print(f"  SLOW  {name}: {before:.2f}ms -> {after:.2f}ms ({change:+.0%})")
+        elif change < -args.threshold and before - after > args.min_delta_ms:
+            print(f"  FAST  {name}: {before:.2f}ms -> {after:.2f}ms ({change:+.0%})")
+    return regressions
+
+
+def _percentile(sorted_values, pct):
+    # nearest-rank
+    index = max(0, min(len(sorted_values) - 1, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,255 @@
+"""
+CineCritic — concurrent load test of the public read routes, gunicorn vs asgi.py.
+
+Starts each server in turn on a local port against DATABASE_URL (the
+bench.endpoints dataset), drives it with --concurrency keep-alive HTTP clients
+for --duration seconds over a fixed mix of the routes in asgi.READ_ENDPOINTS,
+and prints throughput and latency per server:
+
+    export DATABASE_URL=postgresql://localhost/cinecritic_bench
+    python -m bench.load --workers 2 --concurrency 64 --duration 20
+
+Servers compared: gunicorn with sync workers (what bin/start.sh runs today),
+gunicorn with threaded workers, and uvicorn serving asgi:app. Every server gets
+the same number of worker processes. The response cache is off unless --cache
+is passed, so each request reaches the database.
+
+A local database answers in microseconds; a managed one is a network round trip
+away. --db-latency-ms N puts a proxy in front of Postgres that delays traffic by
+N ms each way, which is where waiting on the database (and not CPU) decides
+how many requests a worker can serve at once.
+"""
+
+# Built-in imports
+import argparse
+import asyncio
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+
+# Installed imports
+from sqlalchemy.engine import make_url
+
+# Local imports
+from bench.endpoints import DATASET, _percentile
+
+SERVERS = {
+    "gunicorn-sync": ["gunicorn", "main:app", "--workers", "{workers}", "--bind", "127.0.0.1:{port}"],
+    "gunicorn-gthread": ["gunicorn", "main:app", "--workers", "{workers}", "--threads", "{threads}",
+                         "--bind", "127.0.0.1:{port}"],
+    "uvicorn-asgi": ["uvicorn", "asgi:app", "--workers", "{workers}", "--host", "127.0.0.1", "--port", "{port}",
+                     "--no-access-log"],
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the public read routes on gunicorn and asgi.py.")
+    parser.add_argument("--database-url", default=os.getenv("DATABASE_URL"))
+    parser.add_argument("--servers", default=",".join(SERVERS), help="comma-separated subset of " + ", ".join(SERVERS))
+    parser.add_argument("--workers", type=int, default=2, help="worker processes per server")
+    parser.add_argument("--threads", type=int, default=8, help="threads per gunicorn-gthread worker")
+    parser.add_argument("--concurrency", type=int, default=64, help="simultaneous client connections")
+    parser.add_argument("--duration", type=float, default=20.0, help="measured seconds per server")
+    parser.add_argument("--warmup", type=float, default=3.0, help="unmeasured seconds per server")
+    parser.add_argument("--cache", action="store_true", help="leave the response cache on")
+    parser.add_argument("--db-latency-ms", type=float, default=0.0,
+                        help="delay database traffic by this much each way (simulated network)")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    if not args.database_url:
+        raise SystemExit("set DATABASE_URL or pass --database-url")
+
+    if args.db_latency_ms:
+        args.database_url = start_latency_proxy(args.database_url, args.db_latency_ms / 1e3)
+
+    results = {}
+    for name in args.servers.split(","):
+        if name not in SERVERS:
+            raise SystemExit(f"unknown server {name!r}")
+        print(f"  {name}...", file=sys.stderr)
+        results[name] = run_server(name, args)
+    print_results(results, args)
+
+
+def run_server(name, args) -> dict:
+    port = _free_port()
+    command = [part.format(workers=args.workers, threads=args.threads, port=port) for part in SERVERS[name]]
+    env = dict(os.environ, DATABASE_URL=args.database_url,
+               RESPONSE_CACHE_ENABLED="1" if args.cache else "0", METRICS_ENABLED="0")
+    log = tempfile.TemporaryFile()
+    server = subprocess.Popen(command, env=env, stdout=subprocess.DEVNULL, stderr=log)
+    try:
+        _wait_until_up(server, port, log)
+        return asyncio.run(drive(port, args))
+    finally:
+        server.terminate()
+        try:
+            server.wait(timeout=15)
+        except subprocess.TimeoutExpired:
+            server.kill()
+        log.close()
+
+
+async def drive(port, args) -> dict:
+    rng = random.Random(args.seed)
+    timings, errors = [], [0]
+    started = time.perf_counter()
+    measure_from = started + args.warmup
+    stop_at = measure_from + args.duration
+
+    async def client():
+        connection = None
+        while time.perf_counter() < stop_at:
+            path = _pick_path(rng)
+            begin = time.perf_counter()
+            try:
+                if connection is None:
+                    connection = await asyncio.open_connection("127.0.0.1", port)
+                status, keep_alive = await _get(*connection, path)
+            except (OSError, asyncio.IncompleteReadError):
+                status, keep_alive = None, False
+            end = time.perf_counter()
+            if not keep_alive and connection is not None:
+                connection[1].close()
+                connection = None
+            if begin >= measure_from:
+                if status == 200:
+                    timings.append(end - begin)
+                else:
+                    errors[0] += 1
+        if connection is not None:
+            connection[1].close()
+
+    await asyncio.gather(*(client() for _ in range(args.concurrency)))
+    timings.sort()
+    if not timings:
+        return {"rps": 0.0, "p50_ms": 0.0, "p95_ms": 0.0, "p99_ms": 0.0, "errors": errors[0]}
+    return {
+        "rps": round(len(timings) / args.duration, 1),
+        "p50_ms": round(_percentile(timings, 50) * 1e3, 2),
+        "p95_ms": round(_percentile(timings, 95) * 1e3, 2),
+        "p99_ms": round(_percentile(timings, 99) * 1e3, 2),
+        "errors": errors[0],
+    }
+
+
+def print_results(results, args):
+    print(f"\n{args.workers} workers, {args.concurrency} connections, {args.duration:g}s per server, "
+          f"cache {'on' if args.cache else 'off'}, +{args.db_latency_ms:g}ms database latency each way")
+    width = max(map(len, results), default=10)
+    print(f"{'server':<{width}} {'req/s':>9} {'p50':>9} {'p95':>9} {'p99':>9} {'errors':>7}")
+    for name, r in results.items():
+        print(f"{name:<{width}} {r['rps']:>9.1f} {r['p50_ms']:>7.2f}ms {r['p95_ms']:>7.2f}ms "
+              f"{r['p99_ms']:>7.2f}ms {r['errors']:>7}")
+
+
+def start_latency_proxy(database_url: str, delay: float) -> str:
+    """Serve a delaying TCP proxy to the database from a background thread; returns the URL to use instead."""
+    url = make_url(database_url)
+    socket_dir = url.query.get("host")
+    if socket_dir:         # ?host=/path: Unix socket
+        upstream = {"path": os.path.join(socket_dir, f".s.PGSQL.{url.port or 5432}")}
+    else:
+        upstream = {"host": url.host or "localhost", "port": url.port or 5432}
+    port = _free_port()
+
+    async def pipe(reader, writer):
+        # each chunk is released `delay` after it arrived: latency, not a bandwidth cap
+        queue = asyncio.Queue()
+
+        async def release():
+            while (item := await queue.get()) is not None:
+                arrived, data = item
+                await asyncio.sleep(max(0.0, arrived + delay - time.monotonic()))
+                writer.write(data)
+                await writer.drain()
+            writer.close()
+
+        releasing = asyncio.create_task(release())
+        try:
+            while data := await reader.read(65536):
+                queue.put_nowait((time.monotonic(), data))
+        except OSError:
+            pass
+        queue.put_nowait(None)
+        await releasing
+
+    async def handle(client_reader, client_writer):
+        if "path" in upstream:
+            server_reader, server_writer = await asyncio.open_unix_connection(upstream["path"])
+        else:
+            server_reader, server_writer = await asyncio.open_connection(upstream["host"], upstream["port"])
+        await asyncio.gather(pipe(client_reader, server_writer), pipe(server_reader, client_writer),
+                             return_exceptions=True)
+
+    async def serve(ready):
+        await asyncio.start_server(handle, "127.0.0.1", port)
+        ready.set()
+        await asyncio.Event().wait()
+
+    ready = threading.Event()
+    threading.Thread(target=lambda: asyncio.run(serve(ready)), daemon=True).start()
+    ready.wait()
+    query = {key: value for key, value in url.query.items() if key != "host"}
+    return url.set(host="127.0.0.1", port=port, query=query).render_as_string(hide_password=False)
+
+
+# ========== HELPERS ==========
+def _pick_path(rng) -> str:
+    """One request from the mix: mostly film pages and details, then reviews and genres."""
+    film_id = rng.randint(1, DATASET["films"])
+    return rng.choices(
+        [
+            f"/films?page={rng.randint(1, 50)}",
+            f"/films/{film_id}",
+            f"/films/{film_id}/reviews",
+            f"/reviews?page={rng.randint(1, 50)}",
+            "/genres",
+        ],
+        weights=[3, 4, 2, 2, 1],
+    )[0]
+
+
+async def _get(reader, writer, path):
+    """Send one GET and read the response; returns (status, connection still usable)."""
+    writer.write(f"GET {path} HTTP/1.1\r\nHost: 127.0.0.1\r\n\r\n".encode())
+    head = await reader.readuntil(b"\r\n\r\n")
+    lines = head.decode("latin-1").split("\r\n")
+    status = int(lines[0].split(" ", 2)[1])
+    headers = {}
+    for line in lines[1:]:
+        if line:
+            name, _, value = line.partition(":")
+            headers[name.strip().lower()] = value.strip()
+    await reader.readexactly(int(headers.get("content-length", 0)))
+    return status, headers.get("connection", "").lower() != "close"
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _wait_until_up(server, port, log, timeout=30.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            log.seek(0)
+            raise SystemExit(f"server exited early:\n{log.read().decode()[-2000:]}")
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/healthz", timeout=1):
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise SystemExit("server did not come up")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""
+CineCritic — serializer benchmark.
+
+Times one 100-item page of each list payload both ways:
+
+- baseline: marshmallow `schema.dump` + Flask's stdlib JSON provider
+- fast: utils.serializers.compile_dump + FastJSONProvider (orjson)
+
+and checks that both produce exactly the same response bytes. Runs on
+in-memory model objects, so no database is needed:
+
+    python -m bench.serializers [--items 100] [--repeat 200]
+"""
+
+# Built-in imports
+import argparse
+import time
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+# Installed imports
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+
+# Local imports
+from models.film_rating_stats import FilmRatingStats, BUCKET_COLUMNS
+from models.films import Film
+from models.genres import Genre
+from models.reviews import Review
+from models.watchlist import Watchlist
+import schemas.films_schema as films_schema
+from schemas.films_schema import FilmRatingStatsSchema, FilmSchema
+from schemas.genres_schema import GenreSchema
+from schemas.reviews_schema import ReviewSchema
+from schemas.watchlist_schema import WatchlistEntrySchema
+from utils.json_provider import FastJSONProvider, orjson
+from utils.serializers import compile_dump
+
+EPOCH = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+def make_films(n):
+    films = []
+    for i in range(1, n + 1):
+        film = Film(
+            id=i, title=f"Film {i}: the sequel", release_year=1950 + i % 75,
+            director=f"Director {i % 40}", description="A film about things. " * 8,
+        )
+        if i % 5:   # some films have no published reviews yet
+            buckets = {col: (i * (k + 1)) % 7 for k, col in enumerate(BUCKET_COLUMNS)}
+            count = sum(buckets.values())
+            total = sum(Decimal(k + 1) / 2 * v for k, v in enumerate(buckets.values()))
+            film.rating_stats = FilmRatingStats(
+                film_id=i, review_count=count, rating_sum=total,
+                rating_mean=round(total / count, 2) if count else None, **buckets,
+            )
+        films.append(film)
+    return films
+
+
+def make_reviews(films):
+    reviews = []
+    for i, film in enumerate(films, start=1):
+        created = EPOCH + timedelta(minutes=i)
+        published = i % 4 != 0
+        reviews.append(Review(
+            id=i, rating=Decimal(i % 10 + 1) / 2, body="Loved it, mostly. " * 10,
+            status="published" if published else "draft", film_id=film.id, user_id=i % 13 + 1,
+            created_at=created, updated_at=created + timedelta(seconds=30),
+            published_at=created if published else None, flagged_at=None, film=film,
+        ))
+    return reviews
+
+
+def make_watchlist(films):
+    return [
+        Watchlist(user_id=1, film_id=film.id, added_at=EPOCH + timedelta(hours=i), film=film)
+        for i, film in enumerate(films)
+    ]
+
+
+def time_call(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--items", type=int, default=100, help="items per page")
+    parser.add_argument("--repeat", type=int, default=200, help="timing runs (best is kept)")
+    args = parser.parse_args()
+
+    app = Flask(__name__)
+    stdlib = DefaultJSONProvider(app)
+    fast = FastJSONProvider(app)
+    stdlib.sort_keys = fast.sort_keys = False
+
+    # FilmSchema's nested stats are compiled too; undo that for the baseline
+    marshmallow_stats = FilmRatingStatsSchema().dump
+    compiled_stats = films_schema._dump_rating_stats
+
+    films = make_films(args.items)
+    payloads = [
+        ("films", FilmSchema(many=True), films),
+        ("reviews", ReviewSchema(many=True), make_reviews(films)),
+        ("watchlist", WatchlistEntrySchema(many=True), make_watchlist(films)),
+        ("genres", GenreSchema(many=True), [Genre(id=i, name=f"Genre {i}") for i in range(1, args.items + 1)]),
+    ]
+
+    print(f"{args.items} items/page, best of {args.repeat}; orjson {'on' if orjson else 'not installed'}")
+    print(f"{'payload':<10} {'baseline':>10} {'fast':>10} {'speedup':>8}  bytes")
+    for name, schema, items in payloads:
+        dump = compile_dump(schema)
+
+        def baseline():
+            films_schema._dump_rating_stats = marshmallow_stats
+            try:
+                return stdlib.response({"data": schema.dump(items)}).get_data()
+            finally:
+                films_schema._dump_rating_stats = compiled_stats
+
+        def compiled():
+            return fast.response({"data": dump(items)}).get_data()
+
+        body = baseline()
+        if compiled() != body:
+            raise SystemExit(f"{name}: compiled output differs from marshmallow")
+
+        slow_s, fast_s = time_call(baseline, args.repeat), time_call(compiled, args.repeat)
+        print(f"{name:<10} {slow_s * 1e3:>8.2f}ms {fast_s * 1e3:>8.2f}ms {slow_s / fast_s:>7.1f}x  {len(body)} identical")
+
+
+if __name__ == "__main__":
+    main()
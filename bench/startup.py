@@ -0,0 +1,94 @@
+"""
+CineCritic — cold-start timing: how long a deploy takes from start to the first /healthz.
+
+Times, against DATABASE_URL (already migrated, as on every deploy but the first):
+
+- `import main` in a fresh interpreter, which each gunicorn worker, `flask`
+  command and asgi.py pays
+- each step of bin/start.sh as separate processes, and the whole sequence up
+  to gunicorn answering /healthz, for the steps the script used to run on
+  every boot (`flask db upgrade`, `flask ops seed`) and for what it runs now
+  (bin/check_migrations.py, seeding only with SEED_DEMO_DATA=1)
+
+    export DATABASE_URL=postgresql://localhost/cinecritic_bench
+    python -m bench.startup --repeat 5
+
+Each figure is the median of --repeat runs.
+"""
+
+# Built-in imports
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+# Local imports
+from bench.load import _free_port, _wait_until_up
+
+IMPORT_MAIN = [sys.executable, "-c", "import main"]
+STEPS = {
+    "flask db upgrade": ["flask", "db", "upgrade"],
+    "flask ops seed": ["flask", "ops", "seed"],
+    "check_migrations.py": [sys.executable, "bin/check_migrations.py"],
+}
+SEQUENCES = {
+    "before (upgrade + seed + gunicorn)": ["flask db upgrade", "flask ops seed"],
+    "now (check + gunicorn)": ["check_migrations.py"],
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time CineCritic's cold start and deploy steps.")
+    parser.add_argument("--database-url", default=os.getenv("DATABASE_URL"))
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    if not args.database_url:
+        raise SystemExit("set DATABASE_URL or pass --database-url")
+    env = dict(os.environ, DATABASE_URL=args.database_url, FLASK_APP="main", METRICS_ENABLED="0")
+
+    rows = {"import main": _median(args.repeat, lambda: _run(IMPORT_MAIN, env))}
+    for name, command in STEPS.items():
+        rows[name] = _median(args.repeat, lambda: _run(command, env))
+    for name, steps in SEQUENCES.items():
+        rows[name] = _median(args.repeat, lambda: _deploy(steps, env))
+
+    width = max(map(len, rows))
+    print(f"{'step':<{width}} {'median':>9}")
+    for name, seconds in rows.items():
+        print(f"{name:<{width}} {seconds * 1e3:>7.0f}ms")
+
+
+def _deploy(steps, env) -> float:
+    """Run `steps` one after another, then gunicorn; returns seconds until /healthz answers."""
+    started = time.perf_counter()
+    for name in steps:
+        _run(STEPS[name], env)
+    port = _free_port()
+    log = tempfile.TemporaryFile()
+    server = subprocess.Popen(["gunicorn", "main:app", "--bind", f"127.0.0.1:{port}"],
+                              env=env, stdout=subprocess.DEVNULL, stderr=log)
+    try:
+        _wait_until_up(server, port, log)
+        return time.perf_counter() - started
+    finally:
+        server.terminate()
+        server.wait(timeout=15)
+        log.close()
+
+
+# ========== HELPERS ==========
+def _run(command, env) -> float:
+    started = time.perf_counter()
+    subprocess.run(command, env=env, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return time.perf_counter() - started
+
+
+def _median(repeat, measure) -> float:
+    return statistics.median(measure() for _ in range(repeat))
+
+
+if __name__ == "__main__":
+    main()
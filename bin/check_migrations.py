@@ -0,0 +1,77 @@
+#!/usr/bin/env python
+"""
+Exit 0 if the database behind DATABASE_URL is at the Alembic head, 1 if not.
+
+bin/start.sh runs this before `flask db upgrade`, which boots the whole app
+and Alembic just to find out there is nothing to do. Here the heads come from
+the revision ids in migrations/versions/*.py, parsed without importing
+anything, and the database is asked once (SELECT version_num FROM
+alembic_version) over a single psycopg2 connection. A database without an
+alembic_version table counts as behind; one that can't be reached fails the
+check, so the upgrade runs and reports the real error.
+"""
+
+# Built-in imports
+import ast
+import os
+import sys
+from contextlib import closing
+from pathlib import Path
+
+# Installed imports
+import psycopg2
+from dotenv import load_dotenv
+
+VERSIONS = Path(__file__).resolve().parent.parent / "migrations" / "versions"
+
+
+def script_heads(versions=VERSIONS) -> set:
+    """Revision ids no other migration names as its down_revision."""
+    revisions, parents = set(), set()
+    for path in versions.glob("*.py"):
+        assigned = {}
+        for node in ast.parse(path.read_text()).body:
+            if isinstance(node, ast.Assign) and len(node.targets) == 1 and isinstance(node.targets[0], ast.Name):
+                if node.targets[0].id in ("revision", "down_revision"):
+                    assigned[node.targets[0].id] = ast.literal_eval(node.value)
+        if "revision" not in assigned:
+            continue
+        revisions.add(assigned["revision"])
+        down = assigned.get("down_revision")
+        parents.update(down if isinstance(down, (tuple, list)) else [down] if down else [])
+    return revisions - parents
+
+
+def database_heads(url: str) -> set:
+    """The revision ids stamped in alembic_version (empty if the table doesn't exist yet)."""
+    scheme, sep, rest = url.partition("://")
+    dsn = scheme.split("+")[0] + sep + rest     # libpq doesn't know SQLAlchemy's "+driver"
+    with closing(psycopg2.connect(dsn)) as conn, conn.cursor() as cur:
+        cur.execute("SELECT to_regclass('alembic_version') IS NOT NULL")
+        if not cur.fetchone()[0]:
+            return set()
+        cur.execute("SELECT version_num FROM alembic_version")
+        return {row[0] for row in cur.fetchall()}
+
+
+def main() -> int:
+    load_dotenv()
+    url = os.getenv("DATABASE_URL")
+    if not url:
+        print("migration check failed: DATABASE_URL is not set", file=sys.stderr)
+        return 1
+    expected = script_heads()
+    try:
+        current = database_heads(url)
+    except psycopg2.Error as exc:
+        print(f"migration check failed: {exc!r}", file=sys.stderr)
+        return 1
+    if current == expected:
+        print(f"Database is at head ({', '.join(sorted(current))}).")
+        return 0
+    print(f"Database at {', '.join(sorted(current)) or 'no revision'}; head is {', '.join(sorted(expected))}.")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
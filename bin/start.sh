@@ -1,20 +1,32 @@
 #!/usr/bin/env bash
 
-# Render start script: apply migrations/seed data before launching gunicorn.
+# Render start script: apply pending migrations (and optionally demo data) before launching gunicorn.
 # Running migrations on each deploy keeps the hosted database in sync with the codebase.
 
 set -o errexit
 set -o pipefail
 
-echo "Applying database migrations..."
-flask db upgrade
+# check_migrations.py asks the database for its revision in one query; only when
+# it is behind does `flask db upgrade` boot the app and Alembic to apply them
+if python bin/check_migrations.py; then
+  echo "Skipping migrations: database is up to date"
+else
+  echo "Applying database migrations..."
+  flask db upgrade
+fi
 
-if [[ "${SKIP_SEED:-0}" != "1" ]]; then
-  echo "Seeding demo data (skips if records already exist)..."
+# demo data is opt-in: set SEED_DEMO_DATA=1 (skips if records already exist)
+if [[ "${SEED_DEMO_DATA:-0}" == "1" ]]; then
+  echo "Seeding demo data..."
   flask ops seed || true
-else
-  echo "Skipping seed step because SKIP_SEED=1"
+fi
+
+if [[ "${ASGI:-0}" == "1" ]]; then
+  # public reads on asyncpg, everything else on the WSGI app (see asgi.py)
+  echo "Starting uvicorn (asgi:app)..."
+  exec uvicorn "asgi:app" --host 0.0.0.0 --port ${PORT:-5000} --workers ${WEB_CONCURRENCY:-2}
 fi
 
 echo "Starting gunicorn..."
-exec gunicorn "main:app" --bind 0.0.0.0:${PORT:-5000}
+# workers, threads, preloading etc. come from gunicorn.conf.py (WEB_CONCURRENCY, GUNICORN_*)
+exec gunicorn "main:app"
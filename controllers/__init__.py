@@ -3,6 +3,7 @@ Controller blueprints for CineCritic.
 
 Defines the registration order of controllers.
 Review routes depend on films and users, so they are registered afterwards.
+The `flask ops` commands (cli_controller) are registered by main.register_cli().
 """
 
 from .auth_controller import auth_bp
@@ -10,7 +11,6 @@ from .films_controller import film_bp
 from .genres_controller import genre_bp
 from .reviews_controller import review_bp, reviews_feed_bp
 from .watchlist_controller import watchlist_bp
-from .cli_controller import ops_commands
 
 def register_controllers(app):
     app.register_blueprint(auth_bp, url_prefix="/auth")
@@ -19,4 +19,3 @@ def register_controllers(app):
     app.register_blueprint(reviews_feed_bp)
     app.register_blueprint(review_bp, url_prefix="/films/<int:film_id>/reviews")
     app.register_blueprint(watchlist_bp, url_prefix="/users/me/watchlist")
-    app.register_blueprint(ops_commands)
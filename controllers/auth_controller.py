@@ -3,23 +3,32 @@ Controller for authentication and user session management.
 
 Handles:
   - User registration (with hashed passwords)
-  - User login (returns JWT access token)
-  - Fetching the current user's profile
+  - User login (returns a JWT access token and a refresh token)
+  - Token refresh with rotation, and logout (token revocation)
+  - Fetching the current user's profile (cached per user id, with an ETag; utils.profile_cache)
 
 Note:
-  - Passwords are securely hashed with Werkzeug.
+  - Passwords are securely hashed with Werkzeug, in a bounded process pool (utils.passwords);
+    hashes made with older parameters are upgraded on the next successful login.
   - JWT identity is the user ID (string). The user's role is added via additional JWT claims.
+  - Refresh tokens are single use: /auth/refresh revokes the one it was given and
+    returns a new pair, so renewing access needs a signature check, not a password hash.
 """
 
 # Installed imports
-from flask import Blueprint, request
-from werkzeug.security import generate_password_hash, check_password_hash
-from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity, get_jwt
+from flask import Blueprint, make_response, request
+from flask_jwt_extended import (
+    create_access_token, create_refresh_token, decode_token, jwt_required, get_jwt_identity, get_jwt,
+)
 
 # Local imports
-from extensions import db
+from extensions import db, passwords, profile_cache, response_cache, token_denylist
 from models.users import User
 from schemas.users_schema import UserRegisterSchema, LoginSchema
+from utils.pagination import invalidate_totals
+from utils.counters import forget_user
+from utils.rating_stats import remove_user_reviews
+from utils.query_budget import query_budget
 
 auth_bp = Blueprint("auth", __name__)  # url_prefix set in controllers/__init__.py
 
@@ -30,6 +39,7 @@ login_schema = LoginSchema()
 # ========== Admin only Routes ==========
 
 @auth_bp.get("/users")
+@query_budget(1)
 @jwt_required()
 def list_users():
     claims = get_jwt()
@@ -41,13 +51,16 @@ def list_users():
             "id": user.id,
             "username": user.username,
             "email": user.email,
-            "role": user.role
+            "role": user.role,
+            "review_count": user.review_count,
+            "watchlist_count": user.watchlist_count,
         }
         for user in users
     ], 200
 
 
 @auth_bp.delete("/users/<int:user_id>")
+@query_budget(4)
 @jwt_required()
 def delete_user(user_id):
     claims = get_jwt()
@@ -56,13 +69,42 @@ def delete_user(user_id):
     user = db.session.get(User, user_id)
     if not user:
         return {"error": "not_found", "detail": "User not found"}, 404
+    # their published reviews leave the film stats along with the account
+    remove_user_reviews(user.id)
+    forget_user(user.id)
     db.session.delete(user)
     db.session.commit()
+    invalidate_totals("reviews", "watchlist")
+    profile_cache.invalidate(user_id)
+    # their published reviews left the feed and every affected film's rating_stats/watchlist_count
+    response_cache.invalidate("reviews", "films", "film_detail")
     return {"message": f"User {user.username} deleted"}, 200
 
+# ========== Helpers ==========
+
+def _load_profile(user_id):
+    user = db.session.get(User, user_id)
+    if not user:
+        return None
+    return {
+        "id": user.id, "username": user.username, "email": user.email, "role": user.role,
+        "review_count": user.review_count, "watchlist_count": user.watchlist_count,
+    }
+
+
+def _issue_tokens(user):
+    # JWT identity shaped for admin checks elsewhere
+    identity = str(user.id)                     # subject must be a string/int
+    claims = {"role": user.role}                # custom claim for role-based auth
+    return {
+        "access_token": create_access_token(identity=identity, additional_claims=claims),
+        "refresh_token": create_refresh_token(identity=identity, additional_claims=claims),
+    }
+
 # ========== User Routes ==========
 
 @auth_bp.post("/register")
+@query_budget(4)
 def register():
     data = register_schema.load(request.get_json() or {})
 
@@ -75,7 +117,7 @@ def register():
     user = User(
         username=data["username"],
         email=data["email"],
-        password_hash=generate_password_hash(data["password"])
+        password_hash=passwords.hash(data["password"])
     )
     db.session.add(user)
     db.session.commit()
@@ -85,22 +127,63 @@ def register():
 
 
 @auth_bp.post("/login")
+@query_budget(2)
 def login():
     creds = login_schema.load(request.get_json() or {})
     email = creds["email"].strip().lower()  # mirrors schema normalisation; safe if schema already does it
     user = db.session.scalar(db.select(User).filter_by(email=email))
-    if not user or not check_password_hash(user.password_hash, creds["password"]):
+    if not user or not passwords.verify(user.password_hash, creds["password"]):
         return {"error": "unauthorised", "detail": "Invalid email or password"}, 401
 
-    # JWT identity shaped for admin checks elsewhere
-    token = create_access_token(
-        identity=str(user.id),                        # subject must be a string/int
-        additional_claims={"role": user.role}         # custom claim for role-based auth
-    )
-    return {"access_token": token}, 200
+    # read before commit() expires `user`: reloading it would cost a third statement
+    tokens = _issue_tokens(user)
+    # upgrade hashes made with older parameters while we have the plain password
+    if passwords.needs_rehash(user.password_hash):
+        user.password_hash = passwords.hash(creds["password"])
+        db.session.commit()
+
+    return tokens, 200
+
+
+@auth_bp.post("/refresh")
+@query_budget(2)
+@jwt_required(refresh=True)
+def refresh():
+    """Swap a refresh token for a new access + refresh token pair (the old one is revoked)."""
+    user = db.session.get(User, int(get_jwt_identity()))
+    if not user:
+        return {"error": "unauthorised", "detail": "User no longer exists"}, 401
+    # the insert decides: of two requests racing with one token, only one gets a new pair
+    if not token_denylist.revoke(get_jwt()):
+        db.session.rollback()
+        return {"error": "unauthorised", "detail": "Refresh token already used"}, 401
+    # fresh role claim, in case it changed since login; read before commit() expires `user`
+    tokens = _issue_tokens(user)
+    db.session.commit()
+    return tokens, 200
+
+
+@auth_bp.post("/logout")
+@query_budget(2)
+@jwt_required(verify_type=False)
+def logout():
+    """Revoke the presented token, and the refresh token in the body if one is sent."""
+    # check the body first: a bad refresh_token fails the request before anything is revoked
+    refresh_payload = None
+    refresh_token = (request.get_json(silent=True) or {}).get("refresh_token")
+    if refresh_token:
+        refresh_payload = decode_token(refresh_token)
+        if refresh_payload.get("type") != "refresh" or refresh_payload["sub"] != get_jwt_identity():
+            return {"error": "bad_request", "detail": "refresh_token must be your own refresh token"}, 400
+    token_denylist.revoke(get_jwt())
+    if refresh_payload is not None:
+        token_denylist.revoke(refresh_payload)
+    db.session.commit()
+    return "", 204
 
 
 @auth_bp.get("/me")
+@query_budget(1)
 @jwt_required()
 def me():
     ident = get_jwt_identity()
@@ -109,7 +192,13 @@ def me():
         user_id = ident["id"]
     else:
         user_id = int(ident)
-    user = db.session.get(User, user_id)
-    if not user:
+    entry = profile_cache.get(user_id, _load_profile)
+    if entry is None:
         return {"error": "not_found", "detail": "User not found"}, 404
-    return {"id": user.id, "username": user.username, "email": user.email, "role": user.role}, 200
+    profile, etag = entry
+    response = make_response(profile, 200)
+    response.set_etag(etag)
+    # per-user data: browsers may keep it but must revalidate, shared caches must not store it
+    response.headers["Cache-Control"] = "private, no-cache"
+    response.vary.add("Authorization")
+    return response.make_conditional(request)
@@ -5,6 +5,12 @@ Custom commands:
   flask ops drop    – drop all tables
   flask ops create  – create all tables
   flask ops seed    – populate tables with sample data
+  flask ops rebuild-rating-stats – recompute film_rating_stats from reviews
+  flask ops reconcile-counters – repair drifted review/watchlist counters in small batches
+  flask ops check-plans – fail if a hot list query falls back to a sequential scan
+  flask ops import-films FILE – bulk upsert films from CSV/JSONL ("-" reads stdin)
+  flask ops seed-synthetic – load a large, reproducible dataset for load testing
+  flask ops prune-revoked-tokens – delete revoked-token rows whose tokens have expired
 
 Migrations (via Flask-Migrate):
   flask db init     – set up migrations folder
@@ -15,13 +21,24 @@ Notes:
   - Seeds run in dependency order: Users → Films/Genres → FilmGenre → Reviews → Watchlist
   - Passwords are hashed; never store plain text.
 """
+# Built-in imports
+import io
+import sys
+import time
+
 # Installed imports
+import click
 from flask import Blueprint
 from werkzeug.security import generate_password_hash
 
 # Local imports
-from extensions import db
+from extensions import db, token_denylist
 from models import User, Film, Genre, Review, Watchlist, FilmGenre
+from utils.film_import import FORMATS, import_films, read_rows
+from utils.counters import rebuild_counters, reconcile_counters
+from utils.rating_stats import rebuild_rating_stats
+from utils.synthetic import SyntheticConfig, generate
+from utils.query_plans import check_plans
 
 ops_commands = Blueprint("ops", __name__)
 
@@ -95,11 +112,122 @@ def seed_tables():
     r3 = Review(film_id=f1.id, user_id=u2.id, rating=4.0, body="Flag me please", status="flagged", flagged_at=db.func.now())
     db.session.add_all([r1, r2, r3])
     db.session.commit()
+    rebuild_rating_stats()
+    db.session.commit()
 
     # ========== Seed Watchlist ==========
     w1 = Watchlist(user_id=u2.id, film_id=f2.id)
     w2 = Watchlist(user_id=u1.id, film_id=f3.id)
     db.session.add_all([w1, w2])
     db.session.commit()
+    rebuild_counters()
+    db.session.commit()
 
     print("✅ CineCritic Tables seeded.")
+
+@ops_commands.cli.command("rebuild-rating-stats")
+def rebuild_rating_stats_command():
+    """Recompute per-film rating stats from published reviews."""
+    films = rebuild_rating_stats()
+    db.session.commit()
+    print(f"Rating stats rebuilt for {films} films.")
+
+@ops_commands.cli.command("reconcile-counters")
+@click.option("--batch-size", default=1000, show_default=True, type=click.IntRange(min=1),
+              help="Users/films compared and fixed per transaction.")
+def reconcile_counters_command(batch_size):
+    """Repair review/watchlist counters that drifted from the rows they count (safe while serving)."""
+    fixed = reconcile_counters(batch_size=batch_size)
+    for name, rows in fixed.items():
+        print(f"{name}: {rows} fixed")
+    print(f"Counters reconciled ({sum(fixed.values())} rows fixed).")
+
+@ops_commands.cli.command("prune-revoked-tokens")
+def prune_revoked_tokens_command():
+    """Delete revoked_tokens rows for tokens that have expired anyway (safe to run from cron)."""
+    removed = token_denylist.prune()
+    db.session.commit()
+    print(f"Pruned {removed} expired revoked tokens.")
+
+@ops_commands.cli.command("check-plans")
+def check_plans_command():
+    """EXPLAIN the hot list queries; exit 1 if any plan uses a sequential scan."""
+    results = check_plans()
+    for result in results:
+        if result.skipped:
+            print(f"SKIP  {result.name} ({result.skipped})")
+        elif result.ok:
+            print(f"OK    {result.name}")
+        else:
+            print(f"FAIL  {result.name}: Seq Scan on {', '.join(result.seq_scans)}")
+    failures = [r for r in results if not r.ok]
+    if failures:
+        raise SystemExit(f"{len(failures)} query plan(s) fell back to a sequential scan.")
+    print("All hot query plans use indexes.")
+
+@ops_commands.cli.command("import-films")
+@click.argument("source", type=click.Path(exists=True, dir_okay=False, allow_dash=True))
+@click.option("--format", "fmt", type=click.Choice(FORMATS),
+              help="Input format (default: from the file extension; required for stdin).")
+@click.option("--batch-size", default=1000, show_default=True, type=click.IntRange(min=1),
+              help="Rows validated and upserted per transaction.")
+def import_films_command(source, fmt, batch_size):
+    """Upsert films from a CSV (with header) or JSONL file; genres as "A|B"."""
+    if fmt is None:
+        fmt = source.rsplit(".", 1)[-1].lower() if "." in source else None
+        if fmt not in FORMATS:
+            raise click.UsageError("Pass --format csv|jsonl when it can't be told from the file name.")
+
+    if source == "-":
+        stream = io.TextIOWrapper(sys.stdin.buffer, encoding="utf-8-sig", newline="")
+    else:
+        stream = open(source, encoding="utf-8-sig", newline="")
+
+    started = time.perf_counter()
+
+    def progress(stats):
+        elapsed = time.perf_counter() - started
+        print(f"  {stats.rows} rows, {stats.rows / elapsed:.0f} rows/s", file=sys.stderr)
+
+    with stream:
+        stats = import_films(read_rows(stream, fmt), batch_size=batch_size, on_batch=progress)
+    elapsed = time.perf_counter() - started
+
+    for line_num, messages in stats.errors:
+        print(f"line {line_num}: {messages}")
+    print(
+        f"Imported {stats.rows} rows in {elapsed:.1f}s ({stats.rows / max(elapsed, 1e-9):.0f} rows/s): "
+        f"{stats.inserted} inserted, {stats.updated} updated, {stats.duplicates} duplicates, "
+        f"{stats.invalid} invalid, {stats.genre_links} new genre links."
+    )
+
+@ops_commands.cli.command("seed-synthetic")
+@click.option("--users", default=10_000, show_default=True, type=click.IntRange(min=1))
+@click.option("--films", default=50_000, show_default=True, type=click.IntRange(min=1))
+@click.option("--genres", default=20, show_default=True, type=click.IntRange(min=0))
+@click.option("--reviews-per-film", default=20.0, show_default=True, type=click.FloatRange(min=0),
+              help="Average; individual films follow a Zipf curve.")
+@click.option("--zipf", "zipf_s", default=1.1, show_default=True, type=click.FloatRange(min=0),
+              help="Popularity skew (0 = every film equally popular).")
+@click.option("--watchlist-mean", default=15.0, show_default=True, type=click.FloatRange(min=0))
+@click.option("--seed", default=42, show_default=True, type=int, help="Same seed, same dataset.")
+@click.option("--password", default="password123", show_default=True, help="Shared by every user.")
+@click.option("--truncate", is_flag=True, help="Empty the tables first instead of refusing.")
+def seed_synthetic_command(truncate, **knobs):
+    """Bulk-load a reproducible synthetic dataset (Postgres, COPY)."""
+    if truncate:
+        db.session.execute(db.text("TRUNCATE users, films, genres RESTART IDENTITY CASCADE"))
+    elif db.session.scalar(db.select(User).limit(1)) or db.session.scalar(db.select(Film).limit(1)):
+        raise click.ClickException("Tables already hold data; pass --truncate to replace it.")
+
+    started = time.perf_counter()
+
+    def progress(table, rows):
+        print(f"  {table}: {rows} rows ({time.perf_counter() - started:.1f}s)")
+
+    counts = generate(SyntheticConfig(**knobs), on_table=progress)
+    db.session.commit()
+    db.session.execute(db.text("ANALYZE"))
+    elapsed = time.perf_counter() - started
+    total = sum(counts.values())
+    print(f"Seeded {total} rows in {elapsed:.1f}s ({total / max(elapsed, 1e-9):.0f} rows/s).")
@@ -4,10 +4,12 @@ Controller for Film-related routes.
 Handles:
   - List films (filters + pagination)
   - Get one film
+  - Get many films by id in one request
   - Create a film (admin only)
   - Update a film (admin only)
   - Delete a film (admin only)
-  - Manage film ↔ genre links (admin only)
+  - Manage film ↔ genre links (admin only), one link at a time or by
+    replacing whole genre sets
 
 Note:
   - ValidationError and IntegrityError are handled globally in utils.error_handlers.
@@ -16,14 +18,21 @@ Note:
 # Installed imports
 from flask import Blueprint, request
 from flask_jwt_extended import jwt_required, get_jwt
+from sqlalchemy.dialects.postgresql import insert
 
 # Local imports
-from extensions import db
+from extensions import db, profile_cache, response_cache
 from models.films import Film
 from models.genres import Genre
 from models.film_genre import FilmGenre
-from schemas.films_schema import FilmCreateSchema, FilmSchema
+from schemas.batch_schema import BatchIdsSchema
+from schemas.films_schema import FilmCreateSchema, FilmGenresBulkSchema, FilmGenresSchema, FilmSchema
 from schemas.genres_schema import GenreSchema
+from utils.counters import forget_film
+from utils.pagination import paginate, invalidate_totals
+from utils.search import contains, relevance
+from utils.serializers import compile_dump
+from utils.query_budget import query_budget
 
 film_bp = Blueprint("films", __name__)      # url_prefix set in controllers/__init__.py
 
@@ -32,6 +41,12 @@ create_schema = FilmCreateSchema()
 read_schema = FilmSchema()
 read_many_schema = FilmSchema(many=True)
 genres_read_many = GenreSchema(many=True)
+batch_schema = BatchIdsSchema()
+genre_set_schema = FilmGenresSchema()
+genre_sets_schema = FilmGenresBulkSchema()
+# compiled equivalents of .dump() for the list routes
+dump_films = compile_dump(read_many_schema)
+dump_genres = compile_dump(genres_read_many)
 
 # ========= HELPERS =========
 
@@ -42,10 +57,81 @@ def _require_admin():
         return {"error": "forbidden", "detail": "Admin only"}, 403
     return None
 
+def _replace_genre_sets(desired):
+    """Make film_genres match `desired` ({film_id: [genre_ids]}) with one DELETE and one INSERT.
+
+    Returns the removed and the added (film_id, genre_id) pairs. Links of films
+    not in `desired` are untouched. The caller validates the ids, locks the
+    films (_lock_films) and commits: the DELETE can't see links a concurrent
+    replace hasn't committed yet, so unlocked replaces could merge both sets.
+    """
+    table = FilmGenre.__table__
+    pairs = [(film_id, genre_id) for film_id, genre_ids in desired.items() for genre_id in genre_ids]
+
+    stmt = db.delete(table).where(table.c.film_id.in_(list(desired)))
+    if pairs:
+        stmt = stmt.where(db.tuple_(table.c.film_id, table.c.genre_id).not_in(pairs))
+    removed = db.session.execute(stmt.returning(table.c.film_id, table.c.genre_id)).all()
+
+    added = []
+    if pairs:
+        # links already present are skipped by the primary key, not re-checked here
+        stmt = insert(table).on_conflict_do_nothing().returning(table.c.film_id, table.c.genre_id)
+        added = db.session.execute(stmt, [{"film_id": f, "genre_id": g} for f, g in pairs]).all()
+    return removed, added
+
+def _lock_films(film_ids):
+    """Return which of `film_ids` exist, locking those rows until commit (in id order, so replaces can't deadlock).
+
+    FOR NO KEY UPDATE: concurrent genre replaces of a film queue up, but
+    inserts referencing the film (reviews, watchlist, links) don't.
+    """
+    return set(db.session.scalars(
+        db.select(Film.id).where(Film.id.in_(film_ids)).order_by(Film.id).with_for_update(key_share=True)
+    ))
+
+def _missing_genres(genre_ids):
+    """Return the ids in `genre_ids` with no genre row."""
+    if not genre_ids:
+        return []
+    found = set(db.session.scalars(db.select(Genre.id).where(Genre.id.in_(genre_ids))))
+    return sorted(set(genre_ids) - found)
+
+def build_films_query(title="", year=None, director="", genre_id=None, sort="title"):
+    """Ordered select behind list_films (also EXPLAINed by `flask ops check-plans`)."""
+    stmt = db.select(Film)
+
+    # text search terms, kept for sort=relevance
+    terms = []
+    if title:
+        stmt = stmt.where(contains(Film.title, title))
+        terms.append((Film.title, title))
+    if year is not None:
+        stmt = stmt.where(Film.release_year == year)
+    if director:
+        stmt = stmt.where(contains(Film.director, director))
+        terms.append((Film.director, director))
+    if genre_id is not None:
+        # join via junction table
+        stmt = (
+            stmt.join(FilmGenre, FilmGenre.film_id == Film.id)
+                .where(FilmGenre.genre_id == genre_id)
+        )
+
+    if sort == "relevance" and terms:
+        return stmt.order_by(relevance(terms).desc(), Film.title.asc())
+    return stmt.order_by(Film.title.asc())
+
 # ========= LIST FILMS =========
 @film_bp.get("")
+@query_budget(3)
+@response_cache.cached(tags=("films",))
 def list_films():
-    """List films with optional filters and pagination."""
+    """List films with optional filters and pagination.
+
+    title/director are substring matches; ?sort=relevance ranks hits by how
+    closely they match instead of alphabetically.
+    """
     # parse pagination
     try:
         page = int(request.args.get("page", 1))
@@ -55,50 +141,44 @@ def list_films():
     page = max(1, page)
     per_page = max(1, min(per_page, 100))
 
-    # base select
-    stmt = db.select(Film)
-
     # filters
     title = (request.args.get("title") or "").strip()
-    if title:
-        stmt = stmt.where(Film.title.ilike(f"%{title}%"))
+    director = (request.args.get("director") or "").strip()
 
     year = request.args.get("year")
+    year_int = None
     if year is not None and year != "":
         try:
             year_int = int(year)
-            stmt = stmt.where(Film.release_year == year_int)
         except ValueError:
             return {"error": "bad_request", "detail": "year must be an integer"}, 400
 
-    director = (request.args.get("director") or "").strip()
-    if director:
-        stmt = stmt.where(Film.director.ilike(f"%{director}%"))
-
     # optional genre filter
     genre_id = request.args.get("genre_id")
+    gid = None
     if genre_id is not None and genre_id != "":
         try:
             gid = int(genre_id)
         except ValueError:
             return {"error": "bad_request", "detail": "genre_id must be an integer"}, 400
-        # join via junction table
-        stmt = (
-            stmt.join(FilmGenre, FilmGenre.film_id == Film.id)
-                .where(FilmGenre.genre_id == gid)
-        )
+
+    sort = request.args.get("sort", "title")
+    if sort not in ("title", "relevance"):
+        return {"error": "bad_request", "detail": "sort must be 'title' or 'relevance'"}, 400
 
     # sort and paginate
-    stmt = stmt.order_by(Film.title.asc())
-    pager = db.paginate(stmt, page=page, per_page=per_page, error_out=False)
+    stmt = build_films_query(title=title, year=year_int, director=director, genre_id=gid, sort=sort)
+    items, meta = paginate(stmt, page, per_page, tables=("films", "film_genres"))
 
     return {
-        "data": read_many_schema.dump(pager.items),
-        "meta": {"page": page, "per_page": per_page, "total": pager.total, "pages": pager.pages}
+        "data": dump_films(items),
+        "meta": meta
     }, 200
 
 # ========= GET ONE FILM =========
 @film_bp.get("/<int:film_id>")
+@query_budget(1)
+@response_cache.cached(tags=lambda film_id: (f"film:{film_id}", "film_detail"))
 def get_film(film_id: int):
     """Fetch a single film by id."""
     f = db.session.get(Film, film_id)
@@ -106,8 +186,25 @@ def get_film(film_id: int):
         return {"error": "not_found", "detail": f"Film {film_id} not found"}, 404
     return read_schema.dump(f), 200
 
+# ========= BATCH GET FILMS =========
+@film_bp.post("/batch")
+@query_budget(1)
+def batch_films():
+    """Fetch up to MAX_BATCH_IDS films by id with one query.
+
+    Body: {"ids": [...]}. Films come back in request order; unknown ids are
+    listed in `not_found`.
+    """
+    ids = batch_schema.load(request.get_json() or {})
+    by_id = {f.id: f for f in db.session.scalars(db.select(Film).where(Film.id.in_(ids)))}
+    return {
+        "data": dump_films([by_id[i] for i in ids if i in by_id]),
+        "not_found": [i for i in ids if i not in by_id],
+    }, 200
+
 # ========= CREATE FILM =========
 @film_bp.post("")
+@query_budget(2)
 @jwt_required()
 def create_film():
     """Create a film (validated by schema). Admin only."""
@@ -118,10 +215,13 @@ def create_film():
     f = Film(**data)
     db.session.add(f)
     db.session.commit()
+    invalidate_totals("films")
+    response_cache.invalidate("films")
     return read_schema.dump(f), 201
 
 # ========= UPDATE FILM =========
 @film_bp.patch("/<int:film_id>")
+@query_budget(3)
 @jwt_required()
 def update_film(film_id: int):
     """Patch fields on a film. Admin only."""
@@ -137,10 +237,15 @@ def update_film(film_id: int):
         setattr(f, k, v)
 
     db.session.commit()
+    # title/director/year changes can move the film in or out of filtered counts
+    invalidate_totals("films")
+    # reviews embed the film, so feeds go too
+    response_cache.invalidate("films", f"film:{film_id}", "reviews")
     return read_schema.dump(f), 200
 
 # ========= DELETE FILM =========
 @film_bp.delete("/<int:film_id>")
+@query_budget(5)
 @jwt_required()
 def delete_film(film_id: int):
     """Delete a film. Admin only."""
@@ -150,8 +255,13 @@ def delete_film(film_id: int):
     f = db.session.get(Film, film_id)
     if not f:
         return {"error": "not_found", "detail": f"Film {film_id} not found"}, 404
+    # the cascade removes its reviews and watchlist entries; their users' counters go first
+    affected_users = forget_film(film_id)
     db.session.delete(f)
     db.session.commit()
+    invalidate_totals("films", "film_genres", "reviews", "watchlist")
+    profile_cache.invalidate(*affected_users)
+    response_cache.invalidate("films", f"film:{film_id}", f"film:{film_id}:genres", "reviews")
     return "", 204
 
 
@@ -162,6 +272,8 @@ def delete_film(film_id: int):
 
 # ========= LIST FILM GENRES =========
 @film_bp.get("/<int:film_id>/genres")
+@query_budget(2)
+@response_cache.cached(tags=lambda film_id: (f"film:{film_id}:genres", "genres"))
 def list_film_genres(film_id: int):
     """List genres attached to a film."""
     if not db.session.get(Film, film_id):
@@ -174,10 +286,11 @@ def list_film_genres(film_id: int):
         .order_by(Genre.name)
         .all()
     )
-    return {"data": genres_read_many.dump(rows)}, 200
+    return {"data": dump_genres(rows)}, 200
 
 # ========= ATTACH GENRE =========
 @film_bp.post("/<int:film_id>/genres/<int:genre_id>")
+@query_budget(4)
 @jwt_required()
 def attach_genre(film_id: int, genre_id: int):
     """Attach a genre to a film. Admin only."""
@@ -193,10 +306,14 @@ def attach_genre(film_id: int, genre_id: int):
 
     db.session.add(FilmGenre(film_id=film_id, genre_id=genre_id))
     db.session.commit()
+    invalidate_totals("film_genres")
+    # genre_id-filtered film lists change too
+    response_cache.invalidate("films", f"film:{film_id}:genres")
     return "", 204
 
 # ========= DETACH GENRE =========
 @film_bp.delete("/<int:film_id>/genres/<int:genre_id>")
+@query_budget(2)
 @jwt_required()
 def detach_genre(film_id: int, genre_id: int):
     """Detach a genre from a film. Admin only."""
@@ -208,4 +325,70 @@ def detach_genre(film_id: int, genre_id: int):
         return {"error": "not_found", "detail": "Relation not found"}, 404
     db.session.delete(row)
     db.session.commit()
+    invalidate_totals("film_genres")
+    # genre_id-filtered film lists change too
+    response_cache.invalidate("films", f"film:{film_id}:genres")
     return "", 204
+
+# ========= REPLACE FILM GENRES =========
+@film_bp.put("/<int:film_id>/genres")
+@query_budget(4)
+@jwt_required()
+def replace_film_genres(film_id: int):
+    """Set a film's genres to exactly `genre_ids`, adding and removing links in one transaction. Admin only."""
+    err = _require_admin()
+    if err: return err
+
+    genre_ids = genre_set_schema.load(request.get_json() or {})
+    if not _lock_films([film_id]):
+        return {"error": "not_found", "detail": f"Film {film_id} not found"}, 404
+    rows = db.session.scalars(
+        db.select(Genre).where(Genre.id.in_(genre_ids)).order_by(Genre.name)
+    ).all() if genre_ids else []
+    missing = sorted(set(genre_ids) - {g.id for g in rows})
+    if missing:
+        return {"error": "not_found", "detail": f"Genres not found: {', '.join(map(str, missing))}"}, 404
+    data = dump_genres(rows)    # before commit expires the rows
+
+    removed, added = _replace_genre_sets({film_id: genre_ids})
+    db.session.commit()
+    if removed or added:
+        invalidate_totals("film_genres")
+        response_cache.invalidate("films", f"film:{film_id}:genres")
+
+    return {
+        "data": data,
+        "added": sorted(g for _, g in added),
+        "removed": sorted(g for _, g in removed),
+    }, 200
+
+# ========= BULK RE-TAG FILMS =========
+@film_bp.put("/genres")
+@query_budget(4)
+@jwt_required()
+def replace_genre_sets():
+    """Replace the genre sets of many films in one transaction. Admin only.
+
+    Body: {"films": [{"film_id": 1, "genre_ids": [...]}, ...]}. Films not listed
+    keep their genres; an unknown film or genre id rejects the whole request.
+    """
+    err = _require_admin()
+    if err: return err
+
+    desired = genre_sets_schema.load(request.get_json() or {})
+    found = _lock_films(list(desired))
+    missing_films = sorted(set(desired) - found)
+    if missing_films:
+        return {"error": "not_found", "detail": f"Films not found: {', '.join(map(str, missing_films))}"}, 404
+    missing = _missing_genres({g for genre_ids in desired.values() for g in genre_ids})
+    if missing:
+        return {"error": "not_found", "detail": f"Genres not found: {', '.join(map(str, missing))}"}, 404
+
+    removed, added = _replace_genre_sets(desired)
+    db.session.commit()
+    if removed or added:
+        invalidate_totals("film_genres")
+        changed = {film_id for film_id, _ in removed} | {film_id for film_id, _ in added}
+        response_cache.invalidate("films", *(f"film:{film_id}:genres" for film_id in changed))
+
+    return {"films": len(desired), "added": len(added), "removed": len(removed)}, 200
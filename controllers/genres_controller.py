@@ -18,9 +18,12 @@ from flask_jwt_extended import jwt_required, get_jwt
 from marshmallow import ValidationError
 
 # Local imports
-from extensions import db
+from extensions import db, response_cache
 from models.genres import Genre
 from schemas.genres_schema import GenreCreateSchema, GenreSchema
+from utils.pagination import invalidate_totals
+from utils.serializers import compile_dump
+from utils.query_budget import query_budget
 
 genre_bp = Blueprint("genres", __name__)  # url_prefix set in controllers/__init__.py
 
@@ -28,6 +31,7 @@ genre_bp = Blueprint("genres", __name__)  # url_prefix set in controllers/__init
 create_schema = GenreCreateSchema()
 read_schema = GenreSchema()
 read_many = GenreSchema(many=True)
+dump_many = compile_dump(read_many)   # compiled read_many.dump
 
 # ========= HELPERS =========
 
@@ -39,12 +43,15 @@ def _require_admin():
 
 # ========= LIST GENRES =========
 @genre_bp.get("")
+@query_budget(1)
+@response_cache.cached(tags=("genres",))
 def list_genres():
     rows = db.session.scalars(db.select(Genre).order_by(Genre.name)).all()
-    return {"data": read_many.dump(rows)}, 200
+    return {"data": dump_many(rows)}, 200
 
 # ========= CREATE GENRE =========
 @genre_bp.post("")
+@query_budget(2)
 @jwt_required()
 def create_genre():
     err = _require_admin()
@@ -55,10 +62,12 @@ def create_genre():
     g = Genre(**data)
     db.session.add(g)
     db.session.commit()
+    response_cache.invalidate("genres")
     return read_schema.dump(g), 201
 
 # ========= DELETE GENRE =========
 @genre_bp.delete("/<int:genre_id>")
+@query_budget(3)
 @jwt_required()
 def delete_genre(genre_id: int):
     err = _require_admin()
@@ -69,4 +78,7 @@ def delete_genre(genre_id: int):
         return {"error": "not_found", "detail": f"Genre {genre_id} not found"}, 404
     db.session.delete(g)
     db.session.commit()
+    invalidate_totals("film_genres")
+    # film genre lists carry the "genres" tag; genre_id-filtered film lists change too
+    response_cache.invalidate("genres", "films")
     return "", 204
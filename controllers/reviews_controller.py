@@ -4,6 +4,7 @@ Controller for Review-related routes.
 Handles:
   - List reviews for a film
   - Get one review
+  - Get many reviews by id in one request
   - Create a new review
   - Update an existing review
   - Delete a review
@@ -11,19 +12,31 @@ Handles:
 
 Note:
   - IntegrityError and ValidationError are handled globally in utils.error_handlers.
+  - Every write that changes a published review's contribution updates
+    film_rating_stats (utils.rating_stats) and the author's users.review_count
+    (utils.counters) in the same transaction.
 """
 
+# Built-in imports
+from datetime import datetime
+
 # Installed imports
 from flask import Blueprint, request
 from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
 from marshmallow import Schema, fields, validate
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import contains_eager, joinedload, selectinload
 
 # Local imports
-from extensions import db
+from extensions import db, profile_cache, response_cache
 from models.reviews import Review
 from models.films import Film
+from schemas.batch_schema import BatchIdsSchema
 from schemas.reviews_schema import ReviewCreateSchema, ReviewSchema
+from utils.pagination import InvalidCursor, decode_cursor, encode_cursor, paginate, invalidate_totals
+from utils.counters import count_review_change
+from utils.rating_stats import review_contribution, apply_review_change
+from utils.serializers import compile_dump
+from utils.query_budget import query_budget
 
 review_bp = Blueprint("reviews", __name__)    # url_prefix set in controllers/__init__.py
 reviews_feed_bp = Blueprint("reviews_feed", __name__)
@@ -32,6 +45,7 @@ reviews_feed_bp = Blueprint("reviews_feed", __name__)
 create_schema = ReviewCreateSchema()
 read_schema = ReviewSchema()
 read_many = ReviewSchema(many=True)
+dump_many = compile_dump(read_many)   # compiled read_many.dump
 
 # Update schema (do NOT allow film_id/user_id edits on PATCH)
 class ReviewUpdateSchema(Schema):
@@ -40,6 +54,7 @@ class ReviewUpdateSchema(Schema):
     status = fields.String(validate=validate.OneOf(["draft", "published", "flagged"]))
 
 update_schema = ReviewUpdateSchema()
+batch_schema = BatchIdsSchema()
 
 
 # ========= HELPERS =========
@@ -50,26 +65,129 @@ def _current_user():
         claims = get_jwt()
     except Exception:
         return None
+    if identity is None:        # @jwt_required(optional=True) without a token
+        return None
     user_id = identity["id"] if isinstance(identity, dict) else int(identity)
     return {"id": user_id, "role": claims.get("role")}
 
 def _is_admin(identity):
     return bool(identity and identity.get("role") == "admin")
 
-def _ensure_film_or_404(film_id):
-    if not db.session.get(Film, film_id):
-        return {"error": "not_found", "detail": f"Film {film_id} not found"}, 404
-    return None
+def _resolve(film_id: int, review_id: int | None = None, refresh: bool = False, for_update: bool = False):
+    """Look up a film and, if `review_id` is given, one of its reviews in a single SELECT.
+
+    Returns (review, None) or (None, error response). A missing film is
+    "Film N not found"; a missing review, or one belonging to another film,
+    is "Review not found". The review's film (and its rating stats, which
+    ReviewSchema nests) come from the same row, so dumping costs no query.
+    After a commit pass refresh=True to reload the expired objects.
+
+    Write paths pass for_update=True: the review row is locked (SELECT ... FOR
+    UPDATE OF reviews) until the transaction ends, so the contribution they
+    read before changing it can't be read by a concurrent change too, and the
+    rating stats and review_count move once per actual change.
+    """
+    if review_id is None:
+        film = db.session.get(Film, film_id, populate_existing=refresh)
+        row = (film, None) if film else None
+    elif for_update:
+        # Postgres can't lock the nullable side of an outer join: join the review,
+        # and only when there is none ask whether the film exists
+        stmt = (
+            db.select(Film, Review)
+            .join(Review, db.and_(Review.film_id == Film.id, Review.id == review_id))
+            .where(Film.id == film_id)
+            .options(contains_eager(Review.film))
+            .with_for_update(of=Review)
+            .execution_options(populate_existing=True)
+        )
+        row = db.session.execute(stmt).first()
+        if row is None:
+            film = db.session.get(Film, film_id)
+            row = (film, None) if film else None
+    else:
+        # film LEFT JOIN review: no row = no film, NULL review = not this film's review
+        stmt = (
+            db.select(Film, Review)
+            .outerjoin(Review, db.and_(Review.film_id == Film.id, Review.id == review_id))
+            .where(Film.id == film_id)
+            .options(contains_eager(Review.film))
+            .execution_options(populate_existing=refresh)
+        )
+        row = db.session.execute(stmt).first()
+    if row is None:
+        return None, ({"error": "not_found", "detail": f"Film {film_id} not found"}, 404)
+    review = row[1]
+    if review_id is not None and review is None:
+        return None, ({"error": "not_found", "detail": "Review not found"}, 404)
+    return review, None
+
+def _can_view(review, identity):
+    """Published reviews are public; drafts and flagged ones only to their author or an admin."""
+    if review.status == "published":
+        return True
+    return bool(identity) and (identity["id"] == review.user_id or _is_admin(identity))
 
 def _forbidden(detail: str):
     return {"error": "forbidden", "detail": detail}, 403
 
+def _record_review_change(film_id, user_id, before, after):
+    """Move the film's rating stats and the author's review_count in this transaction.
+
+    `before` must come from the review as locked by _resolve(..., for_update=True).
+    """
+    apply_review_change(film_id, before, after)
+    count_review_change(user_id, before, after)
+
+def _after_review_write(film_id, user_id, before, after):
+    """Drop cached totals/responses a review change can affect (call after commit).
+
+    `before`/`after` are the review's rating contributions (None = not published).
+    """
+    if before is None and after is None:
+        return      # drafts and flagged reviews never appear in public lists
+    if (before is None) != (after is None):
+        profile_cache.invalidate(user_id)       # the author's review_count moved
+    invalidate_totals("reviews")
+    response_cache.invalidate("reviews")
+    if before != after:
+        # the film's embedded rating_stats changed
+        response_cache.invalidate("films", f"film:{film_id}")
+
+def build_feed_query(film_id=None, user_id=None):
+    """Published reviews, newest first, behind GET /reviews (also EXPLAINed by `flask ops check-plans`).
+
+    (published_at, id) is both the sort order and the keyset cursor.
+    """
+    stmt = db.select(Review).options(selectinload(Review.film)).where(Review.status == "published")
+    if film_id is not None:
+        stmt = stmt.where(Review.film_id == film_id)
+    if user_id is not None:
+        stmt = stmt.where(Review.user_id == user_id)
+    return stmt.order_by(Review.published_at.desc(), Review.id.desc())
+
+def build_film_reviews_query(film_id: int):
+    """Published reviews of one film, newest first (also EXPLAINed by `flask ops check-plans`)."""
+    # Only published reviews are public
+    return (
+        db.select(Review)
+        .options(selectinload(Review.film))
+        .where(Review.film_id == film_id, Review.status == "published")
+        .order_by(Review.created_at.desc())
+    )
+
 
 # ========= GLOBAL FEED =========
 # GET /reviews
 @reviews_feed_bp.get("/reviews")
+@query_budget(4)
+@response_cache.cached(tags=("reviews",))
 def list_all_reviews():
-    """List published reviews across all films (optional filters: film_id, user_id)."""
+    """List published reviews across all films (optional filters: film_id, user_id).
+
+    Pass ?cursor= (empty on the first request, then meta.next_cursor) for keyset
+    pagination; without it the classic ?page & ?per_page mode is used.
+    """
     try:
         page = int(request.args.get("page", 1))
         per_page = int(request.args.get("per_page", 20))
@@ -78,37 +196,102 @@ def list_all_reviews():
     page = max(1, page)
     per_page = max(1, min(per_page, 100))
 
-    stmt = db.select(Review).options(selectinload(Review.film)).where(Review.status == "published")
-
     film_id = request.args.get("film_id")
     if film_id not in (None, ""):
         try:
-            stmt = stmt.where(Review.film_id == int(film_id))
+            film_id = int(film_id)
         except ValueError:
             return {"error": "bad_request", "detail": "film_id must be an integer"}, 400
+    else:
+        film_id = None
 
     user_id = request.args.get("user_id")
     if user_id not in (None, ""):
         try:
-            stmt = stmt.where(Review.user_id == int(user_id))
+            user_id = int(user_id)
         except ValueError:
             return {"error": "bad_request", "detail": "user_id must be an integer"}, 400
+    else:
+        user_id = None
+
+    stmt = build_feed_query(film_id=film_id, user_id=user_id)
+
+    # keyset mode: ?cursor= (empty for the first page) switches off OFFSET/COUNT
+    if "cursor" in request.args:
+        return _list_reviews_by_cursor(stmt, request.args["cursor"], per_page)
+
+    items, meta = paginate(stmt, page, per_page, tables=("reviews",))
+
+    return {
+        "data": dump_many(items),
+        "meta": meta,
+    }, 200
+
+
+def _list_reviews_by_cursor(stmt, cursor: str, per_page: int):
+    """Serve one feed page ordered by (published_at, id) DESC using a keyset cursor."""
+    if cursor:
+        try:
+            published_at, review_id = decode_cursor(cursor, datetime, int)
+        except InvalidCursor:
+            return {"error": "bad_request", "detail": "cursor is invalid"}, 400
+        stmt = stmt.where(
+            db.tuple_(Review.published_at, Review.id) < db.tuple_(published_at, review_id)
+        )
+
+    # fetch one extra row to learn whether another page exists
+    stmt = stmt.limit(per_page + 1)
+    rows = db.session.scalars(stmt).all()
+    has_more = len(rows) > per_page
+    rows = rows[:per_page]
+
+    next_cursor = None
+    if has_more:
+        last = rows[-1]
+        next_cursor = encode_cursor(last.published_at, last.id)
+
+    return {
+        "data": dump_many(rows),
+        "meta": {"per_page": per_page, "next_cursor": next_cursor},
+    }, 200
 
-    stmt = stmt.order_by(Review.published_at.desc())
-    pager = db.paginate(stmt, page=page, per_page=per_page, error_out=False)
 
+# ========= BATCH GET REVIEWS =========
+# POST /reviews/batch
+@reviews_feed_bp.post("/reviews/batch")
+@query_budget(1)
+@jwt_required(optional=True)
+def batch_reviews():
+    """Fetch up to MAX_BATCH_IDS reviews (with their films) by id with one query.
+
+    Body: {"ids": [...]}. Reviews come back in request order. Unknown ids are
+    listed in `not_found`, and reviews the caller may not view (the same rule
+    as GET /films/<id>/reviews/<id>) in `forbidden`.
+    """
+    ids = batch_schema.load(request.get_json() or {})
+    stmt = db.select(Review).options(joinedload(Review.film)).where(Review.id.in_(ids))
+    by_id = {r.id: r for r in db.session.scalars(stmt)}
+
+    ident = _current_user()
+    visible, forbidden = [], []
+    for review_id in ids:
+        r = by_id.get(review_id)
+        if r is not None:
+            (visible if _can_view(r, ident) else forbidden).append(r)
     return {
-        "data": read_many.dump(pager.items),
-        "meta": {"page": page, "per_page": per_page, "total": pager.total, "pages": pager.pages},
+        "data": dump_many(visible),
+        "not_found": [i for i in ids if i not in by_id],
+        "forbidden": [r.id for r in forbidden],
     }, 200
 
 
 # ========= LIST REVIEWS =========
 # GET /films/<film_id>/reviews
 @review_bp.get("")
+@query_budget(4)
 def list_reviews(film_id: int):
     # 404 if film missing
-    err = _ensure_film_or_404(film_id)
+    _, err = _resolve(film_id)
     if err:
         return err
 
@@ -121,28 +304,23 @@ def list_reviews(film_id: int):
     page = max(1, page)
     per_page = max(1, min(per_page, 100))
 
-    # Only published reviews are public
-    stmt = (
-        db.select(Review)
-        .options(selectinload(Review.film))
-        .where(Review.film_id == film_id, Review.status == "published")
-        .order_by(Review.created_at.desc())
-    )
-    pager = db.paginate(stmt, page=page, per_page=per_page, error_out=False)
+    stmt = build_film_reviews_query(film_id)
+    items, meta = paginate(stmt, page, per_page, tables=("reviews",))
 
     return {
-        "data": read_many.dump(pager.items),
-        "meta": {"page": page, "per_page": per_page, "total": pager.total, "pages": pager.pages},
+        "data": dump_many(items),
+        "meta": meta,
     }, 200
 
 
 # ========= CREATE NEW REVIEW =========
 # POST /films/<film_id>/reviews
 @review_bp.post("")
+@query_budget(5)
 @jwt_required()
 def create_review(film_id: int):
     # 404 if film missing
-    err = _ensure_film_or_404(film_id)
+    _, err = _resolve(film_id)
     if err:
         return err
 
@@ -164,32 +342,32 @@ def create_review(film_id: int):
 
     try:
         db.session.add(new_review)
+        db.session.flush()      # INSERT now: assigns the id, and a duplicate fails before the counters move
+        review_id = new_review.id
+        after = review_contribution(new_review)
+        _record_review_change(film_id, ident["id"], None, after)
         db.session.commit()
     except Exception as e:
         # rely on global error handlers for IntegrityError, etc., if configured
         db.session.rollback()
         raise e
 
-    return read_schema.dump(new_review), 201
+    _after_review_write(film_id, ident["id"], None, after)
+    r, err = _resolve(film_id, review_id, refresh=True)
+    return err or (read_schema.dump(r), 201)
 
 
 # ========= GET ONE REVIEW =========
 # GET /films/<film_id>/reviews/<review_id>
 @review_bp.get("/<int:review_id>")
+@query_budget(1)
 def get_review(film_id: int, review_id: int):
-    err = _ensure_film_or_404(film_id)
+    r, err = _resolve(film_id, review_id)
     if err:
         return err
 
-    r = db.session.get(Review, review_id)
-    if not r or r.film_id != film_id:
-        return {"error": "not_found", "detail": "Review not found"}, 404
-
-    ident = _current_user()
-    if r.status != "published":
-        # allow if owner or admin
-        if not ident or (ident["id"] != r.user_id and not _is_admin(ident)):
-            return _forbidden("Not allowed to view this review")
+    if not _can_view(r, _current_user()):
+        return _forbidden("Not allowed to view this review")
 
     return read_schema.dump(r), 200
 
@@ -197,16 +375,13 @@ def get_review(film_id: int, review_id: int):
 # ========= UPDATE REVIEW =========
 # PATCH /films/<film_id>/reviews/<review_id>
 @review_bp.patch("/<int:review_id>")
+@query_budget(5)
 @jwt_required()
 def update_review(film_id: int, review_id: int):
-    err = _ensure_film_or_404(film_id)
+    r, err = _resolve(film_id, review_id, for_update=True)
     if err:
         return err
 
-    r = db.session.get(Review, review_id)
-    if not r or r.film_id != film_id:
-        return {"error": "not_found", "detail": "Review not found"}, 404
-
     ident = _current_user()
     if ident["id"] != r.user_id and not _is_admin(ident):
         return _forbidden("Only the author or admin can edit")
@@ -218,6 +393,8 @@ def update_review(film_id: int, review_id: int):
     if "film_id" in payload or "user_id" in payload:
         return {"error": "bad_request", "detail": "film_id and user_id cannot be changed"}, 400
 
+    before = review_contribution(r)
+
     # Apply allowed fields
     for k in ("rating", "body", "status"):
         if k in data:
@@ -236,45 +413,48 @@ def update_review(film_id: int, review_id: int):
         if next_status == "flagged" and not r.flagged_at:
             r.flagged_at = db.func.now()
 
+    after = review_contribution(r)
+    _record_review_change(film_id, r.user_id, before, after)
+    user_id = r.user_id     # read before commit() expires r
     db.session.commit()
-    return read_schema.dump(r), 200
+    _after_review_write(film_id, user_id, before, after)
+    r, err = _resolve(film_id, review_id, refresh=True)
+    return err or (read_schema.dump(r), 200)
 
 
 # ========= DELETE REVIEW =========
 # DELETE /films/<film_id>/reviews/<review_id>
 @review_bp.delete("/<int:review_id>")
+@query_budget(4)
 @jwt_required()
 def delete_review(film_id: int, review_id: int):
-    err = _ensure_film_or_404(film_id)
+    r, err = _resolve(film_id, review_id, for_update=True)
     if err:
         return err
 
-    r = db.session.get(Review, review_id)
-    if not r or r.film_id != film_id:
-        return {"error": "not_found", "detail": "Review not found"}, 404
-
     ident = _current_user()
     if ident["id"] != r.user_id and not _is_admin(ident):
         return _forbidden("Only the author or admin can delete")
 
+    before = review_contribution(r)
+    _record_review_change(film_id, r.user_id, before, None)
+    user_id = r.user_id
     db.session.delete(r)
     db.session.commit()
+    _after_review_write(film_id, user_id, before, None)
     return "", 204
 
 
 # ========= PUBLISH REVIEW =========
 # POST /films/<film_id>/reviews/<review_id>/publish
 @review_bp.post("/<int:review_id>/publish")
+@query_budget(5)
 @jwt_required()
 def publish_review(film_id: int, review_id: int):
-    err = _ensure_film_or_404(film_id)
+    r, err = _resolve(film_id, review_id, for_update=True)
     if err:
         return err
 
-    r = db.session.get(Review, review_id)
-    if not r or r.film_id != film_id:
-        return {"error": "not_found", "detail": "Review not found"}, 404
-
     ident = _current_user()
     if ident["id"] != r.user_id and not _is_admin(ident):
         return _forbidden("Only the author or admin can publish")
@@ -282,29 +462,37 @@ def publish_review(film_id: int, review_id: int):
     if not r.body:
         return {"error": "bad_request", "detail": "Body required when publishing."}, 400
 
+    before = review_contribution(r)
     r.status = "published"
     if not r.published_at:
         r.published_at = db.func.now()
+    after = review_contribution(r)
+    _record_review_change(film_id, r.user_id, before, after)
+    user_id = r.user_id     # read before commit() expires r
     db.session.commit()
-    return read_schema.dump(r), 200
+    _after_review_write(film_id, user_id, before, after)
+    r, err = _resolve(film_id, review_id, refresh=True)
+    return err or (read_schema.dump(r), 200)
 
 
 # ========= FLAG REVIEW =========
 # POST /films/<film_id>/reviews/<review_id>/flag
 @review_bp.post("/<int:review_id>/flag")
+@query_budget(5)
 @jwt_required()
 def flag_review(film_id: int, review_id: int):
-    err = _ensure_film_or_404(film_id)
+    r, err = _resolve(film_id, review_id, for_update=True)
     if err:
         return err
 
-    r = db.session.get(Review, review_id)
-    if not r or r.film_id != film_id:
-        return {"error": "not_found", "detail": "Review not found"}, 404
-
     # Anyone logged in can flag
+    before = review_contribution(r)
     r.status = "flagged"
     if not r.flagged_at:
         r.flagged_at = db.func.now()
+    _record_review_change(film_id, r.user_id, before, None)
+    user_id = r.user_id     # read before commit() expires r
     db.session.commit()
-    return read_schema.dump(r), 200
+    _after_review_write(film_id, user_id, before, None)
+    r, err = _resolve(film_id, review_id, refresh=True)
+    return err or (read_schema.dump(r), 200)
@@ -2,30 +2,43 @@
 Controller for the current user's watchlist.
 
 Handles:
-  - List watchlist entries (with pagination)
+  - List watchlist entries (page/per_page with the total from the same query, or a keyset cursor)
   - Add a film to the watchlist
   - Remove a film from the watchlist
+  - Add or remove many films in one request
 
 Note:
   - ValidationError and IntegrityError are handled globally in utils.error_handlers.
+  - Every add/remove moves users.watchlist_count and films.watchlist_count in the
+    same transaction (utils.counters).
 """
 
+# Built-in imports
+from datetime import datetime
+
 # Installed imports
 from flask import Blueprint, request
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from sqlalchemy.orm import selectinload
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import contains_eager
 
 # Local imports
-from extensions import db
+from extensions import db, profile_cache, response_cache
 from models.watchlist import Watchlist
 from models.films import Film
-from schemas.watchlist_schema import WatchlistEntrySchema
+from schemas.watchlist_schema import WatchlistBulkSchema, WatchlistEntrySchema
+from utils.counters import count_watchlist_change
+from utils.pagination import InvalidCursor, decode_cursor, encode_cursor, paginate, invalidate_totals
+from utils.serializers import compile_dump
+from utils.query_budget import query_budget
 
 watchlist_bp = Blueprint("watchlist", __name__)     # url_prefix set in controllers/__init__.py
 
 # Schemas
 schema = WatchlistEntrySchema()
 read_many = WatchlistEntrySchema(many=True)
+dump_many = compile_dump(read_many)   # compiled read_many.dump
+bulk_schema = WatchlistBulkSchema()
 
 # -------------------------------
 # Watchlist for current user
@@ -37,11 +50,37 @@ def _current_user_id():
         return ident["id"]
     return int(ident)
 
+def _after_watchlist_write(user_id: int, film_ids):
+    """Drop cached totals/responses showing the changed counters (call after commit)."""
+    invalidate_totals("watchlist")
+    profile_cache.invalidate(user_id)
+    # film lists and review feeds embed each film's watchlist_count as well
+    response_cache.invalidate("films", "reviews", *(f"film:{film_id}" for film_id in film_ids))
+
+def build_watchlist_query(user_id: int):
+    """A user's entries with their films, most recently added first (also EXPLAINed by `flask ops check-plans`).
+
+    (added_at, film_id) is both the sort order and the keyset cursor.
+    """
+    return (
+        db.select(Watchlist)
+        .join(Watchlist.film)
+        .options(contains_eager(Watchlist.film))
+        .where(Watchlist.user_id == user_id)
+        .order_by(Watchlist.added_at.desc(), Watchlist.film_id.desc())
+    )
+
  # ========= LIST WATCHLIST =========
 @watchlist_bp.get("")
+@query_budget(2)     # 1, plus a COUNT when ?page is past the end
 @jwt_required()
 def list_watchlist():
-    """List the current user's watchlist entries (supports ?page & ?per_page)."""
+    """List the current user's watchlist entries.
+
+    ?page & ?per_page return a page and its total from one statement. Pass
+    ?cursor= (empty on the first request, then meta.next_cursor) for keyset
+    pagination instead, which stays as cheap on page 500 as on page 1.
+    """
     user_id = _current_user_id()
 
     # pagination guards
@@ -53,24 +92,50 @@ def list_watchlist():
     page = max(1, page)
     per_page = max(1, min(100, per_page))
 
-    base = db.select(Watchlist).where(Watchlist.user_id == user_id)
-    total = db.session.scalar(db.select(db.func.count()).select_from(base.subquery()))
-    rows_query = (
-        base.options(selectinload(Watchlist.film))
-            .order_by(Watchlist.added_at.desc())
-            .offset((page - 1) * per_page)
-            .limit(per_page)
-    )
-    rows = db.session.scalars(rows_query).all()
+    stmt = build_watchlist_query(user_id)
+
+    # keyset mode: ?cursor= (empty for the first page) switches off OFFSET and the total
+    if "cursor" in request.args:
+        return _list_watchlist_by_cursor(stmt, request.args["cursor"], per_page)
+
+    rows, meta = paginate(stmt, page, per_page, tables=("watchlist",))
 
     return {
-        "data": read_many.dump(rows),
-        "meta": {"page": page, "per_page": per_page, "total": total}
+        "data": dump_many(rows),
+        "meta": meta
+    }, 200
+
+
+def _list_watchlist_by_cursor(stmt, cursor: str, per_page: int):
+    """Serve one watchlist page ordered by (added_at, film_id) DESC using a keyset cursor."""
+    if cursor:
+        try:
+            added_at, film_id = decode_cursor(cursor, datetime, int)
+        except InvalidCursor:
+            return {"error": "bad_request", "detail": "cursor is invalid"}, 400
+        stmt = stmt.where(
+            db.tuple_(Watchlist.added_at, Watchlist.film_id) < db.tuple_(added_at, film_id)
+        )
+
+    # fetch one extra row to learn whether another page exists
+    rows = db.session.scalars(stmt.limit(per_page + 1)).all()
+    has_more = len(rows) > per_page
+    rows = rows[:per_page]
+
+    next_cursor = None
+    if has_more:
+        last = rows[-1]
+        next_cursor = encode_cursor(last.added_at, last.film_id)
+
+    return {
+        "data": dump_many(rows),
+        "meta": {"per_page": per_page, "next_cursor": next_cursor},
     }, 200
 
 
  # ========= ADD TO WATCHLIST =========
 @watchlist_bp.post("")
+@query_budget(6)
 @jwt_required()
 def add_to_watchlist():
     """Add a film to the current user's watchlist."""
@@ -87,19 +152,92 @@ def add_to_watchlist():
 
     entry = Watchlist(user_id=user_id, film_id=film_id)
     db.session.add(entry)
+    count_watchlist_change(user_id, [film_id], +1)
     db.session.commit()
+    _after_watchlist_write(user_id, [film_id])
     return schema.dump(entry), 201
 
 
  # ========= REMOVE FROM WATCHLIST =========
 @watchlist_bp.delete("/<int:film_id>")
+@query_budget(2)
 @jwt_required()
 def remove_from_watchlist(film_id: int):
     """Remove a film from the current user's watchlist."""
     user_id = _current_user_id()
-    entry = db.session.get(Watchlist, (user_id, film_id))
-    if not entry:
+    # only a request whose DELETE removed the row moves the counters (two racing removes: one 204, one 404)
+    stmt = (
+        db.delete(Watchlist)
+        .where(Watchlist.user_id == user_id, Watchlist.film_id == film_id)
+        .returning(Watchlist.film_id)
+    )
+    removed = db.session.scalars(stmt).all()
+    if not removed:
+        db.session.rollback()
         return {"error": "not_found", "detail": "Not in watchlist"}, 404
-    db.session.delete(entry)
+    count_watchlist_change(user_id, removed, -1)
     db.session.commit()
+    _after_watchlist_write(user_id, [film_id])
     return "", 204
+
+
+ # ========= BULK ADD TO WATCHLIST =========
+@watchlist_bp.post("/bulk")
+@query_budget(3)
+@jwt_required()
+def bulk_add_to_watchlist():
+    """Add many films to the current user's watchlist.
+
+    Body: {"film_ids": [...]}. Ids are checked against films in one query and the
+    rest inserted with ON CONFLICT DO NOTHING, so re-sending a list is harmless.
+    """
+    user_id = _current_user_id()
+    film_ids = bulk_schema.load(request.get_json() or {})
+
+    existing = set(db.session.scalars(db.select(Film.id).where(Film.id.in_(film_ids))))
+    to_add = [film_id for film_id in film_ids if film_id in existing]
+    added = set()
+    if to_add:
+        # executemany: compiled once, sent as multi-row INSERTs ("insertmanyvalues")
+        stmt = insert(Watchlist.__table__).on_conflict_do_nothing().returning(Watchlist.film_id)
+        rows = [{"user_id": user_id, "film_id": film_id} for film_id in to_add]
+        added = set(db.session.scalars(stmt, rows))
+        count_watchlist_change(user_id, added, +1)
+        db.session.commit()
+    if added:
+        _after_watchlist_write(user_id, added)
+
+    return {
+        "added": [film_id for film_id in to_add if film_id in added],
+        "already_present": [film_id for film_id in to_add if film_id not in added],
+        "not_found": [film_id for film_id in film_ids if film_id not in existing],
+    }, 200
+
+
+ # ========= BULK REMOVE FROM WATCHLIST =========
+@watchlist_bp.delete("/bulk")
+@query_budget(2)
+@jwt_required()
+def bulk_remove_from_watchlist():
+    """Remove many films from the current user's watchlist.
+
+    Body: {"film_ids": [...]}. Ids that weren't on the watchlist are listed in `not_found`.
+    """
+    user_id = _current_user_id()
+    film_ids = bulk_schema.load(request.get_json() or {})
+
+    stmt = (
+        db.delete(Watchlist)
+        .where(Watchlist.user_id == user_id, Watchlist.film_id.in_(film_ids))
+        .returning(Watchlist.film_id)
+    )
+    removed = set(db.session.scalars(stmt))
+    count_watchlist_change(user_id, removed, -1)
+    db.session.commit()
+    if removed:
+        _after_watchlist_write(user_id, removed)
+
+    return {
+        "removed": [film_id for film_id in film_ids if film_id in removed],
+        "not_found": [film_id for film_id in film_ids if film_id not in removed],
+    }, 200
@@ -1,7 +1,18 @@
 from flask_sqlalchemy import SQLAlchemy
-from flask_migrate import Migrate
 from flask_jwt_extended import JWTManager
 
-db = SQLAlchemy()     # ORM (models <-> Postgres)
-migrate = Migrate()   # Alembic migrations
-jwt = JWTManager()    # JWT auth 
+from utils.http_cache import ResponseCache
+from utils.metrics import Metrics
+from utils.passwords import PasswordHasher
+from utils.profile_cache import ProfileCache
+from utils.replicas import ReplicaRouter, RoutingSession
+from utils.token_denylist import TokenDenylist
+
+db = SQLAlchemy(session_options={"class_": RoutingSession})     # ORM (models <-> Postgres)
+jwt = JWTManager()    # JWT auth
+response_cache = ResponseCache()  # cached public GET responses + ETags
+metrics = Metrics()  # request / SQL / pool metrics for GET /metrics
+passwords = PasswordHasher()  # password hashing in a bounded process pool
+token_denylist = TokenDenylist()  # revoked JWTs (in memory, backed by revoked_tokens)
+profile_cache = ProfileCache()  # GET /auth/me profiles by user id + ETags
+replicas = ReplicaRouter()  # GET reads on replicas, writes (and recent writers) on the primary
@@ -0,0 +1,64 @@
+"""
+Gunicorn settings for CineCritic (loaded automatically from the working directory).
+
+The runtime profile comes from the environment (command-line flags still win):
+
+  WEB_CONCURRENCY          worker processes (default 2)
+  GUNICORN_WORKER_CLASS    "sync" (default) or "gthread"
+  GUNICORN_THREADS         threads per worker; more than 1 implies gthread
+  GUNICORN_PRELOAD=1       import the app once in the master and fork workers from it
+  GUNICORN_TIMEOUT         seconds before a silent worker is restarted (default 30)
+
+Keep DB_POOL_SIZE + DB_MAX_OVERFLOW at or above GUNICORN_THREADS, or threads
+queue for connections. With preloading, workers share the master's memory
+pages, but not its database connections: post_fork() makes each worker drop
+the pool it inherited and open its own.
+
+Each worker is a separate process, so Prometheus metrics are written to a
+directory shared by all of them and summed when /metrics is scraped. The
+directory must be set before the app (and prometheus_client) is imported, and
+emptied on start so counters from a previous run don't leak in.
+"""
+
+# Built-in imports
+import glob
+import os
+import tempfile
+
+os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", os.path.join(tempfile.gettempdir(), "cinecritic-metrics"))
+# each worker hashes passwords in its own small process pool (utils/passwords.py)
+os.environ.setdefault("PASSWORD_HASH_WORKERS", "2")
+
+bind = f"0.0.0.0:{os.getenv('PORT', '5000')}"
+workers = int(os.getenv("WEB_CONCURRENCY", "2"))
+worker_class = os.getenv("GUNICORN_WORKER_CLASS", "sync")
+threads = int(os.getenv("GUNICORN_THREADS", "1"))
+preload_app = os.getenv("GUNICORN_PRELOAD", "0") == "1"
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "30"))
+
+
+def on_starting(server):
+    path = os.environ["PROMETHEUS_MULTIPROC_DIR"]
+    os.makedirs(path, exist_ok=True)
+    for stale in glob.glob(os.path.join(path, "*.db")):
+        os.remove(stale)
+
+
+def post_fork(server, worker):
+    if not server.cfg.preload_app:
+        return
+    # the master built the engines (and may have connected, e.g. for startup
+    # checks); a socket shared by two processes corrupts both sides' traffic, so
+    # forget the inherited connections without closing them under the master
+    from extensions import db
+    from main import app
+
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose(close=False)
+
+
+def child_exit(server, worker):
+    # counters and histograms keep the dead worker's totals; this drops its live gauges
+    from prometheus_client import multiprocess
+    multiprocess.mark_process_dead(worker.pid)
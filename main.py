@@ -1,31 +1,96 @@
 # Built-in imports
 import os
+from datetime import timedelta
 
 # Installed imports
 from flask import Flask
+from flask.cli import AppGroup
 from dotenv import load_dotenv
 
 # Local imports
-from extensions import db, migrate, jwt
+from extensions import db, jwt, response_cache, metrics, passwords, profile_cache, replicas, token_denylist
 from controllers import register_controllers
+from utils.engine_options import engine_options
 from utils.error_handlers import register_error_handlers
+from utils.json_provider import FastJSONProvider
+from utils.pagination import parse_total_strategies
 
 load_dotenv()
 
-def create_app():
+def create_app(config=None):
+    """Build the app from the environment; `config` entries override it (asgi.py uses that)."""
     app = Flask(__name__)
+    app.cli = LazyCLI(app)
 
     app.config["SQLALCHEMY_DATABASE_URI"] = os.getenv("DATABASE_URL")
+    # streaming replicas serving GET reads (comma-separated URLs), see utils/replicas.py
+    app.config["DATABASE_REPLICA_URLS"] = [u.strip() for u in os.getenv("DATABASE_REPLICA_URLS", "").split(",") if u.strip()]
+    # after a write, that client reads from the primary for this long (per worker, plus a cookie:
+    # bearer-only clients without cookies can read stale data on another worker, see README)
+    app.config["REPLICA_STICKY_SECONDS"] = float(os.getenv("REPLICA_STICKY_SECONDS", "5"))
+    # replicas further behind than this get no reads; lag is re-checked every few seconds
+    app.config["REPLICA_MAX_LAG_SECONDS"] = float(os.getenv("REPLICA_MAX_LAG_SECONDS", "10"))
+    app.config["REPLICA_LAG_CHECK_SECONDS"] = float(os.getenv("REPLICA_LAG_CHECK_SECONDS", "5"))
+    # give up connecting to a replica after this long (the lag check runs inside a request)
+    app.config["REPLICA_CONNECT_TIMEOUT_SECONDS"] = float(os.getenv("REPLICA_CONNECT_TIMEOUT_SECONDS", "2"))
+    # connection pool per worker process: size, overflow, seconds to wait for a connection,
+    # max connection age (-1 = no limit), test connections on checkout (utils/engine_options.py)
+    app.config["DB_POOL_SIZE"] = int(os.getenv("DB_POOL_SIZE", "5"))
+    app.config["DB_MAX_OVERFLOW"] = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+    app.config["DB_POOL_TIMEOUT"] = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+    app.config["DB_POOL_RECYCLE"] = int(os.getenv("DB_POOL_RECYCLE", "-1"))
+    app.config["DB_POOL_PRE_PING"] = os.getenv("DB_POOL_PRE_PING", "0") == "1"
+    # DATABASE_URL is PgBouncer in transaction mode: no app-side pool, no prepared statements
+    app.config["DB_PGBOUNCER"] = os.getenv("DB_PGBOUNCER", "0") == "1"
     # disable object change tracking to save memory
     app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
     app.config["JWT_SECRET_KEY"] = os.getenv("JWT_SECRET_KEY", "dev-key")
+    # short-lived access tokens; clients renew them at POST /auth/refresh instead of logging in again
+    app.config["JWT_ACCESS_TOKEN_EXPIRES"] = timedelta(minutes=int(os.getenv("JWT_ACCESS_TOKEN_MINUTES", "15")))
+    app.config["JWT_REFRESH_TOKEN_EXPIRES"] = timedelta(days=int(os.getenv("JWT_REFRESH_TOKEN_DAYS", "30")))
+    # revoked tokens kept in memory per worker, re-synced from revoked_tokens every few seconds
+    app.config["JWT_DENYLIST_MAX_ENTRIES"] = int(os.getenv("JWT_DENYLIST_MAX_ENTRIES", "100000"))
+    app.config["JWT_DENYLIST_SYNC_SECONDS"] = float(os.getenv("JWT_DENYLIST_SYNC_SECONDS", "5"))
+    # orjson-backed encoder; falls back to the stdlib wherever output could differ
+    app.json = FastJSONProvider(app)
     # To keep the order of keys in JSON response
     app.json.sort_keys = False
+    # how list endpoints compute meta.total: "endpoint=exact|cached|estimate|none,..."
+    app.config["PAGINATION_TOTALS"] = parse_total_strategies(os.getenv("PAGINATION_TOTALS"))
+    app.config["PAGINATION_TOTAL_TTL"] = float(os.getenv("PAGINATION_TOTAL_TTL", "30"))
+    app.config["PAGINATION_ESTIMATE_MIN"] = int(os.getenv("PAGINATION_ESTIMATE_MIN", "1000"))
+    # per-process cache for public GETs (seconds / entries / body bytes)
+    app.config["RESPONSE_CACHE_ENABLED"] = os.getenv("RESPONSE_CACHE_ENABLED", "1") == "1"
+    app.config["RESPONSE_CACHE_TTL"] = float(os.getenv("RESPONSE_CACHE_TTL", "30"))
+    app.config["RESPONSE_CACHE_MAX_ENTRIES"] = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "2048"))
+    app.config["RESPONSE_CACHE_MAX_BYTES"] = int(os.getenv("RESPONSE_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+    # per-process cache of GET /auth/me profiles (seconds / users)
+    app.config["PROFILE_CACHE_ENABLED"] = os.getenv("PROFILE_CACHE_ENABLED", "1") == "1"
+    app.config["PROFILE_CACHE_TTL"] = float(os.getenv("PROFILE_CACHE_TTL", "60"))
+    app.config["PROFILE_CACHE_MAX_ENTRIES"] = int(os.getenv("PROFILE_CACHE_MAX_ENTRIES", "10000"))
+    # Prometheus metrics at /metrics; set METRICS_TOKEN to require "Authorization: Bearer <token>"
+    app.config["METRICS_ENABLED"] = os.getenv("METRICS_ENABLED", "1") == "1"
+    app.config["METRICS_TOKEN"] = os.getenv("METRICS_TOKEN") or None
+    # password hashing: werkzeug method for new hashes, pool processes (0 = inline; gunicorn.conf.py
+    # defaults it to 2), queue bound, wait limit
+    app.config["PASSWORD_HASH_METHOD"] = os.getenv("PASSWORD_HASH_METHOD", "scrypt:32768:8:1")
+    app.config["PASSWORD_HASH_WORKERS"] = int(os.getenv("PASSWORD_HASH_WORKERS", "0"))
+    app.config["PASSWORD_HASH_MAX_PENDING"] = int(os.getenv("PASSWORD_HASH_MAX_PENDING", "32"))
+    app.config["PASSWORD_HASH_TIMEOUT"] = float(os.getenv("PASSWORD_HASH_TIMEOUT", "10"))
+    # @query_budget checks: "off" (default), "log" or "raise" when a route runs too many SQL statements
+    app.config["QUERY_BUDGET_MODE"] = os.getenv("QUERY_BUDGET_MODE", "off")
+    app.config.update(config or {})
+    app.config.setdefault("SQLALCHEMY_ENGINE_OPTIONS", engine_options(app.config))
 
-    # wire extensions
+    # wire extensions (metrics first: it picks the engine's pool class; replicas add their binds)
+    metrics.init_app(app)
+    replicas.init_app(app)
     db.init_app(app)
-    migrate.init_app(app, db)
     jwt.init_app(app)
+    token_denylist.init_app(app)
+    response_cache.init_app(app)
+    profile_cache.init_app(app)
+    passwords.init_app(app)
 
     # Import models after db is setup so Alembic sees them
     import models  # noqa: F401
@@ -53,7 +118,40 @@ def create_app():
     def health():
         return {"ok": True}, 200
 
+    if metrics.enabled:
+        @app.get("/metrics", endpoint="metrics")
+        def prometheus_metrics():
+            return metrics.render()
+
     return app
 
+
+class LazyCLI(AppGroup):
+    """app.cli that sets up `flask db` and `flask ops` on first lookup, so web workers never import them."""
+
+    def __init__(self, app):
+        super().__init__(app.name)
+        self.app = app
+
+    def get_command(self, ctx, name):
+        register_cli(self.app)
+        return super().get_command(ctx, name)
+
+    def list_commands(self, ctx):
+        register_cli(self.app)
+        return super().list_commands(ctx)
+
+
+def register_cli(app):
+    """Set up Flask-Migrate and the `flask ops` commands (Alembic and the CLI tooling are slow to import)."""
+    if "migrate" in app.extensions:
+        return
+    from flask_migrate import Migrate
+    from controllers.cli_controller import ops_commands
+
+    Migrate(app, db)
+    app.cli.add_command(ops_commands.cli, name="ops")
+
+
 # for `flask run`
 app = create_app()
@@ -0,0 +1,45 @@
+"""add film_rating_stats
+
+Revision ID: 5b7e2d4c81a0
+Revises: a3c1f09b5d27
+Create Date: 2026-10-16 11:40:05.118342
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5b7e2d4c81a0'
+down_revision = 'a3c1f09b5d27'
+branch_labels = None
+depends_on = None
+
+BUCKETS = [(x / 2, f"ratings_{str(x / 2).replace('.', '_')}") for x in range(1, 11)]
+
+
+def upgrade():
+    op.create_table('film_rating_stats',
+    sa.Column('film_id', sa.Integer(), nullable=False),
+    sa.Column('review_count', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('rating_sum', sa.Numeric(precision=12, scale=1), server_default='0', nullable=False),
+    sa.Column('rating_mean', sa.Numeric(precision=3, scale=2), nullable=True),
+    *[sa.Column(col, sa.Integer(), server_default='0', nullable=False) for _, col in BUCKETS],
+    sa.ForeignKeyConstraint(['film_id'], ['films.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('film_id')
+    )
+
+    # backfill from existing published reviews
+    columns = ", ".join(col for _, col in BUCKETS)
+    counts = ", ".join(f"count(*) FILTER (WHERE rating = {step})" for step, _ in BUCKETS)
+    op.execute(f"""
+        INSERT INTO film_rating_stats (film_id, review_count, rating_sum, rating_mean, {columns})
+        SELECT film_id, count(*), sum(rating), round(avg(rating), 2), {counts}
+        FROM reviews
+        WHERE status = 'published'
+        GROUP BY film_id
+    """)
+
+
+def downgrade():
+    op.drop_table('film_rating_stats')
@@ -0,0 +1,56 @@
+"""add trigram indexes for film title/director search
+
+Revision ID: a3c1f09b5d27
+Revises: 8ef7ffa0d77f
+Create Date: 2026-10-16 10:12:31.504211
+
+GIN trigram indexes let Postgres answer the `ILIKE '%term%'` filters in
+list_films without a sequential scan. They need the pg_trgm extension; when
+the server does not offer it (or we lack the privilege to create it) the
+upgrade skips the indexes and search keeps working unindexed.
+
+The indexes are intentionally not declared on the Film model, since
+`flask ops create` must also work on servers without pg_trgm.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a3c1f09b5d27'
+down_revision = '8ef7ffa0d77f'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    bind = op.get_bind()
+    available = bind.execute(
+        sa.text("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")
+    ).scalar()
+    if not available:
+        print("pg_trgm is not available on this server; skipping trigram indexes.")
+        return
+
+    # savepoint so a missing CREATE privilege doesn't abort the whole upgrade
+    try:
+        with bind.begin_nested():
+            bind.execute(sa.text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+    except sa.exc.DBAPIError:
+        print("Could not create the pg_trgm extension; skipping trigram indexes.")
+        return
+
+    op.create_index(
+        'ix_films_title_trgm', 'films', ['title'],
+        postgresql_using='gin', postgresql_ops={'title': 'gin_trgm_ops'},
+    )
+    op.create_index(
+        'ix_films_director_trgm', 'films', ['director'],
+        postgresql_using='gin', postgresql_ops={'director': 'gin_trgm_ops'},
+    )
+
+
+def downgrade():
+    # the extension is left installed; other objects may depend on it
+    op.execute("DROP INDEX IF EXISTS ix_films_director_trgm")
+    op.execute("DROP INDEX IF EXISTS ix_films_title_trgm")
@@ -0,0 +1,44 @@
+"""add hot-path indexes for feeds, per-film reviews, watchlist and genre filter
+
+Revision ID: c94f1e7a2b63
+Revises: 5b7e2d4c81a0
+Create Date: 2026-10-16 13:05:52.640177
+
+Built with CREATE INDEX CONCURRENTLY so deploys don't block writes on large
+tables. CONCURRENTLY cannot run inside a transaction, hence the autocommit
+block; IF NOT EXISTS makes a retry after a failed build safe (drop any
+INVALID leftover index by hand first).
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'c94f1e7a2b63'
+down_revision = '5b7e2d4c81a0'
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    ('ix_reviews_status_published_at', 'reviews', ['status', 'published_at', 'id']),
+    ('ix_reviews_film_status_created', 'reviews', ['film_id', 'status', 'created_at']),
+    ('ix_watchlist_user_added', 'watchlist', ['user_id', 'added_at']),
+    ('ix_film_genres_genre_id', 'film_genres', ['genre_id', 'film_id']),
+]
+
+
+def upgrade():
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(
+                name, table, columns,
+                postgresql_concurrently=True, if_not_exists=True,
+            )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(
+                name, table_name=table,
+                postgresql_concurrently=True, if_exists=True,
+            )
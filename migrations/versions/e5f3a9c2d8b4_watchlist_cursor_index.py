@@ -0,0 +1,43 @@
+"""extend the watchlist listing index with film_id for keyset pagination
+
+Revision ID: e5f3a9c2d8b4
+Revises: d2a8e4b7c1f9
+Create Date: 2026-10-16 23:48:31.207644
+
+GET /users/me/watchlist now orders by (added_at, film_id) and pages with a
+cursor on that pair, so the index gains film_id as its last column. The new
+index is built CONCURRENTLY before the old one is dropped, so listings keep
+an index throughout (see c94f1e7a2b63 for the autocommit/IF NOT EXISTS notes).
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'e5f3a9c2d8b4'
+down_revision = 'd2a8e4b7c1f9'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_watchlist_user_added_film', 'watchlist', ['user_id', 'added_at', 'film_id'],
+            postgresql_concurrently=True, if_not_exists=True,
+        )
+        op.drop_index(
+            'ix_watchlist_user_added', table_name='watchlist',
+            postgresql_concurrently=True, if_exists=True,
+        )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_watchlist_user_added', 'watchlist', ['user_id', 'added_at'],
+            postgresql_concurrently=True, if_not_exists=True,
+        )
+        op.drop_index(
+            'ix_watchlist_user_added_film', table_name='watchlist',
+            postgresql_concurrently=True, if_exists=True,
+        )
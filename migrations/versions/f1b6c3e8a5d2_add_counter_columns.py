@@ -0,0 +1,81 @@
+"""add review/watchlist counter columns to users and films
+
+Revision ID: f1b6c3e8a5d2
+Revises: e5f3a9c2d8b4
+Create Date: 2026-10-17 00:31:44.918305
+
+users.review_count, users.watchlist_count and films.watchlist_count are kept
+by utils/counters.py. The columns are added with a constant default (no table
+rewrite) and backfilled from the current rows. Run `flask ops
+reconcile-counters` once the new code is live to pick up writes that older
+workers made in between.
+
+The two indexes serve counter upkeep and the ON DELETE CASCADEs that had to
+scan reviews/watchlist by user_id/film_id; they are built CONCURRENTLY (see
+c94f1e7a2b63).
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f1b6c3e8a5d2'
+down_revision = 'e5f3a9c2d8b4'
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    ('ix_reviews_user_status', 'reviews', ['user_id', 'status']),
+    ('ix_watchlist_film_id', 'watchlist', ['film_id']),
+]
+
+BACKFILL = [
+    """
+    UPDATE users SET review_count = counts.n
+    FROM (SELECT user_id, count(*) AS n FROM reviews WHERE status = 'published' GROUP BY user_id) AS counts
+    WHERE users.id = counts.user_id
+    """,
+    """
+    UPDATE users SET watchlist_count = counts.n
+    FROM (SELECT user_id, count(*) AS n FROM watchlist GROUP BY user_id) AS counts
+    WHERE users.id = counts.user_id
+    """,
+    """
+    UPDATE films SET watchlist_count = counts.n
+    FROM (SELECT film_id, count(*) AS n FROM watchlist GROUP BY film_id) AS counts
+    WHERE films.id = counts.film_id
+    """,
+]
+
+
+def upgrade():
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('review_count', sa.Integer(), server_default='0', nullable=False))
+        batch_op.add_column(sa.Column('watchlist_count', sa.Integer(), server_default='0', nullable=False))
+    with op.batch_alter_table('films', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('watchlist_count', sa.Integer(), server_default='0', nullable=False))
+
+    for statement in BACKFILL:
+        op.execute(statement)
+
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(
+                name, table, columns,
+                postgresql_concurrently=True, if_not_exists=True,
+            )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(
+                name, table_name=table,
+                postgresql_concurrently=True, if_exists=True,
+            )
+
+    with op.batch_alter_table('films', schema=None) as batch_op:
+        batch_op.drop_column('watchlist_count')
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.drop_column('watchlist_count')
+        batch_op.drop_column('review_count')
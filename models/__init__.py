@@ -11,5 +11,7 @@ from .genres import Genre
 from .reviews import Review
 from .watchlist import Watchlist
 from .film_genre import FilmGenre
+from .film_rating_stats import FilmRatingStats
+from .revoked_tokens import RevokedToken
 
-__all__ = ["User", "Film", "Genre", "Review", "Watchlist", "FilmGenre"]
+__all__ = ["User", "Film", "Genre", "Review", "Watchlist", "FilmGenre", "FilmRatingStats", "RevokedToken"]
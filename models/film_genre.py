@@ -12,6 +12,7 @@ Attributes:
 Constraints:
 - Composite primary key of (film_id, genre_id) to ensure uniqueness.
 - CASCADE delete: removing a film or genre deletes associated links.
+- Index on (genre_id, film_id) for the genre_id filter in list_films.
 
 Relationships:
 - Relationships are defined in Film and Genre models via back_populates
@@ -23,3 +24,8 @@ class FilmGenre(db.Model):
     __tablename__ = "film_genres"
     film_id  = db.Column(db.Integer, db.ForeignKey("films.id", ondelete="CASCADE"), primary_key=True)
     genre_id = db.Column(db.Integer, db.ForeignKey("genres.id", ondelete="CASCADE"), primary_key=True)
+
+    __table_args__ = (
+        # the PK leads with film_id; genre filters need genre_id first
+        db.Index("ix_film_genres_genre_id", "genre_id", "film_id"),
+    )
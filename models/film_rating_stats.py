@@ -0,0 +1,48 @@
+"""FilmRatingStats model:
+
+Pre-aggregated rating figures for a film, maintained incrementally by the review
+write paths (see utils/rating_stats.py) so reads never aggregate over reviews.
+Only published reviews contribute.
+
+Attributes:
+- film_id (int): Primary key and foreign key to Film (CASCADE on delete).
+- review_count (int): Number of published reviews.
+- rating_sum (decimal): Sum of their ratings.
+- rating_mean (decimal | None): rating_sum / review_count, NULL when there are none.
+- ratings_0_5 … ratings_5_0 (int): Histogram, one bucket per allowed 0.5-step rating.
+
+Relationships:
+- One-to-one with Film, exposed as the view-only Film.rating_stats (loaded with the film).
+"""
+
+from extensions import db
+
+# allowed ratings, in the same 0.5..5.0 steps the reviews table enforces
+RATING_STEPS = [x / 2 for x in range(1, 11)]
+BUCKET_COLUMNS = [f"ratings_{str(step).replace('.', '_')}" for step in RATING_STEPS]
+
+
+class FilmRatingStats(db.Model):
+    __tablename__ = "film_rating_stats"
+
+    film_id = db.Column(db.Integer, db.ForeignKey("films.id", ondelete="CASCADE"), primary_key=True)
+    review_count = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+    rating_sum = db.Column(db.Numeric(12, 1), nullable=False, default=0, server_default="0")
+    rating_mean = db.Column(db.Numeric(3, 2), nullable=True)
+
+    # histogram buckets (ratings_0_5 … ratings_5_0)
+    ratings_0_5 = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+    ratings_1_0 = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+    ratings_1_5 = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+    ratings_2_0 = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+    ratings_2_5 = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+    ratings_3_0 = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+    ratings_3_5 = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+    ratings_4_0 = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+    ratings_4_5 = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+    ratings_5_0 = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+
+    @property
+    def histogram(self):
+        """Bucket counts keyed by rating ("0.5" … "5.0")."""
+        return {str(step): getattr(self, col) for step, col in zip(RATING_STEPS, BUCKET_COLUMNS)}
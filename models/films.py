@@ -3,12 +3,17 @@
 Represents a film in the CineCritic database. Each film can have multiple reviews,
 be linked to multiple genres, and appear in users’ watchlists.
 
+Counters:
+    - watchlist_count: users with the film on their watchlist, kept by utils/counters.py.
+      (The published review count is rating_stats.review_count.)
+
 Constraints:
     - Unique combination of title and release year.
 Relationships:
     - One-to-many with Review (deletes cascade).
     - Many-to-many with Genre via film_genres.
     - One-to-many with Watchlist entries (deletes cascade).
+    - One-to-one with FilmRatingStats (joined-loaded; removed by the DB cascade).
 """
 from extensions import db
 
@@ -19,11 +24,19 @@ class Film(db.Model):
     release_year = db.Column(db.Integer)
     director = db.Column(db.String(100))
     description = db.Column(db.Text)
+    # maintained by utils/counters.py alongside watchlist writes
+    watchlist_count = db.Column(db.Integer, nullable=False, default=0, server_default="0")
 
     # ========== Relationships ==========
-    reviews = db.relationship("Review", back_populates="film", cascade="all, delete-orphan")
+    # passive_deletes: the FKs' ON DELETE CASCADE removes children, instead of loading and deleting each
+    reviews = db.relationship("Review", back_populates="film", cascade="all, delete-orphan", passive_deletes=True)
     genres = db.relationship("Genre", secondary="film_genres", back_populates="films")
-    watchlist_entries = db.relationship("Watchlist", back_populates="film", cascade="all, delete-orphan")
+    watchlist_entries = db.relationship("Watchlist", back_populates="film", cascade="all, delete-orphan", passive_deletes=True)
+    # maintained by utils/rating_stats.py, never written through the ORM
+    rating_stats = db.relationship(
+        "FilmRatingStats", uselist=False,
+        lazy="joined", viewonly=True,
+    )
 
     __table_args__ = (
         db.UniqueConstraint("title", "release_year", name="uq_film_title_year"),
@@ -20,6 +20,10 @@ Constraints:
 - Rating must be one of the allowed step values.
 - Published reviews must have a published_at timestamp.
 
+Indexes:
+- (status, published_at, id) for the global feed, (film_id, status, created_at) for per-film lists,
+  (user_id, status) for per-user counts (users.review_count) and the users cascade.
+
 Relationships:
 - Linked to Film and User via back_populates.
 """
@@ -49,6 +53,12 @@ class Review(db.Model):
         db.UniqueConstraint("film_id", "user_id", name="uq_review_user_film"),
         db.CheckConstraint("rating IN (0.5,1.0,1.5,2.0,2.5,3.0,3.5,4.0,4.5,5.0)", name="ck_review_rating"),
         db.CheckConstraint("(status <> 'published') OR (published_at IS NOT NULL)", name="ck_review_published_time"),
+        # global feed: WHERE status = 'published' ORDER BY published_at DESC, id DESC
+        db.Index("ix_reviews_status_published_at", "status", "published_at", "id"),
+        # per-film list: WHERE film_id = ? AND status = 'published' ORDER BY created_at DESC
+        db.Index("ix_reviews_film_status_created", "film_id", "status", "created_at"),
+        # users.review_count upkeep/reconciliation: WHERE user_id = ? AND status = 'published'
+        db.Index("ix_reviews_user_status", "user_id", "status"),
     )
 
     # ========== Relationships ==========
@@ -0,0 +1,33 @@
+"""RevokedToken model:
+
+Persistent record of JWTs that must no longer be accepted: refresh tokens once
+they have been rotated, and any token presented to logout. Workers keep recent
+entries in memory (see utils/token_denylist.py); rows can be pruned once the
+token would have expired anyway (`flask ops prune-revoked-tokens`).
+
+Attributes:
+- id (int): Primary key.
+- jti (str): The token's unique id claim; unique, so revoking twice is detectable.
+- token_type (str): "access" or "refresh".
+- user_id (int): Foreign key to User (CASCADE on delete).
+- expires_at (datetime): The token's own expiry (UTC); after it the row is dead weight.
+- revoked_at (datetime): When it was revoked; workers sync new rows by this column.
+"""
+
+from extensions import db
+
+class RevokedToken(db.Model):
+    __tablename__ = "revoked_tokens"
+
+    id = db.Column(db.Integer, primary_key=True)
+    jti = db.Column(db.String(36), nullable=False, unique=True)
+    token_type = db.Column(db.String(10), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    expires_at = db.Column(db.DateTime, nullable=False)
+    revoked_at = db.Column(db.DateTime, nullable=False, server_default=db.func.now())
+
+    __table_args__ = (
+        # denylist sync: WHERE revoked_at > ?; prune: WHERE expires_at < now()
+        db.Index("ix_revoked_tokens_revoked_at", "revoked_at"),
+        db.Index("ix_revoked_tokens_expires_at", "expires_at"),
+    )
@@ -9,6 +9,8 @@ Attributes:
 - password_hash (String): Hashed password for authentication, max length 255 characters.
 - role (String): Role of the user, either 'user' or 'admin', default is 'user'.
 - created_at (DateTime): Timestamp when the user was created, set automatically.
+- review_count (Integer): Number of the user's published reviews, kept by utils/counters.py.
+- watchlist_count (Integer): Number of films on the user's watchlist, kept by utils/counters.py.
 
 Constraints:
 - username and email must be unique and not null.
@@ -30,6 +32,11 @@ class User(db.Model):
     role = db.Column(db.String(20), nullable=False, default="user")  # user|admin
     created_at = db.Column(db.DateTime, server_default=db.func.now())
 
+    # maintained by utils/counters.py alongside review/watchlist writes
+    review_count = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+    watchlist_count = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+
     # ========== Relationships ==========
-    reviews = db.relationship("Review", back_populates="user", cascade="all, delete-orphan")
-    watchlist_entries = db.relationship("Watchlist", back_populates="user", cascade="all, delete-orphan")
+    # passive_deletes: the FKs' ON DELETE CASCADE removes children, instead of loading and deleting each
+    reviews = db.relationship("Review", back_populates="user", cascade="all, delete-orphan", passive_deletes=True)
+    watchlist_entries = db.relationship("Watchlist", back_populates="user", cascade="all, delete-orphan", passive_deletes=True)
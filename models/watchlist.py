@@ -12,6 +12,8 @@ Attributes:
 Constraints:
     - Composite primary key of (user_id, film_id) ensures uniqueness.
     - CASCADE delete: removing a user or film automatically removes associated watchlist entries.
+    - Index on (user_id, added_at, film_id) for the newest-first listing and its keyset cursor.
+    - Index on film_id for films.watchlist_count upkeep and the films cascade.
 
 Relationships:
     - Each watchlist entry belongs to one user and one film.
@@ -29,6 +31,13 @@ class Watchlist(db.Model):
 
     added_at = db.Column(db.DateTime, server_default=db.func.now())
 
+    __table_args__ = (
+        # list_watchlist: WHERE user_id = ? [AND (added_at, film_id) < cursor] ORDER BY added_at DESC, film_id DESC
+        db.Index("ix_watchlist_user_added_film", "user_id", "added_at", "film_id"),
+        # films.watchlist_count upkeep/reconciliation and ON DELETE CASCADE from films
+        db.Index("ix_watchlist_film_id", "film_id"),
+    )
+
     # ========== Relationships ==========
     user = db.relationship("User", back_populates="watchlist_entries")
     film = db.relationship("Film", back_populates="watchlist_entries")
@@ -9,3 +9,4 @@ from .reviews_schema import ReviewCreateSchema, ReviewSchema
 from .genres_schema import GenreCreateSchema, GenreSchema
 from .users_schema import UserRegisterSchema, LoginSchema
 from .watchlist_schema import WatchlistEntrySchema
+from .batch_schema import BatchIdsSchema
@@ -0,0 +1,27 @@
+"""
+Batch lookup schema.
+
+Validates the body of the POST .../batch endpoints.
+
+- BatchIdsSchema: {"ids": [...]} with 1..MAX_BATCH_IDS positive integers; loads
+  to the ids de-duplicated, in request order.
+"""
+from marshmallow import Schema, fields, validate, post_load
+
+MAX_BATCH_IDS = 100
+
+class BatchIdsSchema(Schema):
+    """Schema for a batch of resource ids.
+
+    - ids: Required list of positive integers, at most MAX_BATCH_IDS long.
+    """
+    ids = fields.List(
+        fields.Integer(strict=True, validate=validate.Range(min=1)),
+        required=True,
+        validate=validate.Length(min=1, max=MAX_BATCH_IDS),
+    )
+
+    @post_load
+    def unique_ids(self, data, **kwargs):
+        # responses follow the request order; repeats are looked up once
+        return list(dict.fromkeys(data["ids"]))
@@ -5,13 +5,20 @@ Defines schemas for creating and serialising Film objects.
 
 - FilmCreateSchema: Validates input when creating a film, ensuring title, release year,
   director, and description follow length/range rules. Trims whitespace before validation.
-- FilmSchema: Serialises Film objects for output, including id and descriptive fields.
+- FilmSchema: Serialises Film objects for output, including id, descriptive fields and rating stats.
+- FilmRatingStatsSchema: Serialises the pre-aggregated film_rating_stats row nested in FilmSchema.
+- FilmGenresSchema / FilmGenresBulkSchema: Validate the genre sets for PUT /films/<id>/genres
+  and PUT /films/genres.
 """
 
 from datetime import date
-from marshmallow import Schema, fields, validate, pre_load, ValidationError
+from marshmallow import Schema, fields, validate, pre_load, post_load, validates_schema, ValidationError
+
+from utils.serializers import compile_dump
 
 CURRENT_YEAR = date.today().year
+MAX_FILM_GENRES = 100       # genres in one film's set
+MAX_RETAG_FILMS = 1000      # films in one bulk re-tag
 
 class FilmCreateSchema(Schema):
     """
@@ -52,6 +59,34 @@ class FilmCreateSchema(Schema):
         return in_data
 
 
+class FilmRatingStatsSchema(Schema):
+    """
+    Schema for serializing a film's pre-aggregated rating stats.
+
+    Fields:
+      - count: number of published reviews
+      - sum: sum of their ratings
+      - mean: average rating (None when there are no reviews)
+      - histogram: review counts keyed by rating ("0.5" … "5.0")
+    """
+    count = fields.Integer(attribute="review_count")
+    sum = fields.Float(attribute="rating_sum")
+    mean = fields.Float(attribute="rating_mean", allow_none=True)
+    histogram = fields.Dict(keys=fields.String(), values=fields.Integer())
+
+
+# compiled FilmRatingStatsSchema().dump; runs once per film in every list
+_dump_rating_stats = compile_dump(FilmRatingStatsSchema())
+
+# what films without any published review report
+EMPTY_RATING_STATS = {
+    "count": 0,
+    "sum": 0.0,
+    "mean": None,
+    "histogram": {str(x / 2): 0 for x in range(1, 11)},
+}
+
+
 class FilmSchema(Schema):
     """
     Schema for serializing Film objects in API responses.
@@ -62,6 +97,8 @@ class FilmSchema(Schema):
       - release_year
       - director
       - description
+      - rating_stats (read-only, from film_rating_stats)
+      - watchlist_count (read-only, maintained counter)
     """
     # Explicit dump_only so clients can’t set id
     id = fields.Integer(dump_only=True)
@@ -69,3 +106,65 @@ class FilmSchema(Schema):
     release_year = fields.Integer()
     director = fields.String()
     description = fields.String()
+    rating_stats = fields.Method("dump_rating_stats", dump_only=True)
+    watchlist_count = fields.Integer(dump_only=True)
+
+    def dump_rating_stats(self, film):
+        stats = film.rating_stats
+        if stats is None:
+            return {**EMPTY_RATING_STATS, "histogram": dict(EMPTY_RATING_STATS["histogram"])}
+        return _dump_rating_stats(stats)
+
+
+def _genre_ids_field():
+    return fields.List(
+        fields.Integer(strict=True, validate=validate.Range(min=1)),
+        required=True,
+        validate=validate.Length(max=MAX_FILM_GENRES),
+    )
+
+
+class FilmGenresSchema(Schema):
+    """
+    Schema for the full genre set of one film (PUT /films/<id>/genres).
+
+    Fields:
+      - genre_ids: required list of genre ids (may be empty); loads to the
+        de-duplicated ids
+    """
+    genre_ids = _genre_ids_field()
+
+    @post_load
+    def unique_ids(self, data, **kwargs):
+        return list(dict.fromkeys(data["genre_ids"]))
+
+
+class FilmGenresEntrySchema(Schema):
+    """One film's genre set inside FilmGenresBulkSchema."""
+    film_id = fields.Integer(required=True, strict=True, validate=validate.Range(min=1))
+    genre_ids = _genre_ids_field()
+
+
+class FilmGenresBulkSchema(Schema):
+    """
+    Schema for re-tagging many films at once (PUT /films/genres).
+
+    Fields:
+      - films: required list of {film_id, genre_ids}, each film at most once;
+        loads to {film_id: [genre_ids]}
+    """
+    films = fields.List(
+        fields.Nested(FilmGenresEntrySchema),
+        required=True,
+        validate=validate.Length(min=1, max=MAX_RETAG_FILMS),
+    )
+
+    @validates_schema
+    def _unique_films(self, data, **kwargs):
+        film_ids = [entry["film_id"] for entry in data.get("films", [])]
+        if len(film_ids) != len(set(film_ids)):
+            raise ValidationError({"films": ["Each film_id may appear only once."]})
+
+    @post_load
+    def by_film(self, data, **kwargs):
+        return {entry["film_id"]: list(dict.fromkeys(entry["genre_ids"])) for entry in data["films"]}
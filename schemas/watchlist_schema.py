@@ -5,12 +5,15 @@ Defines schema for serialising and validating watchlist entries.
 
 - WatchlistEntrySchema: Ensures film_id is provided
 - user_id is server-assigned, and added_at is auto-generated.
+- WatchlistBulkSchema: Validates the film_ids list for bulk add/remove.
 """
 
-from marshmallow import Schema, fields, validate
+from marshmallow import Schema, fields, validate, post_load
 
 from schemas.films_schema import FilmSchema
 
+MAX_BULK_FILMS = 500
+
 
 class WatchlistEntrySchema(Schema):
     """Schema for a watchlist entry.
@@ -24,3 +27,21 @@ class WatchlistEntrySchema(Schema):
     film_id = fields.Int(required=True, validate=validate.Range(min=1))
     added_at = fields.DateTime(dump_only=True)
     film = fields.Nested(FilmSchema, dump_only=True)
+
+
+class WatchlistBulkSchema(Schema):
+    """Schema for bulk watchlist changes.
+
+    Fields:
+    - film_ids: Required list of 1..MAX_BULK_FILMS positive integers; loads to
+      the ids de-duplicated, in request order.
+    """
+    film_ids = fields.List(
+        fields.Int(strict=True, validate=validate.Range(min=1)),
+        required=True,
+        validate=validate.Length(min=1, max=MAX_BULK_FILMS),
+    )
+
+    @post_load
+    def unique_ids(self, data, **kwargs):
+        return list(dict.fromkeys(data["film_ids"]))
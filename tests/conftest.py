@@ -0,0 +1,29 @@
+"""
+Shared fixtures. The tests run against the Postgres database in DATABASE_URL
+(migrated, e.g. the bench.endpoints dataset) and are skipped when it isn't set.
+"""
+
+# Built-in imports
+import os
+
+# Installed imports
+import pytest
+
+
+# caches off so every request reaches the database; over-budget views raise
+TEST_CONFIG = {
+    "TESTING": True,
+    "QUERY_BUDGET_MODE": "raise",
+    "RESPONSE_CACHE_ENABLED": False,
+    "PROFILE_CACHE_ENABLED": False,
+    "PASSWORD_HASH_METHOD": "scrypt",     # a shorthand, as werkzeug accepts it (test_passwords.py)
+}
+
+
+@pytest.fixture(scope="session")
+def app():
+    if not os.getenv("DATABASE_URL"):
+        pytest.skip("DATABASE_URL is not set")
+    from main import create_app
+
+    return create_app(TEST_CONFIG)
@@ -0,0 +1,55 @@
+"""Password hashes are upgraded once, not on every login (see utils/passwords.py)."""
+
+# Installed imports
+import pytest
+from flask import Flask
+from werkzeug.security import generate_password_hash
+
+# Local imports
+from utils.passwords import PasswordHasher
+
+LEGACY_METHOD = "pbkdf2:sha256:1000"
+
+
+def _hasher(method):
+    app = Flask(__name__)
+    app.config["PASSWORD_HASH_METHOD"] = method
+    return PasswordHasher(app)
+
+
+@pytest.mark.parametrize("method", ["scrypt", "scrypt:32768:8:1", "pbkdf2", "pbkdf2:sha256", LEGACY_METHOD])
+def test_own_hashes_need_no_rehash(method):
+    hasher = _hasher(method)
+    assert not hasher.needs_rehash(hasher.hash("secret123"))
+
+
+def test_other_parameters_need_rehash():
+    hasher = _hasher("scrypt")
+    assert hasher.needs_rehash(generate_password_hash("secret123", LEGACY_METHOD))
+    assert hasher.needs_rehash(generate_password_hash("secret123", "scrypt:16384:8:1"))
+
+
+def test_second_login_keeps_the_upgraded_hash(app):
+    from extensions import db
+    from models import User
+
+    with app.app_context():
+        user = User(username="test-rehash", email="test-rehash@example.test",
+                    password_hash=generate_password_hash("secret123", LEGACY_METHOD))
+        db.session.add(user)
+        db.session.commit()
+        user_id = user.id
+    try:
+        client = app.test_client()
+        stored = []
+        for _ in range(2):
+            response = client.post("/auth/login", json={"email": "test-rehash@example.test", "password": "secret123"})
+            assert response.status_code == 200
+            with app.app_context():
+                stored.append(db.session.get(User, user_id).password_hash)
+        assert stored[0].startswith("scrypt:32768:8:1$")     # upgraded on the first login
+        assert stored[1] == stored[0]                        # and left alone on the second
+    finally:
+        with app.app_context():
+            db.session.execute(db.delete(User).where(User.id == user_id))
+            db.session.commit()
@@ -0,0 +1,43 @@
+"""
+Every route stays within its @query_budget (see utils/query_budget.py).
+
+Runs each bench.endpoints scenario once against DATABASE_URL, which must hold
+the benchmark dataset (`python -m bench.endpoints --prepare`); skipped otherwise.
+"""
+
+# Installed imports
+import pytest
+
+# Local imports
+from bench.endpoints import Fixtures, build_scenarios, check_dataset, count_statements, uncovered_endpoints
+
+
+@pytest.fixture(scope="module")
+def scenarios(app):
+    with app.app_context():
+        try:
+            check_dataset()
+        except SystemExit as exc:
+            pytest.skip(str(exc))
+        Fixtures.cleanup()
+        fixtures = Fixtures.create()
+    yield build_scenarios(fixtures)
+    with app.app_context():
+        Fixtures.cleanup()
+
+
+def test_every_route_has_a_scenario(app, scenarios):
+    assert uncovered_endpoints(app, scenarios) == []
+
+
+def test_routes_stay_within_their_budgets(app, scenarios):
+    problems = []
+    for scenario, response, used, budget in count_statements(app, scenarios):
+        if budget is None:
+            problems.append(f"{scenario.name}: no @query_budget")
+        elif used > budget:
+            problems.append(f"{scenario.name}: {used} SQL statements, budget {budget}")
+        elif response.status_code != scenario.status:
+            problems.append(f"{scenario.name}: expected {scenario.status}, got {response.status_code} "
+                            f"{response.get_data(as_text=True)[:200]}")
+    assert not problems, "\n".join(problems)
@@ -0,0 +1,16 @@
+"""The hot list queries must be served by indexes (see utils/query_plans.py)."""
+
+# Installed imports
+import pytest
+
+# Local imports
+from utils.query_plans import check_plans, hot_queries
+
+
+@pytest.mark.parametrize("check", hot_queries(), ids=lambda check: check.name)
+def test_hot_query_uses_indexes(app, check):
+    with app.app_context():
+        [result] = check_plans([check])
+    if result.skipped:
+        pytest.skip(result.skipped)
+    assert result.ok, f"Seq Scan on {', '.join(result.seq_scans)}"
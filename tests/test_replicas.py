@@ -0,0 +1,92 @@
+"""
+Read routing with DATABASE_REPLICA_URLS set (see utils/replicas.py).
+
+The replica is DATABASE_REPLICA_TEST_URL: a streaming replica of DATABASE_URL,
+or any database with the same schema and data. It defaults to DATABASE_URL
+itself, reached through its own bind. Statements are counted per engine, so
+the routing shows either way.
+"""
+
+# Built-in imports
+import os
+from collections import Counter
+
+# Installed imports
+import pytest
+from sqlalchemy import event
+
+# Local imports
+from bench.endpoints import Fixtures
+from tests.conftest import TEST_CONFIG
+
+
+@pytest.fixture(scope="module")
+def routed(app):
+    """(app with one replica, Counter of statements per bind, fixtures); `app` builds the primary-only one."""
+    from extensions import db
+    from main import create_app
+
+    replica_url = os.getenv("DATABASE_REPLICA_TEST_URL") or os.environ["DATABASE_URL"]
+    routed_app = create_app({**TEST_CONFIG, "DATABASE_REPLICA_URLS": [replica_url]})
+    counts = Counter()
+    with routed_app.app_context():
+        for key, engine in (("primary", db.engines[None]), ("replica", db.engines["replica0"])):
+            event.listen(engine, "before_cursor_execute", _counter(counts, key))
+        Fixtures.cleanup()
+        fixtures = Fixtures.create()
+    try:
+        yield routed_app, counts, fixtures
+    finally:
+        with routed_app.app_context():
+            Fixtures.cleanup()
+
+
+def test_reads_go_to_the_replica(routed):
+    routed_app, counts, _ = routed
+    counts.clear()
+    response = routed_app.test_client().get("/films?limit=5")
+    assert response.status_code == 200
+    assert counts["replica"] > 0
+    assert counts["primary"] == 0
+
+
+def test_writes_go_to_the_primary_and_are_read_back_from_it(routed):
+    routed_app, counts, fixtures = routed
+    headers = {"Authorization": f"Bearer {fixtures.user_token}"}
+    client = routed_app.test_client()
+
+    counts.clear()
+    response = client.post("/users/me/watchlist", json={"film_id": fixtures.film_id}, headers=headers)
+    assert response.status_code == 201
+    assert counts["primary"] > 0
+    assert counts["replica"] == 0
+
+    # the next GET reads from the primary, also for a client without cookies:
+    # this worker remembers the user from the token
+    for reader in (client, routed_app.test_client(use_cookies=False)):
+        counts.clear()
+        response = reader.get("/users/me/watchlist", headers=headers)
+        assert response.status_code == 200
+        assert fixtures.film_id in [item["film_id"] for item in response.get_json()["data"]]
+        assert counts["replica"] == 0
+
+    # on a worker that didn't see the write only the cookie sends reads to the
+    # primary; the client without cookies reads from the replica (README)
+    routed_app.extensions["replicas"]._recent_writers.clear()
+    for reader, replica_reads in ((client, False), (routed_app.test_client(use_cookies=False), True)):
+        counts.clear()
+        assert reader.get("/users/me/watchlist", headers=headers).status_code == 200
+        assert (counts["replica"] > 0) is replica_reads
+
+    # other clients still read from the replica
+    counts.clear()
+    assert routed_app.test_client().get("/films?limit=5").status_code == 200
+    assert counts["replica"] > 0
+
+
+# ========== HELPERS ==========
+def _counter(counts, key):
+    def count(conn, cursor, statement, parameters, context, executemany):
+        if "pg_is_in_recovery" not in statement:     # the lag check, not the request's own reads
+            counts[key] += 1
+    return count
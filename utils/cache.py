@@ -0,0 +1,95 @@
+"""
+CineCritic — small in-process caches.
+
+TTLCache is a thread-safe LRU map with a per-entry time-to-live and optional
+tags, so related entries can be dropped together when the underlying data
+changes (e.g. every cached value derived from the `reviews` table).
+
+Caches live in one worker process; other gunicorn workers keep their own copy,
+which the TTL bounds.
+"""
+
+# Built-in imports
+import threading
+import time
+from collections import OrderedDict
+
+
+class TTLCache:
+    """LRU cache with per-entry TTL and tag-based invalidation.
+
+    Bounded by entry count and, optionally, by the total `size` callers report
+    for their values (e.g. response body bytes).
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 30.0, maxbytes: int | None = None):
+        self.maxsize = maxsize
+        self.maxbytes = maxbytes
+        self.ttl = ttl
+        self.nbytes = 0
+        self._data = OrderedDict()      # key -> (expires_at, value, tags, size)
+        self._tags = {}                 # tag -> set(keys)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._data)
+
+    def get(self, key, default=None):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return default
+            expires_at, value = item[0], item[1]
+            if expires_at < time.monotonic():
+                self._drop(key)
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, tags=(), ttl: float | None = None, size: int = 0):
+        if self.maxbytes is not None and size > self.maxbytes:
+            return      # would evict everything else; not worth caching
+        with self._lock:
+            if key in self._data:
+                self._drop(key)
+            expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+            tags = frozenset(tags)
+            self._data[key] = (expires_at, value, tags, size)
+            self.nbytes += size
+            for tag in tags:
+                self._tags.setdefault(tag, set()).add(key)
+            while len(self._data) > self.maxsize or (
+                self.maxbytes is not None and self.nbytes > self.maxbytes
+            ):
+                self._drop(next(iter(self._data)))
+
+    def delete(self, key):
+        with self._lock:
+            self._drop(key)
+
+    def invalidate(self, *tags):
+        """Drop every entry carrying any of the given tags."""
+        with self._lock:
+            for tag in tags:
+                for key in list(self._tags.get(tag, ())):
+                    self._drop(key)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._tags.clear()
+            self.nbytes = 0
+
+    # ========== HELPER ==========
+    def _drop(self, key):
+        # caller holds the lock
+        item = self._data.pop(key, None)
+        if item is None:
+            return
+        self.nbytes -= item[3]
+        for tag in item[2]:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
@@ -0,0 +1,228 @@
+"""
+CineCritic — maintained counter columns.
+
+Pages show "N reviews" and "N people want to watch this" from stored counters
+instead of a COUNT(*) per request:
+
+  users.review_count      the user's published reviews
+  users.watchlist_count   films on the user's watchlist
+  films.watchlist_count   users with the film on their watchlist
+
+(A film's published review count is film_rating_stats.review_count, kept by
+utils.rating_stats.)
+
+Write handlers call the functions below before committing, so a counter moves
+in the same transaction as the rows it counts. Every change is a relative
+`col = col + delta` UPDATE; concurrent writers never read-modify-write. A
+delta is applied only by the request whose write actually happened: review
+changes lock the review row first, watchlist removals count the rows their
+DELETE returned.
+Deleting a film or user cascades to reviews and watchlist rows in the
+database, so forget_film()/forget_user() must run before that DELETE.
+
+reconcile_counters() repairs drift (rows written by older code, manual SQL) in
+primary-key batches, committing after each one (`flask ops reconcile-counters`).
+"""
+
+# Built-in imports
+from dataclasses import dataclass
+
+# Local imports
+from extensions import db
+from models.films import Film
+from models.reviews import Review
+from models.users import User
+from models.watchlist import Watchlist
+
+
+@dataclass(frozen=True)
+class Counter:
+    """A counter column: `owner.column` = number of `source` rows whose `key` is the owner's id."""
+    name: str
+    owner: object        # Table holding the counter
+    column: str
+    source: object       # Table whose rows are counted
+    key: str             # source column referencing owner.id
+    published_only: bool = False
+
+
+COUNTERS = (
+    Counter("users.review_count", User.__table__, "review_count", Review.__table__, "user_id", published_only=True),
+    Counter("users.watchlist_count", User.__table__, "watchlist_count", Watchlist.__table__, "user_id"),
+    Counter("films.watchlist_count", Film.__table__, "watchlist_count", Watchlist.__table__, "film_id"),
+)
+
+
+def count_review_change(user_id: int, old, new):
+    """Move users.review_count when a review enters or leaves the published set.
+
+    `old`/`new` are the review's rating contributions (None = not published),
+    the same values passed to apply_review_change(). `old` must be read from
+    the review row locked for this transaction, or two concurrent changes of
+    one review both move the counter.
+    """
+    delta = (new is not None) - (old is not None)
+    if delta:
+        users = User.__table__
+        db.session.execute(
+            db.update(users).where(users.c.id == user_id).values(review_count=users.c.review_count + delta)
+        )
+
+
+def count_watchlist_change(user_id: int, film_ids, delta: int):
+    """Add `delta` (+1 or -1) to each film's watchlist_count, and delta per film to the user's.
+
+    One statement: the user's UPDATE rides along as a data-modifying CTE.
+    """
+    film_ids = sorted(film_ids)
+    if not film_ids:
+        return
+    users, films = User.__table__, Film.__table__
+    bump_user = (
+        db.update(users)
+        .where(users.c.id == user_id)
+        .values(watchlist_count=users.c.watchlist_count + delta * len(film_ids))
+        .returning(users.c.id)
+        .cte("bump_user")
+    )
+    db.session.execute(
+        db.update(films)
+        .where(films.c.id.in_(film_ids))
+        .values(watchlist_count=films.c.watchlist_count + delta)
+        .add_cte(bump_user)
+    )
+
+
+def forget_film(film_id: int) -> list:
+    """Take a film's published reviews and watchlist entries off their users' counters.
+
+    Call before deleting the film (the database cascade removes those rows).
+    Returns the ids of the users whose counters changed.
+    """
+    users, reviews, watchlist = User.__table__, Review.__table__, Watchlist.__table__
+    reviewed = db.exists().where(
+        reviews.c.user_id == users.c.id, reviews.c.film_id == film_id, reviews.c.status == "published",
+    )
+    listed = db.exists().where(watchlist.c.user_id == users.c.id, watchlist.c.film_id == film_id)
+    return db.session.scalars(
+        db.update(users)
+        .where(db.or_(reviewed, listed))
+        .values(
+            review_count=users.c.review_count - db.case((reviewed, 1), else_=0),
+            watchlist_count=users.c.watchlist_count - db.case((listed, 1), else_=0),
+        )
+        .returning(users.c.id)
+    ).all()
+
+
+def forget_user(user_id: int):
+    """Take a user's watchlist entries off the films' counters (call before deleting the user)."""
+    films, watchlist = Film.__table__, Watchlist.__table__
+    db.session.execute(
+        db.update(films)
+        .where(films.c.id == watchlist.c.film_id, watchlist.c.user_id == user_id)
+        .values(watchlist_count=films.c.watchlist_count - 1)
+    )
+
+
+def rebuild_counters():
+    """Recompute every counter set-wise, in one transaction (after seeding or bulk loads).
+
+    Unlike reconcile_counters() this locks every row it changes until the
+    caller commits, so keep it off databases serving traffic.
+    """
+    for counter in COUNTERS:
+        owner, column = counter.owner, counter.column
+        key = counter.source.c[counter.key]
+        actual = (
+            db.select(key.label("owner_id"), db.func.count().label("n"))
+            .where(*_source_filter(counter))
+            .group_by(key)
+            .subquery()
+        )
+        # rows with nothing left to count, then everyone else from one aggregate
+        db.session.execute(
+            db.update(owner)
+            .where(owner.c[column] != 0, ~db.exists().where(key == owner.c.id, *_source_filter(counter)))
+            .values({column: 0})
+        )
+        db.session.execute(
+            db.update(owner)
+            .where(owner.c.id == actual.c.owner_id, owner.c[column] != actual.c.n)
+            .values({column: actual.c.n})
+        )
+
+
+def reconcile_counters(batch_size: int = 1000, on_batch=None) -> dict:
+    """Repair counters that drifted from the rows they count; returns {counter name: rows fixed}.
+
+    Each batch of ids is first compared without taking any lock. Only the rows
+    found off are then locked, with SKIP LOCKED so a row a live request is
+    writing is left for the next run instead of waited on, and recounted
+    under that lock before the batch commits.
+    """
+    fixed = {}
+    for counter in COUNTERS:
+        owner, column = counter.owner, counter.column
+        owner_id = owner.c.id
+        fixed[counter.name] = 0
+        max_id = db.session.scalar(db.select(db.func.max(owner_id))) or 0
+        for low in range(1, max_id + 1, batch_size):
+            high = low + batch_size - 1
+            drifted = db.session.scalars(_drifted(counter, low, high)).all()
+            if drifted:
+                locked = db.session.scalars(
+                    db.select(owner_id)
+                    .where(owner_id.in_(drifted))
+                    .order_by(owner_id)
+                    .with_for_update(skip_locked=True)
+                ).all()
+                if locked:
+                    db.session.execute(
+                        db.update(owner)
+                        .where(owner_id.in_(locked))
+                        .values({column: _actual_count(counter, owner_id)})
+                    )
+                    fixed[counter.name] += len(locked)
+            db.session.commit()
+            if on_batch is not None:
+                on_batch(counter.name, high, fixed[counter.name])
+    return fixed
+
+
+# ========== HELPERS ==========
+def _source_filter(counter):
+    if counter.published_only:
+        return (counter.source.c.status == "published",)
+    return ()
+
+
+def _actual_count(counter, owner_id):
+    """Correlated COUNT(*) of the source rows pointing at `owner_id`."""
+    key = counter.source.c[counter.key]
+    return (
+        db.select(db.func.count())
+        .select_from(counter.source)
+        .where(key == owner_id, *_source_filter(counter))
+        .scalar_subquery()
+    )
+
+
+def _drifted(counter, low: int, high: int):
+    """Ids in [low, high] whose stored counter differs from a fresh count."""
+    owner_id = counter.owner.c.id
+    key = counter.source.c[counter.key]
+    actual = (
+        db.select(key.label("owner_id"), db.func.count().label("n"))
+        .where(key.between(low, high), *_source_filter(counter))
+        .group_by(key)
+        .subquery()
+    )
+    return (
+        db.select(owner_id)
+        .outerjoin(actual, actual.c.owner_id == owner_id)
+        .where(
+            owner_id.between(low, high),
+            counter.owner.c[counter.column] != db.func.coalesce(actual.c.n, 0),
+        )
+    )
@@ -0,0 +1,58 @@
+"""
+CineCritic — SQLAlchemy engine options from the DB_* settings.
+
+create_app() turns these into SQLALCHEMY_ENGINE_OPTIONS, used for the primary
+and copied to every replica bind (utils/replicas.py):
+
+  DB_POOL_SIZE / DB_MAX_OVERFLOW   connections kept / extra under load, per worker process
+  DB_POOL_TIMEOUT                  seconds to wait for a free connection before failing
+  DB_POOL_RECYCLE                  replace connections older than this (-1: never)
+  DB_POOL_PRE_PING                 test each connection on checkout (survives server restarts)
+  DB_PGBOUNCER                     DATABASE_URL points at PgBouncer in transaction mode
+
+Behind PgBouncer, consecutive transactions of one client may run on different
+server connections, so there is no app-side pool (NullPool; PgBouncer pools)
+and nothing that outlives a transaction may be used. psycopg2 never prepares
+statements server-side. asyncpg (asgi.py) does, so its statement caches are
+turned off and every statement gets a unique name.
+"""
+
+# Built-in imports
+from uuid import uuid4
+
+# Installed imports
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import NullPool
+
+
+def engine_options(config) -> dict:
+    """SQLALCHEMY_ENGINE_OPTIONS for config["SQLALCHEMY_DATABASE_URI"] and the DB_* settings."""
+    uri = config.get("SQLALCHEMY_DATABASE_URI")
+    # other backends (SQLite in local experiments) keep the pool Flask-SQLAlchemy picks
+    if not uri or make_url(uri).get_backend_name() != "postgresql":
+        return {}
+    options = {
+        "pool_recycle": config["DB_POOL_RECYCLE"],
+        "pool_pre_ping": config["DB_POOL_PRE_PING"],
+    }
+    if not config["DB_PGBOUNCER"]:
+        options.update(
+            pool_size=config["DB_POOL_SIZE"],
+            max_overflow=config["DB_MAX_OVERFLOW"],
+            pool_timeout=config["DB_POOL_TIMEOUT"],
+        )
+        return options
+
+    options["poolclass"] = NullPool
+    if make_url(uri).get_driver_name() == "asyncpg":
+        options["connect_args"] = {
+            "statement_cache_size": 0,              # asyncpg's own cache
+            "prepared_statement_cache_size": 0,     # SQLAlchemy's
+            "prepared_statement_name_func": _statement_name,
+        }
+    return options
+
+
+def _statement_name() -> str:
+    # asyncpg numbers statements per connection; behind PgBouncer those names collide
+    return f"__asyncpg_{uuid4()}__"
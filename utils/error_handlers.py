@@ -8,6 +8,7 @@ Each handler returns JSON in the form:
 - IntegrityError  → 409 for unique / FK / not-null / check violations
 - DataError       → 400 for bad casts / malformed values from the DB driver
 - 404/405         → not_found / method_not_allowed
+- HashingBusy     → 503 service_unavailable (password hashing queue full), with Retry-After
 - 500/Exception   → server_error (generic)
 """
 
@@ -18,6 +19,9 @@ from sqlalchemy.exc import IntegrityError, DataError
 from psycopg2 import errorcodes
 from psycopg2.errors import UniqueViolation
 
+# Local imports
+from utils.passwords import HashingBusy
+
 def register_error_handlers(app):
     """Register JSON error handlers with a consistent payload shape."""
 
@@ -86,6 +90,13 @@ def register_error_handlers(app):
     def on_405(_):
         return _json("method_not_allowed", "Method not allowed for this endpoint.", 405)
 
+    # ========== OVERLOAD ==========
+    @app.errorhandler(HashingBusy)
+    def on_hashing_busy(err: HashingBusy):
+        response, status = _json("service_unavailable", "Too many sign-ins in progress; retry shortly.", 503)
+        response.headers["Retry-After"] = "1"
+        return response, status
+
     # ========== FALLBACK ==========
     @app.errorhandler(Exception)
     def on_any_error(err):
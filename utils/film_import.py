@@ -0,0 +1,195 @@
+"""
+CineCritic — streaming bulk import of the film catalogue.
+
+read_rows() yields one dict per CSV row or JSON line, and import_films() works
+through them a batch at a time, so memory stays flat however big the file is.
+Each batch is:
+
+1. validated row by row with FilmCreateSchema (bad rows are counted and skipped)
+2. de-duplicated on (title, release_year), the last row winning
+3. upserted with multi-row INSERT ... ON CONFLICT ON CONSTRAINT
+   uq_film_title_year; values missing from a row keep what the film already has
+4. linked to its genres (the `genres` column, names separated by "|"), creating
+   unknown genres; existing links are kept
+5. committed
+
+Postgres only. Rows without a release_year never conflict (NULLs are distinct
+in the unique constraint), so re-importing them adds new films.
+"""
+
+# Built-in imports
+import csv
+import json
+from dataclasses import dataclass, field
+from functools import lru_cache
+from itertools import islice
+
+# Installed imports
+from marshmallow import ValidationError
+from sqlalchemy.dialects.postgresql import insert
+
+# Local imports
+from extensions import db
+from models.film_genre import FilmGenre
+from models.films import Film
+from models.genres import Genre
+from schemas.films_schema import FilmCreateSchema
+from schemas.genres_schema import GenreCreateSchema
+
+FORMATS = ("csv", "jsonl")
+FILM_FIELDS = ("title", "release_year", "director", "description")
+GENRE_SEPARATOR = "|"
+MAX_REPORTED_ERRORS = 20
+
+_film_schema = FilmCreateSchema()
+_genre_schema = GenreCreateSchema()
+
+
+@dataclass
+class ImportStats:
+    rows: int = 0
+    inserted: int = 0
+    updated: int = 0
+    duplicates: int = 0         # rows superseded by a later row in the same batch
+    invalid: int = 0
+    genre_links: int = 0
+    errors: list = field(default_factory=list)     # (line, messages), first few only
+
+
+def read_rows(stream, fmt: str):
+    """Yield (line_number, row dict) from a CSV (with header) or JSONL text stream."""
+    if fmt == "csv":
+        reader = csv.DictReader(stream)
+        for row in reader:
+            # empty cells mean "no value", like a missing JSON key
+            yield reader.line_num, {k: v for k, v in row.items() if k and v not in ("", None)}
+    elif fmt == "jsonl":
+        for line_num, line in enumerate(stream, start=1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except json.JSONDecodeError as exc:
+                yield line_num, exc
+                continue
+            yield line_num, row if isinstance(row, dict) else ValueError("expected a JSON object")
+    else:
+        raise ValueError(f"Unknown format {fmt!r}; expected one of {', '.join(FORMATS)}.")
+
+
+def import_films(rows, batch_size: int = 1000, on_batch=None) -> ImportStats:
+    """Upsert films (and their genre links) from read_rows() output, one batch per commit."""
+    stats = ImportStats()
+    genre_ids = {}      # name -> id, filled as batches reference genres
+    rows = iter(rows)
+    while batch := list(islice(rows, batch_size)):
+        _import_batch(batch, stats, genre_ids)
+        db.session.commit()
+        if on_batch is not None:
+            on_batch(stats)
+    return stats
+
+
+# ========== HELPERS ==========
+def _import_batch(batch, stats, genre_ids):
+    films = {}          # (title, release_year) -> (film values, genre names)
+    for line_num, row in batch:
+        stats.rows += 1
+        try:
+            values, genres = _validate(row)
+        except ValidationError as err:
+            stats.invalid += 1
+            if len(stats.errors) < MAX_REPORTED_ERRORS:
+                stats.errors.append((line_num, err.messages))
+            continue
+        # one statement can't upsert a row twice, so keep the last of each (title, year);
+        # NULL years never conflict and are kept apart by line number
+        year = values["release_year"]
+        key = (values["title"], year) if year is not None else line_num
+        if key in films:
+            stats.duplicates += 1
+        films[key] = (values, genres)
+    if not films:
+        return
+
+    # executemany: compiled once, sent as multi-row INSERTs ("insertmanyvalues")
+    links = set()
+    dated = [values for key, (values, _) in films.items() if not isinstance(key, int)]
+    if dated:
+        for film_id, title, year, inserted in db.session.execute(_upsert_stmt(), dated):
+            if inserted:
+                stats.inserted += 1
+            else:
+                stats.updated += 1
+            links.update((film_id, name) for name in films[(title, year)][1])
+
+    undated = [(values, genres) for key, (values, genres) in films.items() if isinstance(key, int)]
+    if undated:
+        stmt = insert(Film.__table__).returning(Film.id, sort_by_parameter_order=True)
+        film_ids = db.session.scalars(stmt, [values for values, _ in undated])
+        for film_id, (_, genres) in zip(film_ids, undated):
+            stats.inserted += 1
+            links.update((film_id, name) for name in genres)
+
+    if links:
+        _resolve_genres({name for _, name in links}, genre_ids)
+        result = db.session.execute(
+            insert(FilmGenre.__table__).on_conflict_do_nothing().returning(FilmGenre.film_id),
+            [{"film_id": film_id, "genre_id": genre_ids[name]} for film_id, name in links],
+        )
+        stats.genre_links += len(result.all())
+
+
+def _upsert_stmt():
+    table = Film.__table__
+    stmt = insert(table)
+    return stmt.on_conflict_do_update(
+        constraint="uq_film_title_year",
+        set_={
+            col: db.func.coalesce(stmt.excluded[col], table.c[col])
+            for col in ("director", "description")
+        },
+    ).returning(table.c.id, table.c.title, table.c.release_year, db.literal_column("xmax = 0"))
+
+
+def _validate(row):
+    if isinstance(row, Exception):
+        raise ValidationError({"_row": [str(row)]})
+    if not isinstance(row, dict):
+        raise ValidationError({"_row": ["Expected an object."]})
+    values = _film_schema.load({k: row[k] for k in FILM_FIELDS if k in row})
+
+    raw = row.get("genres") or ()
+    if isinstance(raw, str):
+        raw = raw.split(GENRE_SEPARATOR)
+    elif not isinstance(raw, (list, tuple)):
+        raise ValidationError({"genres": [f'Expected names separated by "{GENRE_SEPARATOR}" or a list of names.']})
+    names = []
+    for name in raw:
+        if not isinstance(name, str):
+            raise ValidationError({"genres": ["Each genre must be a string."]})
+        if not name.strip():
+            continue
+        try:
+            names.append(_genre_name(name))
+        except ValidationError as err:
+            raise ValidationError({"genres": err.messages["name"]})
+    return values, names
+
+
+@lru_cache(maxsize=1024)
+def _genre_name(name):
+    # the same few genre names repeat on every row
+    return _genre_schema.load({"name": name})["name"]
+
+
+def _resolve_genres(names, genre_ids):
+    """Fill genre_ids for `names`, creating genres that don't exist yet."""
+    missing = names - genre_ids.keys()
+    if not missing:
+        return
+    db.session.execute(
+        insert(Genre.__table__).values([{"name": name} for name in missing]).on_conflict_do_nothing()
+    )
+    rows = db.session.execute(db.select(Genre.id, Genre.name).where(Genre.name.in_(missing)))
+    genre_ids.update({name: genre_id for genre_id, name in rows})
@@ -0,0 +1,110 @@
+"""
+CineCritic — response cache and ETags for public GET endpoints.
+
+`@response_cache.cached(tags=...)` stores a view's 200 responses keyed by path
+plus the sorted query args, in a TTLCache bounded by entry count and body
+bytes. Every response (hit or miss) carries a strong ETag derived from the body,
+so clients sending If-None-Match get a bodiless 304.
+
+Invalidation is explicit: write handlers call response_cache.invalidate() with
+the tags their change affects, e.g. "films" for film lists or "film:7" for
+GET /films/7. Each worker process has its own cache; RESPONSE_CACHE_TTL bounds
+how long another worker can serve a response from before the write.
+"""
+
+# Built-in imports
+import hashlib
+import threading
+from collections import defaultdict
+from functools import wraps
+
+# Installed imports
+from flask import current_app, g, request
+
+# Local imports
+from utils.cache import TTLCache
+
+
+class ResponseCache:
+    """Flask extension holding the per-process response cache."""
+
+    def __init__(self, app=None):
+        self._cache = TTLCache()
+        self._generations = defaultdict(int)    # tag -> bumped on every invalidation
+        self._lock = threading.Lock()
+        self.enabled = True
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault("RESPONSE_CACHE_ENABLED", True)
+        app.config.setdefault("RESPONSE_CACHE_TTL", 30)
+        app.config.setdefault("RESPONSE_CACHE_MAX_ENTRIES", 2048)
+        app.config.setdefault("RESPONSE_CACHE_MAX_BYTES", 32 * 1024 * 1024)
+        self.enabled = app.config["RESPONSE_CACHE_ENABLED"]
+        self._cache = TTLCache(
+            maxsize=app.config["RESPONSE_CACHE_MAX_ENTRIES"],
+            ttl=app.config["RESPONSE_CACHE_TTL"],
+            maxbytes=app.config["RESPONSE_CACHE_MAX_BYTES"],
+        )
+        app.extensions["response_cache"] = self
+
+    def cached(self, tags=()):
+        """Cache a GET view. `tags` is a tuple, or a callable taking the view's URL kwargs."""
+        def decorator(view):
+            @wraps(view)
+            def wrapper(**kwargs):
+                entry_tags = tuple(tags(**kwargs) if callable(tags) else tags)
+                key = _cache_key()
+
+                # a client reading its own writes (utils/replicas.py) must not get a
+                # page rendered from a lagging replica; what it renders is fresh
+                lookup = self.enabled and not g.get("_read_primary")
+                entry = self._cache.get(key) if lookup else None
+                if entry is not None:
+                    body, status, headers, etag = entry
+                    response = current_app.response_class(body, status=status, headers=headers)
+                    return _finish(response, etag, "HIT")
+
+                generations = self._snapshot(entry_tags)
+                response = current_app.make_response(view(**kwargs))
+                if response.status_code != 200 or response.direct_passthrough:
+                    return response
+
+                body = response.get_data()
+                etag = hashlib.sha256(body).hexdigest()[:32]
+                # skip the store if a write invalidated these tags while we rendered
+                if self.enabled and generations == self._snapshot(entry_tags):
+                    headers = {"Content-Type": response.headers["Content-Type"]}
+                    self._cache.set(key, (body, 200, headers, etag), tags=entry_tags, size=len(body))
+                return _finish(response, etag, "MISS")
+            return wrapper
+        return decorator
+
+    def invalidate(self, *tags):
+        """Drop cached responses carrying any of the given tags."""
+        with self._lock:
+            for tag in tags:
+                self._generations[tag] += 1
+        self._cache.invalidate(*tags)
+
+    def clear(self):
+        self._cache.clear()
+
+    # ========== HELPERS ==========
+    def _snapshot(self, tags):
+        with self._lock:
+            return tuple(self._generations[tag] for tag in tags)
+
+
+def _cache_key():
+    # normalise arg order so ?a=1&b=2 and ?b=2&a=1 share an entry
+    return request.path, tuple(sorted(request.args.items(multi=True)))
+
+
+def _finish(response, etag, status):
+    response.set_etag(etag)
+    # clients may keep the body but must revalidate (cheap 304) before reuse
+    response.headers["Cache-Control"] = "no-cache"
+    response.headers["X-Cache"] = status
+    return response.make_conditional(request)
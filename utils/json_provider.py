@@ -0,0 +1,72 @@
+"""
+CineCritic — JSON provider backed by orjson.
+
+FastJSONProvider is a drop-in for Flask's DefaultJSONProvider: when orjson is
+installed it encodes compact responses with it, and otherwise (or whenever the
+bytes could differ) it hands over to the stdlib encoder. The fallback covers:
+
+- indented/pretty output (debug mode) and non-compact separators
+- non-ASCII text and DEL, which the stdlib escapes (ensure_ascii) and orjson does not
+- anything orjson rejects (ints over 64 bits, non-str keys, ...)
+- floats below 1e-4 or from 1e16 up, where repr(float) switches to exponents
+
+The one remaining difference is NaN/Infinity: orjson writes null where the
+stdlib emits its non-standard NaN tokens. The API never produces them.
+
+Dates, decimals, dataclasses and other non-JSON types go through Flask's
+`default` hook in both paths, so responses are identical either way.
+"""
+
+# Built-in imports
+import re
+
+# Installed imports
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:     # optional speed-up
+    orjson = None
+
+_COMPACT = (",", ":")
+# orjson writes 1e16 / 1e-7 where repr(float) gives 1e+16 / 1e-07; matched on the
+# "e" first (a literal prefix keeps the scan fast), the digit before is checked after
+_EXPONENT = re.compile(rb"e-?[0-9]")
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """DefaultJSONProvider that encodes with orjson when the output is the same."""
+
+    def dumps(self, obj, **kwargs):
+        if orjson is None or not self._fast_path(kwargs):
+            return super().dumps(obj, **kwargs)
+
+        option = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+        if kwargs.get("sort_keys", self.sort_keys):
+            option |= orjson.OPT_SORT_KEYS
+        try:
+            data = orjson.dumps(obj, default=self.default, option=option)
+        except TypeError:       # orjson.JSONEncodeError
+            return super().dumps(obj, **kwargs)
+
+        if not data.isascii() or _diverges(data):
+            return super().dumps(obj, **kwargs)
+        return data.decode()
+
+    # ========== HELPERS ==========
+    def _fast_path(self, kwargs) -> bool:
+        # response() passes these in compact mode; anything else keeps the stdlib
+        if kwargs.get("indent") is not None or kwargs.get("separators") != _COMPACT:
+            return False
+        return set(kwargs) <= {"separators", "sort_keys"} and self.ensure_ascii
+
+
+
+def _diverges(data: bytes) -> bool:
+    """True if orjson may have written `data` differently from the stdlib.
+
+    A string that merely contains one of these patterns just takes the slow path.
+    """
+    if b"0.0000" in data or b"\x7f" in data:     # 0.00001 (repr: 1e-05), raw DEL
+        return True
+    return any(data[m.start() - 1:m.start()].isdigit() for m in _EXPONENT.finditer(data))
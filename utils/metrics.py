@@ -0,0 +1,186 @@
+"""
+CineCritic — request, SQL and connection-pool metrics in Prometheus format.
+
+Metrics.init_app() times every request and, through SQLAlchemy engine events,
+counts the SQL statements it ran and the time they took. Postgres engines get a
+QueuePool subclass (its asyncio-adapted twin for asyncpg, see asgi.py) that
+records how long a checkout waited for a connection.
+GET /metrics renders it all in the Prometheus text format.
+
+Series are labelled by method and URL rule ("/films/<int:film_id>"), never the
+raw path, so their number stays bounded.
+
+Gunicorn runs several worker processes, each with its own counters. Set
+PROMETHEUS_MULTIPROC_DIR (gunicorn.conf.py does) and every worker writes its
+samples there; /metrics then sums the files, whichever worker serves it.
+"""
+
+# Built-in imports
+import hmac
+import os
+import time
+
+# Installed imports
+from flask import current_app, g, has_request_context, request
+from prometheus_client import CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Gauge, Histogram, generate_latest
+from prometheus_client import multiprocess
+from sqlalchemy import event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+# seconds; Prometheus' defaults stop at 10s and start too coarse for SQL
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 100)
+UNMATCHED = "<unmatched>"      # 404s and anything else without a URL rule
+
+_registry = CollectorRegistry(auto_describe=True)
+
+REQUEST_LATENCY = Histogram(
+    "cinecritic_request_duration_seconds", "Time to handle a request.",
+    ("method", "route"), buckets=LATENCY_BUCKETS, registry=_registry,
+)
+REQUESTS = Counter(
+    "cinecritic_requests", "Requests handled, by response status.",
+    ("method", "route", "status"), registry=_registry,
+)
+REQUEST_SQL_STATEMENTS = Histogram(
+    "cinecritic_request_sql_statements", "SQL statements executed per request.",
+    ("method", "route"), buckets=QUERY_COUNT_BUCKETS, registry=_registry,
+)
+REQUEST_SQL_TIME = Histogram(
+    "cinecritic_request_sql_duration_seconds", "Time spent in SQL per request.",
+    ("method", "route"), buckets=LATENCY_BUCKETS, registry=_registry,
+)
+SQL_STATEMENTS = Counter(
+    "cinecritic_sql_statements", "SQL statements executed, inside or outside requests.",
+    registry=_registry,
+)
+POOL_CHECKOUT_WAIT = Histogram(
+    "cinecritic_db_pool_checkout_wait_seconds",
+    "Time to get a connection from the pool, including opening a new one.",
+    buckets=LATENCY_BUCKETS, registry=_registry,
+)
+
+REPLICA_LAG = Gauge(
+    "cinecritic_replica_lag_seconds", "Replay lag of each read replica at its last check.",
+    ("replica",), multiprocess_mode="mostrecent", registry=_registry,
+)
+REPLICA_UP = Gauge(
+    "cinecritic_replica_up", "1 if the replica answered its last lag check, else 0.",
+    ("replica",), multiprocess_mode="mostrecent", registry=_registry,
+)
+
+PASSWORD_HASH_PENDING = Gauge(
+    "cinecritic_password_hash_pending", "Password hash/verify jobs queued or running.",
+    multiprocess_mode="livesum", registry=_registry,
+)
+PASSWORD_HASH_DURATION = Histogram(
+    "cinecritic_password_hash_duration_seconds", "Time from queueing a password job to its result.",
+    ("operation",), buckets=LATENCY_BUCKETS, registry=_registry,
+)
+PASSWORD_HASH_REJECTED = Counter(
+    "cinecritic_password_hash_rejected", "Password jobs refused because the queue was full.",
+    registry=_registry,
+)
+
+
+class _TimedCheckout:
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            POOL_CHECKOUT_WAIT.observe(time.perf_counter() - start)
+
+
+class TimedQueuePool(_TimedCheckout, QueuePool):
+    """QueuePool that records how long each checkout took."""
+
+
+class TimedAsyncQueuePool(_TimedCheckout, AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool (asyncpg engines) that records how long each checkout took."""
+
+
+class Metrics:
+    """Flask extension collecting per-request latency and SQL metrics."""
+
+    def __init__(self, app=None):
+        self.enabled = True
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Hook into `app`; call before db.init_app() so the engine gets the timed pool."""
+        app.config.setdefault("METRICS_ENABLED", True)
+        app.config.setdefault("METRICS_TOKEN", None)
+        self.enabled = app.config["METRICS_ENABLED"]
+        app.extensions["metrics"] = self
+        if not self.enabled:
+            return
+
+        uri = app.config.get("SQLALCHEMY_DATABASE_URI")
+        options = app.config.setdefault("SQLALCHEMY_ENGINE_OPTIONS", {})
+        # an explicitly configured pool (e.g. NullPool) is left alone
+        if uri and make_url(uri).get_backend_name() == "postgresql":
+            is_async = make_url(uri).get_dialect().is_async
+            options.setdefault("poolclass", TimedAsyncQueuePool if is_async else TimedQueuePool)
+
+        if not event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+            event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+            event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+        app.before_request(_start_request)
+        app.after_request(_finish_request)
+
+    def render(self):
+        """Return the (body, status, headers) for GET /metrics."""
+        token = request.headers.get("Authorization", "").removeprefix("Bearer ")
+        expected = current_app.config["METRICS_TOKEN"]
+        if expected and not hmac.compare_digest(token.encode(), expected.encode()):
+            return {"error": "unauthorized", "detail": "Missing or invalid metrics token."}, 401
+
+        if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+            # samples from every worker live in the shared directory
+            registry = CollectorRegistry()
+            multiprocess.MultiProcessCollector(registry)
+        else:
+            registry = _registry
+        return generate_latest(registry), 200, {"Content-Type": CONTENT_TYPE_LATEST}
+
+
+# ========== HELPERS ==========
+def _start_request():
+    g._metrics = [time.perf_counter(), 0, 0.0]     # start, statements, SQL seconds
+
+
+def _finish_request(response):
+    stats = g.pop("_metrics", None)
+    if stats is None or request.endpoint == "metrics":
+        return response
+    start, statements, sql_seconds = stats
+    method = request.method
+    route = request.url_rule.rule if request.url_rule is not None else UNMATCHED
+
+    REQUEST_LATENCY.labels(method, route).observe(time.perf_counter() - start)
+    REQUESTS.labels(method, route, str(response.status_code)).inc()
+    REQUEST_SQL_STATEMENTS.labels(method, route).observe(statements)
+    REQUEST_SQL_TIME.labels(method, route).observe(sql_seconds)
+    return response
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    # the execution context lives for one statement, so a failed one leaves nothing behind
+    if context is not None:
+        context._metrics_start = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    start = getattr(context, "_metrics_start", None)
+    if start is None:
+        return
+    elapsed = time.perf_counter() - start
+    SQL_STATEMENTS.inc()
+    if has_request_context():
+        stats = g.get("_metrics")
+        if stats is not None:
+            stats[1] += 1
+            stats[2] += elapsed
@@ -0,0 +1,180 @@
+"""
+CineCritic — pagination helpers shared by list endpoints.
+
+Keyset (cursor) pagination:
+    Cursors are opaque, URL-safe strings that encode the sort key of the last
+    row on a page. The next page is fetched with a range predicate on that key
+    instead of an OFFSET, so every page costs the same regardless of depth and
+    no COUNT(*) is needed.
+
+Offset pagination with pluggable totals:
+    paginate() serves the classic ?page & ?per_page mode, but lets each endpoint
+    choose how (and whether) `meta.total` is computed, since the COUNT(*) often
+    costs more than the page itself.
+"""
+
+# Built-in imports
+import base64
+import json
+import math
+from datetime import datetime
+
+# Installed imports
+from flask import current_app, request
+
+# Local imports
+from extensions import db
+from utils.cache import TTLCache
+
+
+class InvalidCursor(ValueError):
+    """Raised when a client sends a cursor we did not issue (or cannot read)."""
+
+
+def encode_cursor(*values) -> str:
+    """Encode a row's sort key (datetimes and ints) as an opaque cursor string."""
+    parts = [v.isoformat() if isinstance(v, datetime) else v for v in values]
+    raw = json.dumps(parts, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, *types) -> tuple:
+    """Decode a cursor back into a tuple whose items are coerced to `types`.
+
+    Raises InvalidCursor on anything malformed so callers can answer 400.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        parts = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(parts, list) or len(parts) != len(types):
+            raise InvalidCursor(cursor)
+        return tuple(
+            datetime.fromisoformat(value) if kind is datetime else kind(value)
+            for kind, value in zip(types, parts)
+        )
+    except (ValueError, TypeError) as exc:
+        # binascii.Error and json.JSONDecodeError are both ValueError subclasses
+        raise InvalidCursor(cursor) from exc
+
+
+# ========== TOTALS ==========
+# How `meta.total` is produced for offset-paginated endpoints:
+#   exact    – COUNT(*) over the filtered query on every request
+#   window   – exact too, but from count(*) OVER () on the page query itself, so
+#              page and total cost one round trip (a separate COUNT only runs
+#              for a page past the end); suits small per-user lists, not the
+#              big catalogue ones, where it would defeat LIMIT
+#   cached   – exact count memoised per (endpoint, filters) for PAGINATION_TOTAL_TTL
+#              seconds, dropped early when a write handler touches the tables
+#   estimate – the Postgres planner's row estimate (falls back to exact for
+#              small results, where estimates are least reliable)
+#   none     – no total at all; also requested per call with ?with_total=false
+TOTAL_STRATEGIES = ("exact", "window", "cached", "estimate", "none")
+
+DEFAULT_TOTAL_STRATEGIES = {
+    "films.list_films": "cached",
+    "reviews.list_reviews": "cached",
+    "reviews_feed.list_all_reviews": "estimate",
+    "watchlist.list_watchlist": "window",
+}
+
+_totals_cache = TTLCache(maxsize=4096)
+
+
+def parse_total_strategies(value: str | None) -> dict:
+    """Parse "endpoint=strategy,endpoint=strategy" (e.g. from an env var) over the defaults."""
+    strategies = dict(DEFAULT_TOTAL_STRATEGIES)
+    for item in (value or "").split(","):
+        if not item.strip():
+            continue
+        endpoint, _, strategy = item.partition("=")
+        strategy = strategy.strip()
+        if strategy not in TOTAL_STRATEGIES:
+            raise ValueError(f"Unknown total strategy {strategy!r} for {endpoint.strip()!r}")
+        strategies[endpoint.strip()] = strategy
+    return strategies
+
+
+def invalidate_totals(*tables):
+    """Forget cached totals computed over any of the given tables (call after writes)."""
+    _totals_cache.invalidate(*tables)
+
+
+def paginate(stmt, page: int, per_page: int, tables=()):
+    """Fetch one OFFSET page of `stmt` and build its `meta` block.
+
+    The total is produced by the strategy configured for the current endpoint
+    in PAGINATION_TOTALS, and `meta.total_strategy` reports which one was used.
+    `tables` names the tables the query reads, for cache invalidation.
+    Returns (items, meta).
+    """
+    strategy = _total_strategy()
+    page_stmt = stmt.limit(per_page).offset((page - 1) * per_page)
+    total = None
+    if strategy == "window":
+        rows = db.session.execute(page_stmt.add_columns(db.func.count().over())).all()
+        items = [row[0] for row in rows]
+        if rows:
+            total = rows[0][1]
+        else:
+            total = _exact_total(stmt) if page > 1 else 0
+    else:
+        items = db.session.scalars(page_stmt).all()
+
+    if strategy == "estimate":
+        total = _estimate_total(stmt)
+        if total is None:
+            strategy = "exact"
+    if strategy == "cached":
+        total = _cached_total(stmt, tables)
+    elif strategy == "exact":
+        total = _exact_total(stmt)
+
+    meta = {"page": page, "per_page": per_page}
+    if total is not None:
+        meta["total"] = total
+        meta["pages"] = math.ceil(total / per_page)
+    meta["total_strategy"] = strategy
+    return items, meta
+
+
+def _total_strategy() -> str:
+    if request.args.get("with_total", "").strip().lower() in ("false", "0", "no"):
+        return "none"
+    return current_app.config["PAGINATION_TOTALS"].get(request.endpoint, "exact")
+
+
+def count_query(stmt):
+    """SELECT count(*) over a list query (ordering dropped)."""
+    return db.select(db.func.count()).select_from(stmt.order_by(None).subquery())
+
+
+def _exact_total(stmt) -> int:
+    return db.session.scalar(count_query(stmt))
+
+
+def _cached_total(stmt, tables) -> int:
+    count_stmt = count_query(stmt)
+    compiled = count_stmt.compile(dialect=db.session.get_bind().dialect)
+    key = (request.endpoint, compiled.string, tuple(sorted(compiled.params.items())))
+    total = _totals_cache.get(key)
+    if total is None:
+        total = db.session.scalar(count_stmt)
+        _totals_cache.set(key, total, tags=tables, ttl=current_app.config["PAGINATION_TOTAL_TTL"])
+    return total
+
+
+def _estimate_total(stmt) -> int | None:
+    """Planner row estimate for `stmt`, or None when it can't be trusted/obtained."""
+    conn = db.session.connection()
+    if conn.dialect.name != "postgresql":
+        return None
+    compiled = stmt.order_by(None).compile(dialect=conn.dialect)
+    params = compiled.params
+    if compiled.positiontup is not None:     # asyncpg takes $1, $2, ... (see asgi.py)
+        params = tuple(params[name] for name in compiled.positiontup)
+    plan = conn.exec_driver_sql("EXPLAIN (FORMAT JSON) " + compiled.string, params).scalar()
+    estimate = int(plan[0]["Plan"]["Plan Rows"])
+    if estimate < current_app.config["PAGINATION_ESTIMATE_MIN"]:
+        return None
+    return estimate
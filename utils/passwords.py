@@ -0,0 +1,137 @@
+"""
+CineCritic — password hashing off the request thread.
+
+Hashing and checking passwords is deliberately slow (scrypt by default), so a
+burst of logins can keep every gunicorn worker busy and leave film browsing
+queueing behind them. PasswordHasher runs that work in a small process pool per
+worker instead:
+
+- PASSWORD_HASH_WORKERS processes hash in parallel. 0 (the default) hashes
+  inline; gunicorn.conf.py turns the pool on. Pool processes are started with
+  forkserver/spawn, which re-imports the __main__ script, so anything else
+  enabling it must keep its entry point under `if __name__ == "__main__":`
+- at most PASSWORD_HASH_MAX_PENDING jobs may be queued or running; beyond that,
+  and when a job takes longer than PASSWORD_HASH_TIMEOUT seconds, HashingBusy
+  is raised and the client gets a 503 to retry
+- PASSWORD_HASH_METHOD is the werkzeug method new hashes use, e.g.
+  "scrypt:32768:8:1" or "pbkdf2:sha256:600000"; shorthands such as "scrypt"
+  or "pbkdf2" get werkzeug's default parameters
+
+Hashes are werkzeug's "method$salt$hash" strings, so any stored format keeps
+verifying. needs_rehash() tells login when a hash was made with other
+parameters, and the hash is then replaced on that successful login. It
+compares against the method as werkzeug writes it ("scrypt" is stored as
+"scrypt:32768:8:1"), found by hashing a probe value the first time it is
+needed rather than at startup, where it would slow down every worker boot.
+
+Queue depth, job time and rejections are exported at /metrics.
+"""
+
+# Built-in imports
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeout
+from concurrent.futures.process import BrokenProcessPool
+
+# Installed imports
+from werkzeug.security import check_password_hash, generate_password_hash
+
+# Local imports
+from utils.metrics import PASSWORD_HASH_DURATION, PASSWORD_HASH_PENDING, PASSWORD_HASH_REJECTED
+
+DEFAULT_METHOD = "scrypt:32768:8:1"
+
+
+class HashingBusy(Exception):
+    """The hashing queue is full or a job timed out; the request should be retried."""
+
+
+class PasswordHasher:
+    """Flask extension hashing and verifying passwords in a bounded process pool."""
+
+    def __init__(self, app=None):
+        self.method = DEFAULT_METHOD
+        self._stored_method = None      # self.method as it appears in hashes, see needs_rehash()
+        self.workers = 0
+        self.timeout = 10.0
+        self._slots = None
+        self._pool = None
+        self._pool_pid = None
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault("PASSWORD_HASH_METHOD", DEFAULT_METHOD)
+        app.config.setdefault("PASSWORD_HASH_WORKERS", 0)
+        app.config.setdefault("PASSWORD_HASH_MAX_PENDING", 32)
+        app.config.setdefault("PASSWORD_HASH_TIMEOUT", 10.0)
+        self.method = app.config["PASSWORD_HASH_METHOD"]
+        self._stored_method = None
+        self.workers = app.config["PASSWORD_HASH_WORKERS"]
+        self.timeout = app.config["PASSWORD_HASH_TIMEOUT"]
+        self._slots = threading.BoundedSemaphore(app.config["PASSWORD_HASH_MAX_PENDING"])
+        app.extensions["passwords"] = self
+
+    def hash(self, password: str) -> str:
+        """Hash `password` with the configured method."""
+        return self._run("hash", generate_password_hash, password, self.method)
+
+    def verify(self, password_hash: str, password: str) -> bool:
+        """Check `password` against a stored hash of any werkzeug format."""
+        return self._run("verify", check_password_hash, password_hash, password)
+
+    def needs_rehash(self, password_hash: str) -> bool:
+        """True if `password_hash` wasn't made with the configured method and parameters."""
+        if self._stored_method is None:
+            # werkzeug expands shorthands ("scrypt" -> "scrypt:32768:8:1") only while hashing
+            self._stored_method = generate_password_hash("", self.method).partition("$")[0]
+        return password_hash.partition("$")[0] != self._stored_method
+
+    # ========== HELPERS ==========
+    def _run(self, operation, fn, *args):
+        if not self._slots.acquire(blocking=False):
+            PASSWORD_HASH_REJECTED.inc()
+            raise HashingBusy("Too many password checks in progress.")
+        PASSWORD_HASH_PENDING.inc()
+        start = time.perf_counter()
+
+        def done(_=None):
+            PASSWORD_HASH_PENDING.dec()
+            PASSWORD_HASH_DURATION.labels(operation).observe(time.perf_counter() - start)
+            self._slots.release()
+
+        if self.workers <= 0:
+            try:
+                return fn(*args)
+            finally:
+                done()
+
+        try:
+            future = self._executor().submit(fn, *args)
+        except BrokenProcessPool:
+            done()
+            self._pool = None       # a pool process died; start a fresh pool next time
+            raise HashingBusy("Password hashing pool restarted.") from None
+        # the slot is freed when the job finishes, even if we stop waiting for it
+        future.add_done_callback(done)
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeout:
+            raise HashingBusy("Password check timed out.") from None
+        except BrokenProcessPool:
+            self._pool = None
+            raise HashingBusy("Password hashing pool restarted.") from None
+
+    def _executor(self):
+        # created lazily, and again after a fork (gunicorn workers must not share the master's pool)
+        with self._lock:
+            if self._pool is None or self._pool_pid != os.getpid():
+                methods = multiprocessing.get_all_start_methods()
+                # not "fork": copying a worker mid-request (threads, DB sockets) into the pool is unsafe
+                context = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+                self._pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=context)
+                self._pool_pid = os.getpid()
+            return self._pool
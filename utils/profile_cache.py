@@ -0,0 +1,81 @@
+"""
+CineCritic — cached user profiles for GET /auth/me.
+
+The frontend asks for the current user's profile on every page load, so
+ProfileCache keeps each profile in a per-process TTLCache keyed by user id
+(PROFILE_CACHE_TTL seconds, at most PROFILE_CACHE_MAX_ENTRIES users, least
+recently used evicted first). Each entry carries an ETag derived from the
+profile itself, so every worker computes the same tag and a client repeating
+If-None-Match gets a 304 whichever worker answers.
+
+Anything that changes or removes a user, including their review and watchlist
+counters, must call profile_cache.invalidate(id) after committing. Other
+workers drop their copy when the TTL runs out.
+"""
+
+# Built-in imports
+import hashlib
+import json
+import threading
+
+# Local imports
+from utils.cache import TTLCache
+
+
+class ProfileCache:
+    """Flask extension caching user profiles (and their ETags) by user id."""
+
+    def __init__(self, app=None):
+        self._cache = TTLCache()
+        self._generation = 0        # bumped on every invalidation
+        self._lock = threading.Lock()
+        self.enabled = True
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault("PROFILE_CACHE_ENABLED", True)
+        app.config.setdefault("PROFILE_CACHE_TTL", 60)
+        app.config.setdefault("PROFILE_CACHE_MAX_ENTRIES", 10_000)
+        self.enabled = app.config["PROFILE_CACHE_ENABLED"]
+        self._cache = TTLCache(
+            maxsize=app.config["PROFILE_CACHE_MAX_ENTRIES"],
+            ttl=app.config["PROFILE_CACHE_TTL"],
+        )
+        app.extensions["profile_cache"] = self
+
+    def get(self, user_id: int, load):
+        """Return (profile, etag) for `user_id`, calling load(user_id) on a miss.
+
+        `load` returns the profile dict, or None if the user doesn't exist;
+        None is returned (and not cached) in that case.
+        """
+        entry = self._cache.get(user_id) if self.enabled else None
+        if entry is not None:
+            return entry
+
+        generation = self._generation
+        profile = load(user_id)
+        if profile is None:
+            return None
+        entry = profile, _etag(profile)
+        # skip the store if the user was changed/removed while we loaded
+        with self._lock:
+            if self.enabled and generation == self._generation:
+                self._cache.set(user_id, entry)
+        return entry
+
+    def invalidate(self, *user_ids: int):
+        """Forget the cached profiles of the given users (call after commit)."""
+        with self._lock:
+            self._generation += 1
+            for user_id in user_ids:
+                self._cache.delete(user_id)
+
+    def clear(self):
+        self._cache.clear()
+
+
+def _etag(profile) -> str:
+    encoded = json.dumps(profile, sort_keys=True, separators=(",", ":")).encode()
+    return hashlib.sha256(encoded).hexdigest()[:32]
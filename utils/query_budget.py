@@ -0,0 +1,69 @@
+"""
+CineCritic — per-route SQL statement budgets.
+
+`@query_budget(n)` declares how many SQL statements a view may run. With
+QUERY_BUDGET_MODE set to "log" or "raise" (dev/test), every call is counted
+through a SQLAlchemy engine event and going over budget logs a warning or raises
+QueryBudgetExceeded, so an N+1 (a lazy load per row, a refresh after commit)
+shows up as soon as a route starts issuing more statements than it should.
+The default mode "off" skips the counting entirely.
+
+Place the decorator under the route decorator so it wraps the view itself:
+
+    @film_bp.get("/<int:film_id>")
+    @query_budget(1)
+    def get_film(film_id): ...
+
+`python -m bench.endpoints --check-budgets` runs every route once against the
+benchmark dataset and reports its statement count next to its budget.
+"""
+
+# Built-in imports
+from functools import wraps
+
+# Installed imports
+from flask import current_app, g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+MODES = ("off", "log", "raise")
+
+
+class QueryBudgetExceeded(RuntimeError):
+    """A view ran more SQL statements than its @query_budget allows."""
+
+
+def query_budget(limit: int):
+    """Allow the decorated view at most `limit` SQL statements per call."""
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            mode = current_app.config.get("QUERY_BUDGET_MODE", "off")
+            if mode == "off":
+                return view(*args, **kwargs)
+
+            g._query_count = 0
+            try:
+                response = view(*args, **kwargs)
+            finally:
+                used = g.pop("_query_count")
+            g.query_budget_used = used
+            if used > limit:
+                message = f"{request.method} {request.path} ran {used} SQL statements (budget {limit})"
+                if mode == "raise":
+                    raise QueryBudgetExceeded(message)
+                current_app.logger.warning("Query budget exceeded: %s", message)
+            return response
+
+        wrapper.query_budget = limit
+        return wrapper
+    return decorator
+
+
+# ========== HELPERS ==========
+def _count_statement(conn, cursor, statement, parameters, context, executemany):
+    if has_request_context() and g.get("_query_count") is not None:
+        g._query_count += 1
+
+
+event.listen(Engine, "after_cursor_execute", _count_statement)
@@ -0,0 +1,110 @@
+"""
+CineCritic — query-plan regression checks for the hot list queries.
+
+Each check EXPLAINs the statement a controller actually runs (built by the
+same build_*_query helpers) with sequential scans disabled for the
+transaction. Postgres still falls back to a Seq Scan when no index can serve
+the query at all, so any Seq Scan on a guarded table means an index is
+missing or no longer usable. Disabling seqscan keeps the check meaningful on
+small seeded databases, where the planner would otherwise prefer a scan.
+
+Run with `flask ops check-plans` against a migrated (and ideally seeded)
+Postgres database.
+"""
+
+# Built-in imports
+from datetime import datetime
+from dataclasses import dataclass, field
+from typing import Callable
+
+# Local imports
+from extensions import db
+from utils.pagination import count_query
+from utils.search import trigram_available
+
+# tables that must never be read with a sequential scan on a hot path
+GUARDED_TABLES = {"films", "reviews", "watchlist", "film_genres", "film_rating_stats"}
+
+
+@dataclass
+class PlanCheck:
+    name: str
+    build: Callable            # () -> SQLAlchemy select
+    needs_trigram: bool = False
+
+
+@dataclass
+class PlanResult:
+    name: str
+    seq_scans: list = field(default_factory=list)
+    skipped: str | None = None
+
+    @property
+    def ok(self):
+        return not self.seq_scans
+
+
+def hot_queries(page_size: int = 20):
+    """The statements behind the busiest list endpoints, with sample parameters."""
+    # imported here: controllers import utils, not the other way round
+    from controllers.films_controller import build_films_query
+    from controllers.reviews_controller import build_feed_query, build_film_reviews_query
+    from controllers.watchlist_controller import build_watchlist_query
+    from models.watchlist import Watchlist
+
+    def page(stmt):
+        return stmt.limit(page_size).offset(page_size)
+
+    return [
+        PlanCheck("list_films", lambda: page(build_films_query())),
+        PlanCheck("list_films ?genre_id", lambda: page(build_films_query(genre_id=1))),
+        PlanCheck("list_films ?title", lambda: page(build_films_query(title="night")), needs_trigram=True),
+        PlanCheck("list_films ?director", lambda: page(build_films_query(director="nolan")), needs_trigram=True),
+        PlanCheck("list_all_reviews", lambda: page(build_feed_query())),
+        PlanCheck("list_all_reviews total", lambda: count_query(build_feed_query())),
+        PlanCheck("list_all_reviews ?film_id", lambda: page(build_feed_query(film_id=1))),
+        PlanCheck("list_reviews", lambda: page(build_film_reviews_query(1))),
+        PlanCheck("list_reviews total", lambda: count_query(build_film_reviews_query(1))),
+        PlanCheck("list_watchlist", lambda: page(build_watchlist_query(1))),
+        PlanCheck("list_watchlist total", lambda: count_query(build_watchlist_query(1))),
+        PlanCheck("list_watchlist ?cursor", lambda: build_watchlist_query(1).where(
+            db.tuple_(Watchlist.added_at, Watchlist.film_id) < db.tuple_(datetime(2030, 1, 1), 1)
+        ).limit(page_size + 1)),
+    ]
+
+
+def explain(stmt) -> dict:
+    """EXPLAIN (FORMAT JSON) a statement with sequential scans discouraged."""
+    conn = db.session.connection()
+    compiled = stmt.compile(dialect=conn.dialect)
+    conn.exec_driver_sql("SET LOCAL enable_seqscan = off")
+    return conn.exec_driver_sql("EXPLAIN (FORMAT JSON) " + compiled.string, compiled.params).scalar()[0]["Plan"]
+
+
+def find_seq_scans(plan: dict, tables=GUARDED_TABLES) -> list:
+    """Relation names read by Seq Scan nodes anywhere in a plan tree."""
+    found = []
+    if plan.get("Node Type") == "Seq Scan" and plan.get("Relation Name") in tables:
+        found.append(plan["Relation Name"])
+    for child in plan.get("Plans", []):
+        found.extend(find_seq_scans(child, tables))
+    return found
+
+
+def check_plans(checks=None) -> list:
+    """Run every check and return PlanResults (the session is rolled back afterwards)."""
+    if db.session.get_bind().dialect.name != "postgresql":
+        raise RuntimeError("Query-plan checks need a PostgreSQL database.")
+
+    has_trigram = trigram_available()
+    results = []
+    try:
+        for check in checks or hot_queries():
+            if check.needs_trigram and not has_trigram:
+                results.append(PlanResult(check.name, skipped="pg_trgm not installed"))
+                continue
+            plan = explain(check.build())
+            results.append(PlanResult(check.name, seq_scans=find_seq_scans(plan)))
+    finally:
+        db.session.rollback()
+    return results
@@ -0,0 +1,126 @@
+"""
+CineCritic — incremental maintenance of film_rating_stats.
+
+A review contributes its rating to its film's stats only while it is published.
+Write handlers capture the contribution before and after a change and call
+apply_review_change() before committing, so the stats move in the same
+transaction as the review. Each change is a single atomic statement that adds
+deltas to the stored columns; concurrent writers never read-modify-write.
+The "before" contribution must come from the review row locked for the
+transaction (reviews_controller._resolve(..., for_update=True)), otherwise
+two concurrent changes of one review both apply it.
+
+rebuild_rating_stats() recomputes everything from the reviews table
+(`flask ops rebuild-rating-stats`).
+"""
+
+# Built-in imports
+from decimal import Decimal
+
+# Installed imports
+from sqlalchemy.dialects.postgresql import insert
+
+# Local imports
+from extensions import db
+from models.film_rating_stats import FilmRatingStats, RATING_STEPS, BUCKET_COLUMNS
+from models.reviews import Review
+
+
+def review_contribution(review):
+    """The rating a review adds to its film's stats, or None if it adds nothing."""
+    if review.status != "published":
+        return None
+    return Decimal(str(review.rating))
+
+
+def apply_review_change(film_id: int, old, new):
+    """Move a film's stats from contribution `old` to `new` (ratings or None)."""
+    if old == new:
+        return
+
+    deltas = {col: 0 for col in BUCKET_COLUMNS}
+    deltas["review_count"] = 0
+    deltas["rating_sum"] = Decimal("0")
+    if old is not None:
+        deltas["review_count"] -= 1
+        deltas["rating_sum"] -= old
+        deltas[_bucket(old)] -= 1
+    if new is not None:
+        deltas["review_count"] += 1
+        deltas["rating_sum"] += new
+        deltas[_bucket(new)] += 1
+
+    table = FilmRatingStats.__table__
+    if old is not None:
+        # the review was counted, so the film has a stats row: never insert one with negative counts
+        db.session.execute(db.update(table).where(table.c.film_id == film_id).values(_add_deltas(table, deltas)))
+        return
+    stmt = insert(table).values(
+        film_id=film_id,
+        rating_mean=(deltas["rating_sum"] / deltas["review_count"]) if deltas["review_count"] > 0 else None,
+        **deltas,
+    )
+    # on conflict the inserted values act as deltas against the stored row
+    excluded = {col: stmt.excluded[col] for col in deltas}
+    db.session.execute(stmt.on_conflict_do_update(index_elements=[table.c.film_id], set_=_add_deltas(table, excluded)))
+
+
+def remove_user_reviews(user_id: int):
+    """Subtract every published review by `user_id` (call before deleting the user)."""
+    table = FilmRatingStats.__table__
+    count = table.c.review_count - 1
+    total = table.c.rating_sum - Review.rating
+    values = {
+        "review_count": count,
+        "rating_sum": total,
+        "rating_mean": db.case((count > 0, db.func.round(total / count, 2)), else_=None),
+    }
+    for step, col in zip(RATING_STEPS, BUCKET_COLUMNS):
+        values[col] = table.c[col] - db.case((Review.rating == step, 1), else_=0)
+    # (film_id, user_id) is unique, so each stats row matches at most one review
+    db.session.execute(
+        db.update(table)
+        .where(
+            table.c.film_id == Review.film_id,
+            Review.user_id == user_id,
+            Review.status == "published",
+        )
+        .values(values)
+    )
+
+
+def rebuild_rating_stats():
+    """Recompute film_rating_stats from scratch; returns the number of films with stats."""
+    table = FilmRatingStats.__table__
+    buckets = [
+        db.func.count().filter(Review.rating == step).label(col)
+        for step, col in zip(RATING_STEPS, BUCKET_COLUMNS)
+    ]
+    source = (
+        db.select(
+            Review.film_id,
+            db.func.count().label("review_count"),
+            db.func.sum(Review.rating).label("rating_sum"),
+            db.func.round(db.func.avg(Review.rating), 2).label("rating_mean"),
+            *buckets,
+        )
+        .where(Review.status == "published")
+        .group_by(Review.film_id)
+    )
+    columns = ["film_id", "review_count", "rating_sum", "rating_mean", *BUCKET_COLUMNS]
+    db.session.execute(db.delete(table))
+    result = db.session.execute(db.insert(table).from_select(columns, source))
+    return result.rowcount
+
+
+# ========== HELPERS ==========
+def _add_deltas(table, deltas) -> dict:
+    """SET clause adding `deltas` to the stored columns and recomputing rating_mean."""
+    values = {col: table.c[col] + delta for col, delta in deltas.items()}
+    count, total = values["review_count"], values["rating_sum"]
+    values["rating_mean"] = db.case((count > 0, db.func.round(total / count, 2)), else_=None)
+    return values
+
+
+def _bucket(rating) -> str:
+    return BUCKET_COLUMNS[int(rating * 2) - 1]
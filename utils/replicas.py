@@ -0,0 +1,209 @@
+"""
+CineCritic — read replicas with read-your-writes stickiness.
+
+DATABASE_REPLICA_URLS lists Postgres streaming replicas of the primary
+(comma-separated). Each becomes a Flask-SQLAlchemy bind ("replica0",
+"replica1", ...) with the primary's engine options plus a connect timeout of
+REPLICA_CONNECT_TIMEOUT_SECONDS, and ReplicaRouter routes every request:
+
+- GET/HEAD requests read from a randomly picked healthy replica. All other
+  requests, CLI commands and code outside a request use the primary.
+- Within a replica-routed request, flushes, INSERT/UPDATE/DELETE and
+  SELECT ... FOR UPDATE still go to the primary (RoutingSession.get_bind).
+- A client that just wrote reads from the primary for REPLICA_STICKY_SECONDS,
+  so a review it created shows up on its next GET. A successful write
+  remembers the user in this worker and sets a short-lived cookie, which
+  covers the next request landing on another worker for browser clients.
+  Those requests also skip the response cache, which may hold a page read
+  from a lagging replica. The memory is per worker and not shared: a client
+  that sends only its bearer token, without cookies, may read stale data
+  when its next GET lands on another worker.
+- Before a request, at most every REPLICA_LAG_CHECK_SECONDS, each replica's
+  replay lag is read into the cinecritic_replica_lag_seconds gauge. A replica
+  more than REPLICA_MAX_LAG_SECONDS behind, or unreachable, gets no reads
+  until a later check finds it healthy again. The check runs in the request
+  that triggers it, so the connect timeout bounds how long an unreachable
+  replica can hold that request up.
+
+Without DATABASE_REPLICA_URLS nothing changes: every statement uses the primary.
+"""
+
+# Built-in imports
+import random
+import threading
+import time
+
+# Installed imports
+from flask import g, has_app_context, request
+from flask_jwt_extended import decode_token
+from flask_jwt_extended.exceptions import JWTExtendedException
+from flask_sqlalchemy.session import Session
+from jwt import PyJWTError
+from sqlalchemy import text
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.sql import Select
+
+# Local imports
+from utils.cache import TTLCache
+from utils.metrics import REPLICA_LAG, REPLICA_UP
+
+STICKY_COOKIE = "cc_read_primary"
+READ_METHODS = ("GET", "HEAD")
+
+# seconds since the last replayed transaction; 0 when the replica has replayed
+# everything it received (an idle primary writes no new transactions)
+LAG_QUERY = text("""
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+""")
+
+
+class RoutingSession(Session):
+    """db.session: sends the current request's reads to its replica, if ReplicaRouter picked one."""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and not self._flushing and has_app_context():
+            replica = g.get("_db_replica")
+            if replica is not None and _is_read(clause):
+                return self._db.engines[replica]
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+class ReplicaRouter:
+    """Flask extension picking the database (primary or a replica) for each request."""
+
+    def __init__(self, app=None):
+        self.replicas = ()          # bind keys
+        self.sticky_seconds = 5.0
+        self.max_lag = 10.0
+        self.check_seconds = 5.0
+        self._healthy = set()
+        self._recent_writers = TTLCache()
+        self._next_check = 0.0
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Register with `app`; call before db.init_app() so the replica binds exist."""
+        app.config.setdefault("DATABASE_REPLICA_URLS", [])
+        app.config.setdefault("REPLICA_STICKY_SECONDS", 5.0)
+        app.config.setdefault("REPLICA_MAX_LAG_SECONDS", 10.0)
+        app.config.setdefault("REPLICA_LAG_CHECK_SECONDS", 5.0)
+        app.config.setdefault("REPLICA_CONNECT_TIMEOUT_SECONDS", 2.0)
+        self.sticky_seconds = app.config["REPLICA_STICKY_SECONDS"]
+        self.max_lag = app.config["REPLICA_MAX_LAG_SECONDS"]
+        self.check_seconds = app.config["REPLICA_LAG_CHECK_SECONDS"]
+        self._healthy = set()
+        self._recent_writers = TTLCache(maxsize=100_000, ttl=self.sticky_seconds)
+        self._next_check = 0.0
+        app.extensions["replicas"] = self
+
+        binds = app.config.setdefault("SQLALCHEMY_BINDS", {})
+        self.replicas = tuple(f"replica{i}" for i in range(len(app.config["DATABASE_REPLICA_URLS"])))
+        for key, url in zip(self.replicas, app.config["DATABASE_REPLICA_URLS"]):
+            binds[key] = _bind_options(url, app.config)
+        if self.replicas:
+            app.before_request(self._route_request)
+            app.after_request(self._remember_write)
+
+    def check_lag(self) -> dict:
+        """Read every replica's lag into the metrics and health set; returns {bind key: seconds or None}."""
+        from extensions import db
+
+        lags = {}
+        for key in self.replicas:
+            try:
+                with db.engines[key].connect() as conn:
+                    lags[key] = float(conn.execute(LAG_QUERY).scalar())
+            except (DBAPIError, OSError):   # unreachable: take it out of rotation, try again next check
+                lags[key] = None
+            REPLICA_UP.labels(key).set(lags[key] is not None)
+            if lags[key] is not None:
+                REPLICA_LAG.labels(key).set(lags[key])
+        self._healthy = {key for key, lag in lags.items() if lag is not None and lag <= self.max_lag}
+        return lags
+
+    # ========== HELPERS ==========
+    def _route_request(self):
+        g._db_replica = None
+        if request.method not in READ_METHODS:
+            return
+        self._check_lag_if_due()
+        if request.cookies.get(STICKY_COOKIE) or self._wrote_recently():
+            g._read_primary = True
+            return
+        healthy = [key for key in self.replicas if key in self._healthy]
+        if healthy:
+            g._db_replica = random.choice(healthy)
+
+    def _remember_write(self, response):
+        if request.method in READ_METHODS or request.method == "OPTIONS" or response.status_code >= 400:
+            return response
+        user_id = _token_user_id()
+        if user_id is not None:
+            self._recent_writers.set(user_id, True)
+        response.set_cookie(
+            STICKY_COOKIE, "1", max_age=int(self.sticky_seconds) or 1,
+            httponly=True, samesite="Lax", secure=request.is_secure,
+        )
+        return response
+
+    def _wrote_recently(self) -> bool:
+        if not len(self._recent_writers):
+            return False        # skip decoding the token when nobody wrote lately
+        user_id = _token_user_id()
+        return user_id is not None and self._recent_writers.get(user_id) is not None
+
+    def _check_lag_if_due(self):
+        if time.monotonic() < self._next_check:
+            return
+        # never wait: under asgi.py requests share a thread (see TokenDenylist)
+        if not self._lock.acquire(blocking=False):
+            return
+        try:
+            if time.monotonic() < self._next_check:
+                return
+            self.check_lag()
+            self._next_check = time.monotonic() + self.check_seconds
+        finally:
+            self._lock.release()
+
+
+def _bind_options(url, config) -> dict:
+    """A replica bind: the primary's engine options, connecting with a timeout.
+
+    Flask-SQLAlchemy applies SQLALCHEMY_ENGINE_OPTIONS to the default bind
+    only, so they are copied here.
+    """
+    options = dict(config.get("SQLALCHEMY_ENGINE_OPTIONS", {}), url=url)
+    timeout = config["REPLICA_CONNECT_TIMEOUT_SECONDS"]
+    connect_args = dict(options.get("connect_args", {}))
+    if make_url(url).get_driver_name() == "asyncpg":
+        connect_args["timeout"] = timeout
+    else:
+        connect_args["connect_timeout"] = max(1, round(timeout))    # libpq: whole seconds
+    options["connect_args"] = connect_args
+    return options
+
+
+def _is_read(clause) -> bool:
+    # None: session.connection()/get_bind() without a statement (EXPLAIN, dialect lookups)
+    if clause is None:
+        return True
+    return isinstance(clause, Select) and clause._for_update_arg is None
+
+
+def _token_user_id():
+    """The user id in the request's bearer token, or None (no/invalid token)."""
+    header = request.headers.get("Authorization", "")
+    if not header.startswith("Bearer "):
+        return None
+    try:
+        return decode_token(header.removeprefix("Bearer "))["sub"]
+    except (PyJWTError, JWTExtendedException):    # expired, malformed, wrong key: not a known writer
+        return None
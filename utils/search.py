@@ -0,0 +1,68 @@
+"""
+CineCritic — substring search helpers for film title/director filters.
+
+Filters are plain ILIKE '%term%' patterns. On Postgres with the pg_trgm
+extension (see migration a3c1f09b5d27), the GIN trigram indexes on films.title
+and films.director serve these patterns directly, so searches no longer scan
+the whole table. Without the extension the same SQL still works, it just
+cannot use an index.
+
+Ranking (?sort=relevance) uses pg_trgm's similarity() when available and
+falls back to a portable exact > prefix > substring ordering otherwise.
+"""
+
+# Local imports
+from extensions import db
+
+_trigram_support = {}     # engine url -> bool, probed once per process
+
+
+def escape_like(term: str, escape: str = "\\") -> str:
+    """Escape LIKE wildcards so user input is matched literally."""
+    return (
+        term.replace(escape, escape + escape)
+            .replace("%", escape + "%")
+            .replace("_", escape + "_")
+    )
+
+
+def contains(column, term: str):
+    """Case-insensitive substring predicate (trigram-index friendly on Postgres)."""
+    return column.ilike(f"%{escape_like(term)}%", escape="\\")
+
+
+def trigram_available() -> bool:
+    """True when the current database has pg_trgm installed."""
+    engine = db.session.get_bind()
+    key = str(engine.url)
+    if key not in _trigram_support:
+        if engine.dialect.name != "postgresql":
+            _trigram_support[key] = False
+        else:
+            _trigram_support[key] = bool(db.session.scalar(
+                db.text("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+            ))
+    return _trigram_support[key]
+
+
+def relevance(terms):
+    """Score expression for ordering search hits, highest first.
+
+    `terms` is a list of (column, term) pairs for the filters the client sent;
+    per-column scores are summed.
+    """
+    scores = []
+    for column, term in terms:
+        if trigram_available():
+            score = db.func.coalesce(db.func.similarity(column, term), 0)
+        else:
+            score = db.case(
+                (db.func.lower(column) == term.lower(), 1.0),
+                (column.ilike(f"{escape_like(term)}%", escape="\\"), 0.75),
+                else_=0.5,
+            )
+        scores.append(score)
+    total = scores[0]
+    for score in scores[1:]:
+        total = total + score
+    return total
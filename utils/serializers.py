@@ -0,0 +1,92 @@
+"""
+CineCritic — compiled dump functions for the read schemas.
+
+compile_dump(schema) turns a marshmallow schema instance into a plain Python
+function that builds the same dicts as schema.dump(), but without marshmallow's
+per-field dispatch: the function body is generated once, with one local per
+field and the conversion written inline (int(), float(), isoformat(), ...).
+
+Only what the read schemas use is compiled: Integer, Float, String, DateTime
+(named formats such as ISO), Dict with key/value fields, Method and Nested. A
+schema with dump hooks, or with any other field type or option, gets
+schema.dump back unchanged, so the output is always identical to marshmallow's. Compiled
+functions read attributes, so they expect model objects rather than dicts.
+"""
+
+# Installed imports
+from marshmallow import fields
+from marshmallow.decorators import POST_DUMP, PRE_DUMP
+from marshmallow.utils import ensure_text_type
+
+class _Unsupported(Exception):
+    """Raised while compiling when a field has no fast equivalent."""
+
+
+def compile_dump(schema):
+    """Return a function equivalent to `schema.dump` (falls back to it when needed)."""
+    try:
+        dump_one = _compile(schema)
+    except _Unsupported:
+        return schema.dump
+
+    if schema.many:
+        def dump_many(objs):
+            return [dump_one(obj) for obj in objs]
+        return dump_many
+    return dump_one
+
+
+# ========== HELPERS ==========
+def _compile(schema):
+    if schema._hooks[PRE_DUMP] or schema._hooks[POST_DUMP]:
+        raise _Unsupported("dump hooks")
+
+    namespace = {"_text": ensure_text_type}
+    lines = ["def dump(obj):"]
+    items = []
+    for i, (name, field) in enumerate(schema.dump_fields.items()):
+        var = f"v{i}"
+        key = field.data_key if field.data_key is not None else name
+        if isinstance(field, fields.Method):
+            method = field._serialize_method
+            if method is None:
+                raise _Unsupported(f"{name}: Method without serialize")
+            namespace[f"m{i}"] = method
+            items.append(f"{key!r}: m{i}(obj)")
+            continue
+
+        lines.append(f"    {var} = {_getter(field.attribute or name)}")
+        items.append(f"{key!r}: {_value(field, var, f'f{i}', namespace)}")
+
+    lines.append("    return {" + ", ".join(items) + "}")
+    exec(compile("\n".join(lines), f"<dump {type(schema).__name__}>", "exec"), namespace)
+    return namespace["dump"]
+
+
+def _getter(attribute: str) -> str:
+    parts = attribute.split(".")
+    if not all(part.isidentifier() for part in parts):
+        raise _Unsupported(f"attribute {attribute!r}")
+    return "obj." + ".".join(parts)
+
+
+def _value(field, var: str, name: str, namespace: dict) -> str:
+    """Expression serialising `var` exactly like field._serialize would."""
+    kind = type(field)
+    if kind in (fields.Integer, fields.Float) and not field.as_string:
+        expr = f"{kind.num_type.__name__}({var})"
+    elif kind is fields.String:
+        expr = f"{var} if {var}.__class__ is str else _text({var})"
+    elif kind is fields.DateTime and field.format in field.SERIALIZATION_FUNCS:
+        namespace[name] = field.SERIALIZATION_FUNCS[field.format]
+        expr = f"{name}({var})"
+    elif kind is fields.Dict and field.key_field is not None and field.value_field is not None:
+        key = _value(field.key_field, "k", name + "k", namespace)
+        value = _value(field.value_field, "x", name + "v", namespace)
+        expr = f"{{({key}): ({value}) for k, x in {var}.items()}}"
+    elif kind is fields.Nested and not field.only and not field.exclude:
+        namespace[name] = _compile(field.schema)
+        expr = f"[{name}(x) for x in {var}]" if field.many else f"{name}({var})"
+    else:
+        raise _Unsupported(f"{kind.__name__} field")
+    return f"None if {var} is None else {expr}"
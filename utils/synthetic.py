@@ -0,0 +1,302 @@
+"""
+CineCritic — synthetic data for load testing (`flask ops seed-synthetic`).
+
+Everything is drawn from random.Random instances seeded from SyntheticConfig.seed
+(one per table, so changing e.g. the watchlist knobs leaves users, films and
+reviews untouched), with ids assigned explicitly and timestamps offset from a
+fixed epoch. The same config therefore gives the same rows on every run, down
+to the password hash, which is computed once with a seeded salt and shared by
+every user.
+
+Shape of the data:
+- films get a Zipf-skewed popularity: reviews per film follow rank^-zipf_s,
+  scaled so the average is reviews_per_film (capped at the number of users)
+- each film has 1–3 genres, popular genres more often
+- ratings lean positive; ~85% of reviews are published, ~5% flagged
+- watchlist sizes are exponential around watchlist_mean, favouring popular films
+
+Rows are streamed into Postgres with COPY, table by table, in one transaction;
+sequences are moved past the generated ids and film_rating_stats is rebuilt.
+"""
+
+# Built-in imports
+import hashlib
+import itertools
+import math
+import random
+import string
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+
+# Local imports
+from extensions import db
+from utils.counters import rebuild_counters
+from utils.rating_stats import rebuild_rating_stats
+
+EPOCH = datetime(2020, 1, 1)
+SPAN_SECONDS = 4 * 365 * 24 * 3600      # timestamps fall within four years of EPOCH
+_DAYS = [str((EPOCH + timedelta(days=day)).date()) for day in range(SPAN_SECONDS // 86400)]
+TABLES = ("users", "genres", "films", "film_genres", "reviews", "watchlist")
+
+RATINGS = [x / 2 for x in range(1, 11)]
+RATING_WEIGHTS = [1, 1, 2, 3, 5, 8, 12, 14, 11, 8]     # 0.5 … 5.0
+STATUSES = ["published", "draft", "flagged"]
+STATUS_WEIGHTS = [85, 10, 5]
+
+GENRE_NAMES = [
+    "Drama", "Comedy", "Thriller", "Action", "Romance", "Horror", "Sci-Fi", "Documentary",
+    "Animation", "Crime", "Adventure", "Fantasy", "Mystery", "Family", "War", "Western",
+    "Musical", "Biography", "History", "Sport", "Noir", "Short", "Experimental", "Silent",
+]
+ADJECTIVES = [
+    "Silent", "Crimson", "Last", "Hidden", "Broken", "Golden", "Endless", "Distant", "Wild",
+    "Quiet", "Burning", "Lost", "Frozen", "Electric", "Secret", "Fading", "Restless", "Hollow",
+]
+NOUNS = [
+    "Harbor", "Summer", "Empire", "River", "Signal", "Garden", "Horizon", "Witness", "Mirror",
+    "Kingdom", "Station", "Letter", "Orchard", "Frontier", "Voyage", "Shadow", "Island", "Promise",
+]
+FIRST_NAMES = ["Ava", "Ben", "Chloe", "Dev", "Elena", "Farid", "Grace", "Hiro", "Ines", "Jon", "Kemi", "Luca"]
+LAST_NAMES = ["Alvarez", "Brooks", "Chen", "Dubois", "Eze", "Fischer", "Gupta", "Haddad", "Ito", "Jensen"]
+SENTENCES = [
+    "Gorgeous cinematography.", "The pacing drags in the middle.", "A career-best performance.",
+    "Smart, funny and surprisingly moving.", "The ending did not land for me.",
+    "Worth it for the score alone.", "Overlong but ambitious.", "I keep thinking about it.",
+]
+
+
+@dataclass
+class SyntheticConfig:
+    users: int = 10_000
+    films: int = 50_000
+    genres: int = 20
+    reviews_per_film: float = 20.0
+    zipf_s: float = 1.1
+    watchlist_mean: float = 15.0
+    seed: int = 42
+    password: str = "password123"
+
+
+def generate(config: SyntheticConfig, on_table=None) -> dict:
+    """COPY a synthetic dataset into empty tables; returns row counts per table."""
+    conn = db.session.connection()
+    if conn.dialect.name != "postgresql":
+        raise RuntimeError("seed-synthetic needs a PostgreSQL database (it loads with COPY).")
+
+    popularity = _popularity(config)
+    genre_weights = list(itertools.accumulate(1 / (rank + 1) for rank in range(config.genres)))
+    sources = {
+        "users": (("id", "username", "email", "password_hash", "role", "created_at"), _users(config)),
+        "genres": (("id", "name"), _genres(config)),
+        "films": (("id", "title", "release_year", "director", "description"), _films(config)),
+        "film_genres": (("film_id", "genre_id"), _film_genres(config, genre_weights)),
+        "reviews": (
+            ("id", "film_id", "user_id", "rating", "body", "status",
+             "created_at", "updated_at", "published_at", "flagged_at"),
+            _reviews(config, popularity),
+        ),
+        "watchlist": (("user_id", "film_id", "added_at"), _watchlist(config, popularity)),
+    }
+
+    cursor = conn.connection.cursor()
+    # bulk-load pattern: drop secondary indexes/constraints, COPY, rebuild them in one pass
+    restore = _drop_secondary(cursor, TABLES)
+    counts = {}
+    for table in TABLES:
+        columns, lines = sources[table]
+        stream = _CopyStream(lines)
+        cursor.copy_expert(f"COPY {table} ({', '.join(columns)}) FROM STDIN", stream)
+        counts[table] = stream.rows
+        if on_table is not None:
+            on_table(table, stream.rows)
+
+    cursor.execute("SET LOCAL maintenance_work_mem = '256MB'")
+    for statement in restore:
+        cursor.execute(statement)
+    for table in ("users", "genres", "films", "reviews"):
+        cursor.execute(
+            f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), "
+            f"coalesce((SELECT max(id) FROM {table}), 0) + 1, false)"
+        )
+    counts["film_rating_stats"] = rebuild_rating_stats()
+    rebuild_counters()
+    return counts
+
+
+# ========== GENERATORS ==========
+# each yields COPY text lines; generated text never contains tabs, newlines or backslashes
+def _users(config):
+    rng = _rng(config, "users")
+    password_hash = _password_hash(config.password, rng)
+    for user_id in range(1, config.users + 1):
+        role = "admin" if user_id == 1 else "user"
+        yield f"{user_id}\tuser{user_id}\tuser{user_id}@example.test\t{password_hash}\t{role}\t{_timestamp(rng)}\n"
+
+
+def _genres(config):
+    for genre_id in range(1, config.genres + 1):
+        base = GENRE_NAMES[(genre_id - 1) % len(GENRE_NAMES)]
+        cycle = (genre_id - 1) // len(GENRE_NAMES)
+        yield f"{genre_id}\t{base if cycle == 0 else f'{base} {cycle + 1}'}\n"
+
+
+def _films(config):
+    rng = _rng(config, "films")
+    for film_id in range(1, config.films + 1):
+        # the id suffix keeps (title, release_year) unique
+        title = f"{rng.choice(ADJECTIVES)} {rng.choice(NOUNS)} {film_id}"
+        director = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+        description = " ".join(rng.sample(SENTENCES, 2))
+        yield f"{film_id}\t{title}\t{rng.randint(1920, 2025)}\t{director}\t{description}\n"
+
+
+def _film_genres(config, genre_weights):
+    if not config.genres:
+        return
+    rng = _rng(config, "film_genres")
+    genre_ids = range(1, config.genres + 1)
+    for film_id in range(1, config.films + 1):
+        picks = set(rng.choices(genre_ids, cum_weights=genre_weights, k=rng.randint(1, 3)))
+        for genre_id in sorted(picks):
+            yield f"{film_id}\t{genre_id}\n"
+
+
+def _reviews(config, popularity):
+    rng = _rng(config, "reviews")
+    review_id = 0
+    user_ids = range(1, config.users + 1)
+    ratings = [str(rating) for rating in RATINGS]
+    rating_weights = list(itertools.accumulate(RATING_WEIGHTS))
+    status_weights = list(itertools.accumulate(STATUS_WEIGHTS))
+    bodies = [" ".join(combo) for k in (1, 2, 3) for combo in itertools.permutations(SENTENCES, k)]
+    for film_id, count in enumerate(_review_counts(config, popularity, rng), start=1):
+        reviewers = sorted(rng.sample(user_ids, count))
+        picked_ratings = rng.choices(ratings, cum_weights=rating_weights, k=count)
+        statuses = rng.choices(STATUSES, cum_weights=status_weights, k=count)
+        for user_id, rating, status in zip(reviewers, picked_ratings, statuses):
+            review_id += 1
+            created = _timestamp(rng)
+            published = created if status == "published" else "\\N"
+            flagged = created if status == "flagged" else "\\N"
+            yield (
+                f"{review_id}\t{film_id}\t{user_id}\t{rating}\t{bodies[int(rng.random() * len(bodies))]}\t{status}"
+                f"\t{created}\t{created}\t{published}\t{flagged}\n"
+            )
+
+
+def _watchlist(config, popularity):
+    if not config.films:
+        return
+    rng = _rng(config, "watchlist")
+    film_ids = range(1, config.films + 1)
+    cum_weights = list(itertools.accumulate(popularity))
+    for user_id in range(1, config.users + 1):
+        size = min(config.films, int(rng.expovariate(1 / config.watchlist_mean)) if config.watchlist_mean else 0)
+        if size > config.films // 2:
+            picks = rng.sample(film_ids, size)
+        else:
+            # popular films first; top up uniformly if the skew keeps hitting the same ones
+            picks = set(rng.choices(film_ids, cum_weights=cum_weights, k=size))
+            while len(picks) < size:
+                picks.add(rng.randint(1, config.films))
+        for film_id in sorted(picks):
+            yield f"{user_id}\t{film_id}\t{_timestamp(rng)}\n"
+
+
+# ========== HELPERS ==========
+def _rng(config, table):
+    # a separate stream per table, so knobs for one table don't reshuffle the others
+    return random.Random(f"{config.seed}:{table}")
+
+
+def _timestamp(rng) -> str:
+    # formatted by hand from a per-day table: str(datetime) dominates the review loop
+    day, second = divmod(int(rng.random() * SPAN_SECONDS), 86400)
+    return f"{_DAYS[day]} {second // 3600:02d}:{second // 60 % 60:02d}:{second % 60:02d}"
+
+
+def _popularity(config):
+    """Zipf weight per film id (index 0 = film 1); ranks are shuffled across ids."""
+    ranks = list(range(1, config.films + 1))
+    _rng(config, "popularity").shuffle(ranks)
+    return [rank ** -config.zipf_s for rank in ranks]
+
+
+def _review_counts(config, popularity, rng):
+    total = config.reviews_per_film * config.films
+    scale = total / (sum(popularity) or 1)
+    for weight in popularity:
+        expected = weight * scale
+        # randomised rounding keeps the long tail from collapsing to zero
+        count = math.floor(expected) + (rng.random() < expected % 1)
+        yield min(count, config.users)
+
+
+def _drop_secondary(cursor, tables) -> list:
+    """Drop FKs, unique constraints and plain indexes on `tables`; return SQL recreating them.
+
+    Primary keys stay, and so do FKs on other tables that point at these.
+    """
+    cursor.execute(
+        """
+        SELECT conrelid::regclass::text, quote_ident(conname), contype, pg_get_constraintdef(oid)
+        FROM pg_constraint
+        WHERE conrelid = ANY(%(tables)s::regclass[]) AND contype IN ('f', 'u')
+        ORDER BY contype = 'u', conname
+        """,
+        {"tables": list(tables)},
+    )
+    constraints = cursor.fetchall()
+    cursor.execute(
+        """
+        SELECT indexrelid::regclass::text, pg_get_indexdef(indexrelid)
+        FROM pg_index
+        WHERE indrelid = ANY(%(tables)s::regclass[])
+          AND NOT EXISTS (SELECT 1 FROM pg_constraint WHERE conindid = indexrelid)
+        """,
+        {"tables": list(tables)},
+    )
+    indexes = cursor.fetchall()
+
+    # FKs first (unique constraints can back them), indexes after
+    for table, name, _, _ in constraints:
+        cursor.execute(f"ALTER TABLE {table} DROP CONSTRAINT {name}")
+    for index, _ in indexes:
+        cursor.execute(f"DROP INDEX {index}")
+
+    restore = [definition for _, definition in indexes]
+    restore += [
+        f"ALTER TABLE {table} ADD CONSTRAINT {name} {definition}"
+        for table, name, kind, definition in sorted(constraints, key=lambda c: c[2] == "f")
+    ]
+    return restore
+
+
+def _password_hash(password, rng):
+    """A werkzeug-compatible scrypt hash with a seeded (so reproducible) salt."""
+    salt = "".join(rng.choices(string.ascii_letters + string.digits, k=16))
+    n, r, p = 2**15, 8, 1
+    digest = hashlib.scrypt(password.encode(), salt=salt.encode(), n=n, r=r, p=p, maxmem=132 * n * r * p)
+    return f"scrypt:{n}:{r}:{p}${salt}${digest.hex()}"
+
+
+class _CopyStream:
+    """File-like view of an iterator of COPY text lines, read chunk by chunk."""
+
+    def __init__(self, lines):
+        self._lines = lines
+        self._buffer = ""
+        self.rows = 0
+
+    def read(self, size=-1):
+        size = size if size and size > 0 else 1 << 16
+        chunks, length = [self._buffer], len(self._buffer)
+        for line in self._lines:
+            chunks.append(line)
+            length += len(line)
+            self.rows += 1
+            if length >= size:
+                break
+        data = "".join(chunks)
+        self._buffer = data[size:]
+        return data[:size]
@@ -0,0 +1,164 @@
+"""
+CineCritic — revoked JWTs, checked in memory.
+
+Every authenticated request asks whether its token was revoked, so that check
+must not cost a query. TokenDenylist keeps the jti of each revoked token in a
+bounded in-process TTLCache, each entry living until the token would have
+expired anyway. The revoked_tokens table is the shared, persistent copy:
+
+- revoke() inserts the row (ON CONFLICT DO NOTHING, so it also tells the caller
+  whether the token was already revoked); the jti reaches this worker's cache
+  only when that transaction commits, so a rolled-back revoke leaves no trace
+- before a request carrying a token, at most every JWT_DENYLIST_SYNC_SECONDS,
+  the worker pulls rows other workers added since its last sync
+
+A token revoked by another worker can therefore still pass here for up to one
+sync interval. Refresh-token rotation doesn't rely on that: the insert in
+revoke() is what decides which request may use a refresh token.
+
+If more unexpired tokens are revoked than JWT_DENYLIST_MAX_ENTRIES, the oldest
+fall out of memory; keep access tokens short-lived so that stays harmless.
+"""
+
+# Built-in imports
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+# Installed imports
+from flask import request
+from sqlalchemy import event
+from sqlalchemy.dialects.postgresql import insert
+
+# Local imports
+from utils.cache import TTLCache
+
+# re-read rows revoked this long before the last sync, in case their
+# transaction committed after it (revoked_at is the transaction start)
+SYNC_OVERLAP = timedelta(seconds=30)
+
+# session.info key: (jti, expires_at) revoked in the open transaction
+PENDING = "token_denylist.pending"
+
+
+class TokenDenylist:
+    """Flask extension answering flask-jwt-extended's "is this token revoked?" from memory."""
+
+    def __init__(self, app=None):
+        self.sync_seconds = 5.0
+        self._cache = TTLCache()
+        self._synced_until = None       # newest revoked_at seen
+        self._next_sync = 0.0
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Register with `app`; call after jwt.init_app()."""
+        from extensions import db
+
+        app.config.setdefault("JWT_DENYLIST_MAX_ENTRIES", 100_000)
+        app.config.setdefault("JWT_DENYLIST_SYNC_SECONDS", 5.0)
+        self.sync_seconds = app.config["JWT_DENYLIST_SYNC_SECONDS"]
+        self._cache = TTLCache(maxsize=app.config["JWT_DENYLIST_MAX_ENTRIES"])
+        self._synced_until = None
+        self._next_sync = 0.0
+        app.extensions["flask-jwt-extended"].token_in_blocklist_loader(self.is_revoked)
+        app.before_request(self._sync_before_request)
+        app.extensions["token_denylist"] = self
+        # once per process: every app shares db.session (asgi.py creates two)
+        if not event.contains(db.session, "after_commit", self._remember_committed):
+            event.listen(db.session, "after_commit", self._remember_committed)
+            event.listen(db.session, "after_transaction_end", _discard_pending)
+
+    def is_revoked(self, jwt_header, jwt_payload) -> bool:
+        return self._cache.get(jwt_payload["jti"]) is not None
+
+    # db/models are imported where used: extensions.py imports this module
+    def revoke(self, jwt_payload) -> bool:
+        """Revoke a decoded token; False if it was already revoked.
+
+        The caller commits; only then does this worker treat the token as revoked.
+        """
+        from extensions import db
+        from models.revoked_tokens import RevokedToken
+
+        expires_at = _utc(datetime.fromtimestamp(jwt_payload["exp"], timezone.utc))
+        stmt = (
+            insert(RevokedToken.__table__)
+            .values(
+                jti=jwt_payload["jti"],
+                token_type=jwt_payload.get("type", "access"),
+                user_id=int(jwt_payload["sub"]),
+                expires_at=expires_at,
+            )
+            .on_conflict_do_nothing(index_elements=["jti"])
+            .returning(RevokedToken.id)
+        )
+        inserted = db.session.scalar(stmt) is not None
+        db.session.info.setdefault(PENDING, []).append((jwt_payload["jti"], expires_at))
+        return inserted
+
+    def prune(self) -> int:
+        """Delete rows of tokens that have expired anyway; returns how many. The caller commits."""
+        from extensions import db
+        from models.revoked_tokens import RevokedToken
+
+        result = db.session.execute(db.delete(RevokedToken).where(RevokedToken.expires_at < _utc()))
+        return result.rowcount
+
+    # ========== HELPERS ==========
+    def _sync_before_request(self):
+        if "Authorization" not in request.headers or time.monotonic() < self._next_sync:
+            return
+        # never wait for another request's sync: under asgi.py requests share a
+        # thread, and blocking on a lock held across a query would hang them all
+        if not self._lock.acquire(blocking=False):
+            return
+        try:
+            if time.monotonic() < self._next_sync:
+                return      # another thread just synced
+            self._sync()
+            self._next_sync = time.monotonic() + self.sync_seconds
+        finally:
+            self._lock.release()
+
+    def _sync(self):
+        from extensions import db
+        from models.revoked_tokens import RevokedToken
+
+        stmt = (
+            db.select(RevokedToken.jti, RevokedToken.expires_at, RevokedToken.revoked_at)
+            .where(RevokedToken.expires_at > _utc())
+            .order_by(RevokedToken.revoked_at.desc())
+            .limit(self._cache.maxsize)
+        )
+        if self._synced_until is not None:
+            stmt = stmt.where(RevokedToken.revoked_at > self._synced_until - SYNC_OVERLAP)
+        rows = db.session.execute(stmt).all()
+        for jti, expires_at, _ in reversed(rows):   # oldest first, so the newest stay in the LRU
+            self._remember(jti, expires_at)
+        if rows:
+            self._synced_until = max(self._synced_until or rows[0][2], rows[0][2])
+        # don't hold a connection/transaction open for the rest of the request
+        db.session.commit()
+
+    def _remember_committed(self, session):
+        for jti, expires_at in session.info.pop(PENDING, ()):
+            self._remember(jti, expires_at)
+
+    def _remember(self, jti, expires_at):
+        ttl = (expires_at - _utc()).total_seconds()
+        if ttl > 0:
+            self._cache.set(jti, True, ttl=ttl)
+
+
+def _discard_pending(session, transaction):
+    # after_commit has already taken them if the transaction committed
+    if transaction.parent is None:
+        session.info.pop(PENDING, None)
+
+
+def _utc(moment=None):
+    """Naive UTC datetime, matching the DateTime columns."""
+    return (moment or datetime.now(timezone.utc)).replace(tzinfo=None)